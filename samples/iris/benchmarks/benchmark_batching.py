@@ -0,0 +1,110 @@
+"""
+Compares calling IrisSVMModel.predict on one row DataFrames from concurrent
+threads directly, to calling it through a BatchingPredictor, for several
+max batch sizes and max wait times. Reports the latency percentiles and
+throughput of the calls for every setting.
+
+Usage:
+python benchmarks/benchmark_batching.py --threads 16 --calls-per-thread 200
+"""
+import argparse
+import math
+import threading
+from time import perf_counter
+
+from sklearn.datasets import load_iris
+
+from iris.models import IrisSVMModel
+from iris.serving import BatchingPredictor
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)), 1) - 1]
+
+
+def run_threads(predict, samples, threads, calls_per_thread):
+    """
+    Calls predict on one sample at a time from every thread
+    :return: Latency of every call in seconds, and the total duration
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(thread_id):
+        thread_latencies = []
+        for i in range(calls_per_thread):
+            sample = samples[(thread_id + i * threads) % len(samples)]
+            start = perf_counter()
+            predict(sample)
+            thread_latencies.append(perf_counter() - start)
+        with lock:
+            latencies.extend(thread_latencies)
+
+    callers = [threading.Thread(target=caller, args=(i,)) for i in range(threads)]
+    start = perf_counter()
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    return latencies, perf_counter() - start
+
+
+def main(max_batch_sizes, max_wait_ms, threads, calls_per_thread):
+    iris = load_iris(as_frame=True)
+    model = IrisSVMModel(features=FEATURES, kernel="rbf")
+    model.fit(iris.data, iris.target)
+    samples = [iris.data.iloc[[i]] for i in range(len(iris.data))]
+
+    rows = []
+
+    def report(setting, latencies, elapsed, mean_batch_size):
+        rows.append(
+            (
+                setting,
+                len(latencies) / elapsed,
+                percentile(latencies, 50) * 1000,
+                percentile(latencies, 95) * 1000,
+                percentile(latencies, 99) * 1000,
+                mean_batch_size,
+            )
+        )
+
+    latencies, elapsed = run_threads(model.predict, samples, threads, calls_per_thread)
+    report("unbatched", latencies, elapsed, 1.0)
+
+    for max_batch_size in max_batch_sizes:
+        for wait_ms in max_wait_ms:
+            with BatchingPredictor(
+                model, max_batch_size=max_batch_size, max_wait_ms=wait_ms
+            ) as predictor:
+                latencies, elapsed = run_threads(
+                    predictor.predict, samples, threads, calls_per_thread
+                )
+            metrics = predictor.get_metrics()
+            report(
+                f"batch={max_batch_size} wait={wait_ms}ms",
+                latencies,
+                elapsed,
+                metrics["batching/mean_batch_size"],
+            )
+
+    print(f"{threads} threads x {calls_per_thread} single sample calls")
+    print(
+        f"{'setting':>24} {'calls/sec':>10} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'mean batch':>11}"
+    )
+    for row in rows:
+        print("{:>24} {:>10.1f} {:>8.3f} {:>8.3f} {:>8.3f} {:>11.1f}".format(*row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0.5, 2.0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--calls-per-thread", type=int, default=200)
+    args = parser.parse_args()
+    main(args.max_batch_sizes, args.max_wait_ms, args.threads, args.calls_per_thread)
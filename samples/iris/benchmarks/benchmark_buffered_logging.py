@@ -0,0 +1,57 @@
+"""
+Compares per-call metric logging with BufferedExperimentation,
+using a local mlflow file store as tracking uri.
+
+Usage:
+python benchmarks/benchmark_buffered_logging.py --steps 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from iris.experimentation import BufferedExperimentation, MlflowExperimentation
+
+# Recent mlflow versions refuse the file store unless explicitly allowed
+os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+
+
+def log_training_loop(experiment_logger, steps):
+    experiment_logger.set_experiment("buffered-logging-benchmark")
+    experiment_logger.start_run()
+
+    start = time.perf_counter()
+    for step in range(steps):
+        experiment_logger.log_metric("loss", 1.0 / (step + 1), step=step)
+    loop_time = time.perf_counter() - start
+
+    experiment_logger.end_run()
+    total_time = time.perf_counter() - start
+    return loop_time, total_time
+
+
+def main(steps):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_uri = Path(tmp_dir, "mlruns").as_uri()
+
+        direct = MlflowExperimentation(tracking_uri=tracking_uri, log_package=False)
+        buffered = BufferedExperimentation(
+            MlflowExperimentation(tracking_uri=tracking_uri, log_package=False)
+        )
+
+        for name, experiment_logger in (("direct", direct), ("buffered", buffered)):
+            loop_time, total_time = log_training_loop(experiment_logger, steps)
+            print(
+                f"{name:>8}: {steps} steps, "
+                f"training loop blocked for {loop_time:.3f}s, "
+                f"{total_time:.3f}s including end_run "
+                f"({steps / total_time:.0f} metrics/sec)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.steps)
@@ -0,0 +1,71 @@
+"""
+Measures the time of importing the iris package in a fresh interpreter,
+and lists the slowest modules imported (using python -X importtime).
+The target is a bare `import iris` under 100 ms.
+
+Usage:
+python benchmarks/benchmark_import_time.py --statement "import iris" --repeats 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+TARGET_MS = 100
+
+
+def time_import(statement):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "MLFLOW_DISABLE_AGENT_HINT": "1"},
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def slowest_modules(statement, top):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        # Lines look like "import time: <self us> | <cumulative us> | <module>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((int(cumulative_us), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(statement, repeats, top):
+    times = [time_import(statement) for _ in range(repeats)]
+    median = statistics.median(times)
+    print(
+        f"{statement!r}: median {median:.1f} ms, "
+        f"min {min(times):.1f} ms, max {max(times):.1f} ms ({repeats} runs)"
+    )
+    print(f"Target: < {TARGET_MS} ms ({'met' if median < TARGET_MS else 'missed'})")
+
+    print("Slowest modules (cumulative):")
+    for cumulative_us, name in slowest_modules(statement, top):
+        print(f"{cumulative_us / 1000:10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statement", default="import iris")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    main(args.statement, args.repeats, args.top)
@@ -0,0 +1,137 @@
+"""
+Load test of ModelServer: starts the server locally on a saved IrisSVMModel,
+sends single-instance /predict requests from concurrent clients, and reports
+client side latency percentiles, throughput and the server's mean batch size,
+for every combination of workers and max batch size.
+max_batch_size=1 corresponds to predicting one request at a time.
+
+Usage:
+python benchmarks/benchmark_serving.py --workers 1 4 --max-batch-sizes 1 32
+"""
+import argparse
+import json
+import math
+import tempfile
+import threading
+import urllib.request
+from pathlib import Path
+from time import perf_counter
+
+from sklearn.datasets import load_iris
+
+from iris.models import IrisSVMModel
+from iris.serving import ModelServer
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)), 1) - 1]
+
+
+def generate_load(url, instances, concurrency, requests_per_client):
+    """
+    Sends requests_per_client requests (of one instance each) from every client
+    :return: Latency of every request in seconds, and the total duration
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_id):
+        client_latencies = []
+        for i in range(requests_per_client):
+            instance = instances[(client_id + i * concurrency) % len(instances)]
+            request = urllib.request.Request(
+                url,
+                data=json.dumps({"instances": [instance]}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            start = perf_counter()
+            with urllib.request.urlopen(request) as response:
+                response.read()
+            client_latencies.append(perf_counter() - start)
+        with lock:
+            latencies.extend(client_latencies)
+
+    clients = [
+        threading.Thread(target=client, args=(i,)) for i in range(concurrency)
+    ]
+    start = perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return latencies, perf_counter() - start
+
+
+def main(workers, max_batch_sizes, max_wait_ms, concurrency, requests_per_client):
+    iris = load_iris(as_frame=True)
+    model = IrisSVMModel(features=FEATURES, kernel="rbf")
+    model.fit(iris.data, iris.target)
+    instances = iris.data.to_dict("records")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = str(Path(work_dir, "model"))
+        model.save(model_path)
+
+        rows = []
+        for n_workers in workers:
+            for max_batch_size in max_batch_sizes:
+                server = ModelServer(
+                    model_path,
+                    n_workers=n_workers,
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=max_wait_ms,
+                    port=0,
+                )
+                with server:
+                    url = f"http://{server.host}:{server.port}/predict"
+                    # Warm up
+                    generate_load(url, instances, concurrency, 2)
+                    latencies, elapsed = generate_load(
+                        url, instances, concurrency, requests_per_client
+                    )
+                    mean_batch_size = server.get_metrics()["serving/mean_batch_size"]
+                rows.append(
+                    (
+                        n_workers,
+                        max_batch_size,
+                        len(latencies) / elapsed,
+                        percentile(latencies, 50) * 1000,
+                        percentile(latencies, 95) * 1000,
+                        percentile(latencies, 99) * 1000,
+                        mean_batch_size,
+                    )
+                )
+
+    print(
+        f"{concurrency} clients x {requests_per_client} requests, "
+        f"max_wait_ms={max_wait_ms}"
+    )
+    print(
+        f"{'workers':>8} {'max batch':>10} {'req/sec':>10} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'mean batch':>11}"
+    )
+    for row in rows:
+        print(
+            "{:>8} {:>10} {:>10.1f} {:>8.2f} {:>8.2f} {:>8.2f} {:>11.1f}".format(*row)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests-per-client", type=int, default=50)
+    args = parser.parse_args()
+    main(
+        args.workers,
+        args.max_batch_sizes,
+        args.max_wait_ms,
+        args.concurrency,
+        args.requests_per_client,
+    )
@@ -0,0 +1,319 @@
+"""
+Benchmark suite of the experiment pipeline stages, on synthetic data
+at several scales (asv style: setup is not timed, every benchmark is repeated).
+Results are stored as JSON (by default in benchmarks/results/<commit>.json),
+so runs of different commits can be compared offline.
+
+Usage:
+python benchmarks/benchmark_suite.py --repeats 5
+python benchmarks/benchmark_suite.py --quick --benchmarks svm_fit svm_predict
+python benchmarks/benchmark_suite.py --compare results/abc.json results/def.json
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.datasets import load_iris
+
+from iris import LoggableObject
+from iris.data import IrisDataLoader
+from iris.experimentation import MlflowExperimentation
+from iris.models import BaseModel, IrisSVMModel
+
+# Recent mlflow versions refuse the file store unless explicitly allowed
+os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+# Minimum duration of one repeat of a benchmark
+MIN_REPEAT_SEC = 0.01
+
+# name -> (benchmark function, scales)
+BENCHMARKS = {}
+
+
+def benchmark(name, scales):
+    """
+    Registers a benchmark. The benchmark is a generator function, called with
+    the scale and a temporary work directory: it runs its (untimed) setup,
+    yields the function to time, and runs its teardown after the last repeat
+    """
+
+    def register(function):
+        BENCHMARKS[name] = (function, scales)
+        return function
+
+    return register
+
+
+def make_iris_data(n_samples: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates n_samples rows shaped like the iris dataset, drawn from
+    a normal distribution per species (with the real species' means and stds)
+    """
+    iris = load_iris(as_frame=True)
+    rng = np.random.default_rng(seed)
+    species = rng.integers(0, len(iris.target_names), size=n_samples)
+    data = np.empty((n_samples, len(iris.feature_names)))
+    for target in range(len(iris.target_names)):
+        rows = species == target
+        samples = iris.data[iris.target == target]
+        data[rows] = rng.normal(
+            samples.mean().values, samples.std().values, size=(rows.sum(), 4)
+        )
+
+    frame = pd.DataFrame(data, columns=iris.feature_names)
+    frame["Species"] = iris.target_names[species]
+    frame.index.name = "Id"
+    return frame
+
+
+class SyntheticLoggable(LoggableObject):
+    def __init__(self, n_fields: int):
+        for i in range(n_fields):
+            setattr(self, f"param_{i}", i if i % 3 else f"value_{i}")
+        super().__init__()
+
+    def get_metrics(self):
+        return {}
+
+
+@benchmark("svm_fit", scales=(1000, 5000, 20000))
+def bench_svm_fit(scale, work_dir):
+    data = make_iris_data(scale)
+    model = IrisSVMModel(features=FEATURES)
+    yield lambda: model.fit(data, data["Species"])
+
+
+@benchmark("svm_predict", scales=(1000, 10000, 100000))
+def bench_svm_predict(scale, work_dir):
+    train = make_iris_data(1000, seed=1)
+    model = IrisSVMModel(features=FEATURES)
+    model.fit(train, train["Species"])
+    data = make_iris_data(scale)
+    yield lambda: model.predict(data)
+
+
+@benchmark("get_params", scales=(10, 100, 1000))
+def bench_get_params(scale, work_dir):
+    loggable = SyntheticLoggable(n_fields=scale)
+    yield loggable.get_params
+
+
+@benchmark("mlflow_log_metrics", scales=(10, 100, 1000))
+def bench_mlflow_log_metrics(scale, work_dir):
+    experiment_logger = MlflowExperimentation(
+        tracking_uri=Path(work_dir, "mlruns").as_uri(), log_package=False
+    )
+    experiment_logger.set_experiment("benchmark-suite")
+    experiment_logger.start_run()
+    metrics = {f"metric_{i}": float(i) for i in range(scale)}
+    yield lambda: experiment_logger.log_metrics(metrics)
+    experiment_logger.end_run()
+
+
+class WeightsModel(BaseModel):
+    """
+    Model holding a float64 weight matrix of n_weights values
+    (fitted sklearn models of the iris samples are too small to time loading)
+    """
+
+    def __init__(self, n_weights: int):
+        self.weights = np.random.default_rng(0).random((n_weights // 100, 100))
+        super().__init__()
+
+    def fit(self, X, y=None):
+        pass
+
+    def predict(self, X):
+        return X @ self.weights.T
+
+
+@benchmark("model_load", scales=(10 ** 5, 10 ** 6, 10 ** 7))
+def bench_model_load(scale, work_dir):
+    path = str(Path(work_dir, "model"))
+    WeightsModel(scale).save(path)
+    yield lambda: WeightsModel.load(path)
+
+
+@benchmark("model_load_pickle", scales=(10 ** 5, 10 ** 6, 10 ** 7))
+def bench_model_load_pickle(scale, work_dir):
+    path = str(Path(work_dir, "model.pkl"))
+    with open(path, "wb") as f:
+        pickle.dump(WeightsModel(scale), f)
+    yield lambda: WeightsModel.load(path)
+
+
+def _bench_data_loader(scale, work_dir, data_format):
+    Path(work_dir, "data", "processed").mkdir(parents=True)
+    Path(work_dir, "notebooks").mkdir()
+    cwd = os.getcwd()
+    # The data loader reads ../data/processed, like the notebooks do
+    os.chdir(Path(work_dir, "notebooks"))
+    try:
+        data_loader = IrisDataLoader("synthetic", "1", data_format=data_format)
+        data = make_iris_data(scale)
+        data_loader._write_split(data, "train")
+        data_loader._write_split(data.iloc[: scale // 3], "test")
+        yield data_loader.get_dataset
+    finally:
+        os.chdir(cwd)
+
+
+@benchmark("data_loader_csv", scales=(10000, 100000, 1000000))
+def bench_data_loader_csv(scale, work_dir):
+    yield from _bench_data_loader(scale, work_dir, "csv")
+
+
+@benchmark("data_loader_parquet", scales=(10000, 100000, 1000000))
+def bench_data_loader_parquet(scale, work_dir):
+    yield from _bench_data_loader(scale, work_dir, "parquet")
+
+
+@benchmark("data_loader_arrow", scales=(10000, 100000, 1000000))
+def bench_data_loader_arrow(scale, work_dir):
+    yield from _bench_data_loader(scale, work_dir, "arrow")
+
+
+def run_benchmark(name, scale, repeats):
+    """
+    Times one benchmark at one scale
+    :return: Time per call of each repeat, and their statistics
+    """
+    function, _ = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory() as work_dir:
+        steps = function(scale, work_dir)
+        timed = next(steps)
+
+        # Warm up, and call fast benchmarks several times per repeat,
+        # so every repeat takes at least MIN_REPEAT_SEC
+        start = time.perf_counter()
+        timed()
+        warm_up = time.perf_counter() - start
+        number = max(1, min(int(MIN_REPEAT_SEC / max(warm_up, 1e-9)), 10000))
+
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                timed()
+            times.append((time.perf_counter() - start) / number)
+        # Run the teardown
+        next(steps, None)
+
+    median = statistics.median(times)
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "number": number,
+        "times_sec": times,
+        "min_sec": min(times),
+        "median_sec": median,
+        "mean_sec": statistics.mean(times),
+        "stdev_sec": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "items_per_sec": scale / median if median > 0 else None,
+    }
+
+
+def get_metadata(repeats):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "repeats": repeats,
+    }
+
+
+def run_suite(names, repeats, quick, output):
+    results = []
+    for name in names:
+        _, scales = BENCHMARKS[name]
+        for scale in scales[:1] if quick else scales:
+            result = run_benchmark(name, scale, repeats)
+            print(
+                f"{name:>26} scale={scale:<8} "
+                f"median {result['median_sec'] * 1000:12.4f} ms  "
+                f"min {result['min_sec'] * 1000:12.4f} ms"
+            )
+            results.append(result)
+
+    metadata = get_metadata(repeats)
+    if not output:
+        output = Path(Path(__file__).parent, "results", f"{metadata['commit']}.json")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"metadata": metadata, "results": results}, f, indent=2)
+    print(f"Results stored in {output}")
+
+
+def compare(baseline_path, current_path, threshold):
+    """
+    Prints the median time ratio (current / baseline) of every benchmark
+    :return: Number of benchmarks slower than threshold
+    """
+    with open(baseline_path) as f:
+        baseline = {
+            (r["benchmark"], r["scale"]): r for r in json.load(f)["results"]
+        }
+    with open(current_path) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    for result in current:
+        key = (result["benchmark"], result["scale"])
+        if key not in baseline:
+            continue
+        ratio = result["median_sec"] / baseline[key]["median_sec"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(
+            f"{key[0]:>26} scale={key[1]:<8} "
+            f"{baseline[key]['median_sec'] * 1000:12.4f} ms -> "
+            f"{result['median_sec'] * 1000:12.4f} ms ({ratio:5.2f}x) {flag}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--quick", action="store_true", help="Only run the smallest scale"
+    )
+    parser.add_argument("--output", help="JSON results file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="JSON results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Median time ratio above which a benchmark is a regression",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run_suite(args.benchmarks, args.repeats, args.quick, args.output)
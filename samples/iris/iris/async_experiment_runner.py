@@ -0,0 +1,68 @@
+import asyncio
+
+from .evaluation import EvaluationMetrics
+from .experiment_runner import ExperimentRunner
+from .experimentation import Experimentation, QueuedExperimentation
+
+
+class AsyncExperimentRunner(ExperimentRunner):
+    def __init__(self, *args, experiment_logger: Experimentation = None, **kwargs):
+        """
+        ExperimentRunner whose experiment logger I/O overlaps with the
+        experiment's compute. Every call to the experiment logger (connecting,
+        starting the run, logging params and metrics) is queued and executed,
+        in order, by a dedicated logger thread, so neither __init__ nor
+        fit_model, predict and evaluate wait for the tracking server.
+        Artifacts and images are still logged synchronously,
+        since their files may be removed once the call returns.
+        run() and run_async() wait for all queued calls before returning,
+        so the logged run is identical to the one of ExperimentRunner.
+        All parameters are the same as ExperimentRunner's.
+
+        :example:
+
+        results = AsyncExperimentRunner(...).run()
+
+        # Or, several experiments in one event loop (each with its own run):
+        results = await asyncio.gather(runner_1.run_async(), runner_2.run_async())
+        """
+        if experiment_logger is not None:
+            experiment_logger = QueuedExperimentation(experiment_logger)
+            model = kwargs.get("model", args[0] if args else None)
+            # Models logging during fit and predict should use the queue as well
+            if model is not None and model.experiment_logger is (
+                experiment_logger.experimentation
+            ):
+                model.experiment_logger = experiment_logger
+        super().__init__(*args, experiment_logger=experiment_logger, **kwargs)
+
+    def run(self) -> EvaluationMetrics:
+        evaluation_result = super().run()
+        self.flush()
+        return evaluation_result
+
+    async def run_async(self) -> EvaluationMetrics:
+        """
+        Performs model fitting and evaluation in a worker thread
+        (keeping the event loop free), then waits for the experiment logger
+        :return: evaluation results
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.fit_model)
+        if not self.evaluation_chunk_size:
+            # Chunked evaluation predicts the test set itself, chunk by chunk
+            await loop.run_in_executor(None, self.predict)
+        evaluation_result = await loop.run_in_executor(None, self.evaluate)
+        await self.flush_async()
+        return evaluation_result
+
+    def flush(self) -> None:
+        """
+        Waits until all queued experiment logger calls are done
+        """
+        if isinstance(self.experiment_logger, QueuedExperimentation):
+            self.experiment_logger.flush()
+
+    async def flush_async(self) -> None:
+        if isinstance(self.experiment_logger, QueuedExperimentation):
+            await self.experiment_logger.flush_async()
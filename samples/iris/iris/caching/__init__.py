@@ -0,0 +1,13 @@
+from iris.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "fingerprint_data": ".fingerprint",
+        "fingerprint_file": ".fingerprint",
+        "fingerprint_params": ".fingerprint",
+        "FitCache": ".fit_cache",
+    },
+)
+
+__all__ = ["fingerprint_data", "fingerprint_file", "fingerprint_params", "FitCache"]
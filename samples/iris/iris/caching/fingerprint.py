@@ -0,0 +1,80 @@
+import hashlib
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint_data(data) -> str:
+    """
+    Returns a content hash of a dataset (e.g. X_train or y_train).
+    pandas and numpy objects are hashed in a vectorized way,
+    other objects are hashed by their pickled representation
+    :param data: DataFrame, Series, numpy array, list or any other picklable object
+    :return: sha256 hex digest
+    """
+    sha = hashlib.sha256()
+    if data is None:
+        sha.update(b"None")
+    elif isinstance(data, (pd.DataFrame, pd.Series)):
+        sha.update(type(data).__name__.encode("utf-8"))
+        if isinstance(data, pd.DataFrame):
+            sha.update(repr(list(data.columns)).encode("utf-8"))
+            sha.update(repr(list(data.dtypes.astype(str))).encode("utf-8"))
+        else:
+            sha.update(repr((data.name, str(data.dtype))).encode("utf-8"))
+        sha.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, np.ndarray) and data.dtype != object:
+        sha.update(repr((data.shape, str(data.dtype))).encode("utf-8"))
+        sha.update(np.ascontiguousarray(data).tobytes())
+    else:
+        sha.update(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    return sha.hexdigest()
+
+
+def fingerprint_params(params) -> str:
+    """
+    Returns a hash of a (possibly nested) dictionary of parameters.
+    Values which are not JSON serializable are represented by their repr,
+    or by their attributes if their class does not define a repr
+    (the default repr holds the memory address, which changes between runs)
+    :param params: Parameters dictionary, e.g. the output of get_params()
+    :return: sha256 hex digest
+    """
+    content = json.dumps(params, sort_keys=True, default=_param_content)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _param_content(value):
+    if isinstance(value, np.ndarray):
+        # The repr of large arrays is truncated
+        return fingerprint_data(value)
+    if callable(value) and hasattr(value, "__qualname__"):
+        if "<" in value.__qualname__:
+            raise TypeError(
+                f"Cannot fingerprint {value.__qualname__}, as it can't be "
+                "identified by name. Use a function defined at module level"
+            )
+        return f"{value.__module__}.{value.__qualname__}"
+    if type(value).__repr__ is not object.__repr__:
+        return repr(value)
+    if hasattr(value, "__dict__"):
+        return {"class": type(value).__qualname__, "attributes": vars(value)}
+    raise TypeError(
+        f"Cannot fingerprint a {type(value).__name__}: it defines neither "
+        "a __repr__ nor attributes. Pass a JSON serializable value instead"
+    )
+
+
+def fingerprint_file(file_path, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns a content hash of a file, read in chunks of chunk_size bytes
+    :param file_path: Path of file to hash
+    :return: sha256 hex digest
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
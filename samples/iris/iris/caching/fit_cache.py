@@ -0,0 +1,167 @@
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict
+
+from iris import LoggableObject
+from iris.models import BaseModel
+from iris.models.serialization import MANIFEST_FILE
+
+from .fingerprint import fingerprint_data, fingerprint_params
+
+logger = logging.getLogger(__name__)
+
+
+class FitCache(LoggableObject):
+    def __init__(
+        self,
+        cache_dir: str = "../models/fit_cache",
+        max_entries: int = None,
+        max_size_bytes: int = None,
+        cache_name: str = None,
+    ):
+        """
+        On disk cache of fitted models.
+        A fitted model is stored (using BaseModel.save, in a directory per model)
+        under a key built from
+        the model class, its params, its pre/post processors' params and
+        a content hash of the training data. Fitting the same model
+        on the same data again loads the stored model (using BaseModel.load)
+        instead of refitting it.
+        Least recently used entries are evicted once the cache
+        holds more than max_entries models or more than max_size_bytes.
+        :param cache_dir: Directory to store fitted models in
+        :param max_entries: Maximum number of models to keep, None for no limit
+        :param max_size_bytes: Maximum total size of stored models, None for no limit
+        :param cache_name: Name of cache, for logging purposes
+        """
+        self.cache_dir = str(cache_dir)
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        super().__init__(name=cache_name)
+
+    def get_key(self, model: BaseModel, X, y=None) -> str:
+        """
+        Returns the cache key of fitting model on X and y
+        """
+        model_class = f"{type(model).__module__}.{type(model).__qualname__}"
+        key_params = {
+            "model_class": model_class,
+            "hyper_params": model.get_params(),
+            "preprocessor": model.preprocessor.get_params()
+            if model.preprocessor
+            else None,
+            "postprocessor": model.postprocessor.get_params()
+            if model.postprocessor
+            else None,
+            "X": fingerprint_data(X),
+            "y": fingerprint_data(y),
+        }
+        return fingerprint_params(key_params)
+
+    def load(self, key: str, model_class=BaseModel) -> BaseModel:
+        """
+        Loads a fitted model from the cache
+        :param key: Cache key (see get_key)
+        :param model_class: Class whose load method is used
+        :return: The fitted model, or None if the key is not in the cache
+        """
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            model = model_class.load(str(path))
+        except Exception as e:
+            logger.warning(f"Failed to load cached model {path}, refitting. {e}")
+            self.misses += 1
+            return None
+
+        self._touch(path)
+        self.hits += 1
+        return model
+
+    def store(self, key: str, model: BaseModel) -> None:
+        """
+        Stores a fitted model in the cache and evicts old entries if needed
+        :param key: Cache key (see get_key)
+        :param model: Fitted model
+        """
+        path = self._path(key)
+        # save writes into a temporary directory first and doesn't store
+        # the experiment logger (which belongs to the current run)
+        model.save(str(path))
+        self._touch(path)
+
+        self._evict()
+
+    def clear(self) -> None:
+        for path in self._entries():
+            shutil.rmtree(path)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # Mark entry as recently used. An explicit timestamp is used
+        # since file systems may round the modification time of file writes
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir, key)
+
+    def _entries(self):
+        cache_dir = Path(self.cache_dir)
+        if not cache_dir.exists():
+            return []
+        return [path for path in cache_dir.iterdir() if _is_model_dir(path)]
+
+    def _evict(self) -> None:
+        if self.max_entries is None and self.max_size_bytes is None:
+            return
+
+        # Oldest (least recently used) first
+        entries = sorted(
+            (
+                (path, path.stat().st_mtime_ns, _dir_size(path))
+                for path in self._entries()
+            ),
+            key=lambda entry: entry[1],
+        )
+        total_size = sum(size for _, _, size in entries)
+
+        while entries and (
+            (self.max_entries is not None and len(entries) > self.max_entries)
+            or (self.max_size_bytes is not None and total_size > self.max_size_bytes)
+        ):
+            path, _, size = entries.pop(0)
+            shutil.rmtree(path)
+            total_size -= size
+            self.evictions += 1
+            logger.info(f"Evicted {path.name} from fit cache")
+
+    def get_params(self) -> Dict:
+        return {
+            "fit_cache_max_entries": self.max_entries,
+            "fit_cache_max_size_bytes": self.max_size_bytes,
+        }
+
+    def get_metrics(self) -> Dict:
+        return {
+            "fit_cache_hits": self.hits,
+            "fit_cache_misses": self.misses,
+            "fit_cache_evictions": self.evictions,
+        }
+
+
+def _is_model_dir(path: Path) -> bool:
+    return path.is_dir() and Path(path, MANIFEST_FILE).exists()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
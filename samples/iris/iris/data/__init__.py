@@ -1,5 +1,8 @@
-from .data_loader import DataLoader
-from .iris_data_loader import IrisDataLoader
+from iris.lazy_import import lazy_import
 
-__all__ = ["DataLoader","IrisDataLoader"]
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {"DataLoader": ".data_loader", "IrisDataLoader": ".iris_data_loader"},
+)
 
+__all__ = ["DataLoader", "IrisDataLoader"]
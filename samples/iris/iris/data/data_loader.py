@@ -41,6 +41,32 @@ class DataLoader(LoggableObject):
         """
         pass
 
+    def iter_batches(self, split: str = "test", batch_size: int = 1000):
+        """
+        Reads one split of the dataset in batches of batch_size samples.
+        By default the output of get_dataset is sliced, so it must be either
+        a (X_train, y_train, X_test, y_test) tuple or a dictionary with these keys,
+        and the whole dataset is still loaded into memory.
+        Override in data loaders supporting lazy loading,
+        for datasets which do not fit in memory
+        :param split: Name of split to read ("train" or "test")
+        :param batch_size: Number of samples per batch
+        :return: A generator of (X_batch, y_batch) tuples
+        """
+        dataset = self.get_dataset()
+        if isinstance(dataset, (tuple, list)) and len(dataset) == 4:
+            dataset = dict(zip(("X_train", "y_train", "X_test", "y_test"), dataset))
+        if not isinstance(dataset, dict) or f"X_{split}" not in dataset:
+            raise ValueError(
+                f"Cannot read split {split} of {type(self).__name__} in batches, "
+                "get_dataset does not return (X_train, y_train, X_test, y_test). "
+                "Override iter_batches to read this dataset in batches"
+            )
+
+        X, y = dataset[f"X_{split}"], dataset.get(f"y_{split}")
+        for start in range(0, len(X), batch_size):
+            yield _slice(X, start, batch_size), _slice(y, start, batch_size)
+
     def get_params(self) -> Dict:
         """
         Reads the dataset loader configuration during experiment logging
@@ -59,3 +85,15 @@ class DataLoader(LoggableObject):
     def get_metrics(self):
         # Data loaders are not likely to contain metrics
         pass
+
+
+def _slice(data, start: int, size: int):
+    """
+    Returns size samples from position start (pandas objects are sliced
+    by position; None stays None)
+    """
+    if data is None:
+        return None
+    if hasattr(data, "iloc"):
+        return data.iloc[start : start + size]
+    return data[start : start + size]
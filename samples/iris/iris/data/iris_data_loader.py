@@ -1,19 +1,55 @@
+import os
+from typing import Dict
+
+from iris.caching import fingerprint_file
 from iris.data import DataLoader
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+# Supported processed data formats (also used as the file extensions)
+DATA_FORMATS = ("csv", "parquet", "arrow")
+
+# Content hash of each split file, by (path, size, modification time),
+# so get_params doesn't read the files again on every run
+_file_hashes = {}
+
 
 class IrisDataLoader(DataLoader):
-    def get_dataset(self):
-        train = pd.read_csv(
-            f"../data/processed/{self.dataset_name}-{self.dataset_version}-train.csv",
-            index_col="Id",
-        )
-        test = pd.read_csv(
-            f"../data/processed/{self.dataset_name}-{self.dataset_version}-test.csv",
-            index_col="Id",
+    def __init__(
+        self,
+        dataset_name,
+        dataset_version,
+        data_format: str = "csv",
+        data_loader_name=None,
+        **data_params,
+    ):
+        """
+        Data loader for the iris train/test splits in data/processed
+        :param dataset_name: Name of dataset for reproducibility
+        :param dataset_version: Version of dataset for reproducibility
+        :param data_format: Format of the processed splits.
+        "csv", "parquet" or "arrow" (Arrow IPC files, which are memory mapped
+        when loaded, so repeated loads do not parse or copy the data).
+        parquet and arrow keep the dtypes and the index of the splits
+        and require pyarrow
+        """
+        if data_format not in DATA_FORMATS:
+            raise ValueError(
+                f"Unknown data format {data_format}, "
+                f"expected one of {list(DATA_FORMATS)}"
+            )
+        self.data_format = data_format
+        super().__init__(
+            dataset_name=dataset_name,
+            dataset_version=dataset_version,
+            data_loader_name=data_loader_name,
+            **data_params,
         )
 
+    def get_dataset(self):
+        train = self._read_split("train")
+        test = self._read_split("test")
+
         X_train = train.drop("Species", axis=1)
         y_train = train["Species"]
         X_test = test.drop("Species", axis=1)
@@ -22,6 +58,72 @@ class IrisDataLoader(DataLoader):
         print(f"Loaded {len(train)} train and {len(test)} test samples")
         return X_train, y_train, X_test, y_test
 
+    def iter_batches(self, split: str = "test", batch_size: int = 1000):
+        """
+        Reads the processed train or test split in chunks of batch_size rows,
+        so only one chunk is held in memory at a time
+        :param split: "train" or "test"
+        :param batch_size: Number of rows per batch
+        :return: A generator of (X_batch, y_batch) tuples
+        """
+        if split not in ("train", "test"):
+            raise ValueError(f"Unknown split {split}, expected 'train' or 'test'")
+
+        for batch in self._iter_split(split, batch_size):
+            yield batch.drop("Species", axis=1), batch["Species"]
+
+    def _iter_split(self, split: str, batch_size: int):
+        path = self._processed_path(split)
+        if self.data_format == "csv":
+            with pd.read_csv(path, index_col="Id", chunksize=batch_size) as reader:
+                yield from reader
+        elif self.data_format == "parquet":
+            import pyarrow.parquet as pq
+
+            for record_batch in pq.ParquetFile(path).iter_batches(batch_size):
+                yield record_batch.to_pandas()
+        else:
+            for record_batch in self._read_arrow_table(path).to_batches(batch_size):
+                yield record_batch.to_pandas()
+
+    def _read_split(self, split: str) -> pd.DataFrame:
+        path = self._processed_path(split)
+        if self.data_format == "csv":
+            return pd.read_csv(path, index_col="Id")
+        elif self.data_format == "parquet":
+            return pd.read_parquet(path, engine="pyarrow")
+        else:
+            # split_blocks lets numeric columns be converted without copying
+            return self._read_arrow_table(path).to_pandas(split_blocks=True)
+
+    @staticmethod
+    def _read_arrow_table(path: str):
+        import pyarrow as pa
+
+        # Buffers of the returned table point directly into the memory mapped file
+        # (which stays mapped as long as the table is referenced)
+        return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+    def _write_split(self, data: pd.DataFrame, split: str) -> None:
+        path = self._processed_path(split)
+        if self.data_format == "csv":
+            data.to_csv(path)
+        elif self.data_format == "parquet":
+            data.to_parquet(path, engine="pyarrow")
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    def _processed_path(self, split: str) -> str:
+        file_name = (
+            f"{self.dataset_name}-{self.dataset_version}-{split}.{self.data_format}"
+        )
+        return f"../data/processed/{file_name}"
+
     def download_dataset(self):
         pass
 
@@ -32,9 +134,28 @@ class IrisDataLoader(DataLoader):
         print("Creating train/test split")
         iris = pd.read_csv(f"../data/raw/{self.dataset_name}.csv", index_col="Id")
         train, test = train_test_split(iris, test_size=0.3)
-        train.to_csv(
-            f"../data/processed/{self.dataset_name}-{self.dataset_version}-train.csv"
-        )
-        test.to_csv(
-            f"../data/processed/{self.dataset_name}-{self.dataset_version}-test.csv"
-        )
+        self._write_split(train, "train")
+        self._write_split(test, "test")
+
+    def get_params(self) -> Dict:
+        """
+        Adds the processed data format and the content hash of each split file
+        """
+        params = super().get_params()
+        params["data_format"] = self.data_format
+        for split in ("train", "test"):
+            path = self._processed_path(split)
+            if os.path.exists(path):
+                params[f"{split}_file_hash"] = _file_hash(path)
+        return params
+
+
+def _file_hash(path: str) -> str:
+    """
+    Returns the content hash of a file, computed once per version of the file
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        _file_hashes[key] = fingerprint_file(path)
+    return _file_hashes[key]
@@ -1,4 +1,8 @@
-from .data_processor import DataProcessor
-from .empty_processor import EmptyProcessor
+from iris.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {"DataProcessor": ".data_processor", "EmptyProcessor": ".empty_processor"},
+)
 
 __all__ = ["DataProcessor", "EmptyProcessor"]
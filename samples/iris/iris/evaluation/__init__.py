@@ -1,39 +1,29 @@
-import logging
-from time import time
-
-from .evaluation_metrics import EvaluationMetrics
-from .iris_evaluation_metrics import IrisEvaluationMetrics
-from .step_evaluation_metrics import StepEvaluationMetrics
-from .evaluator import Evaluator
-from .iris_evaluator import IrisEvaluator
-
-
-class TimeTook(object):
-    """
-    Calculates the time a block took to run.
-    Example usage:
-    with TimeTook("sample"):
-        s = [x for x in range(10000000)]
-    Modified from:
-    https://blog.usejournal.com/how-to-create-your-own-timing-context-manager-in-python-a0e944b48cf8
-    """
-
-    def __init__(self, description):
-        self.description = description
-
-    def __enter__(self):
-        self.start = time()
-
-    def __exit__(self, type, value, traceback):
-        self.end = time()
-        logging.info(f"Time took for {self.description}: {self.end - self.start}")
+from iris.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "EvaluationMetrics": ".evaluation_metrics",
+        "IrisEvaluationMetrics": ".iris_evaluation_metrics",
+        "StepEvaluationMetrics": ".step_evaluation_metrics",
+        "CrossValidationMetrics": ".cross_validation_metrics",
+        "Evaluator": ".evaluator",
+        "IrisEvaluator": ".iris_evaluator",
+        "TimeTook": ".time_took",
+        "SpanRecorder": ".time_took",
+        "RunProfiler": ".run_profiler",
+    },
+)
 
 
 __all__ = [
     "EvaluationMetrics",
     "Evaluator",
     "StepEvaluationMetrics",
+    "CrossValidationMetrics",
     "IrisEvaluationMetrics",
     "IrisEvaluator",
     "TimeTook",
+    "SpanRecorder",
+    "RunProfiler",
 ]
@@ -0,0 +1,44 @@
+import numbers
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from iris.evaluation import EvaluationMetrics, StepEvaluationMetrics
+
+
+class CrossValidationMetrics(StepEvaluationMetrics):
+    def __init__(self, fold_metrics: List[EvaluationMetrics]):
+        """
+        Evaluation results of all folds of a cross validation.
+        Every fold is a step (so each metric forms a curve over the folds),
+        and the summary (without a step) holds the mean and
+        standard deviation of each numeric metric over the folds
+        :param fold_metrics: Evaluation result of each fold, in fold order
+        """
+        self.fold_metrics = fold_metrics
+
+    def get_steps(self) -> Iterable:
+        return range(len(self.fold_metrics))
+
+    def get_metrics(self, step=None) -> Dict:
+        """
+        :param step: Fold number. If None, returns "<metric>_mean" and
+        "<metric>_std" of every numeric metric
+        """
+        if step is not None:
+            return self.fold_metrics[step].get_metrics()
+
+        values = {}
+        for metrics in self.fold_metrics:
+            for key, value in metrics.get_metrics().items():
+                if isinstance(value, numbers.Number) and not isinstance(value, bool):
+                    values.setdefault(key, []).append(value)
+
+        summary = {}
+        for key, fold_values in values.items():
+            summary[f"{key}_mean"] = float(np.mean(fold_values))
+            summary[f"{key}_std"] = float(np.std(fold_values))
+        return summary
+
+    def __repr__(self):
+        return f"CrossValidationMetrics({self.get_metrics()})"
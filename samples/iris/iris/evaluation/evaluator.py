@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Dict
+from typing import Dict, List
 
 from iris import LoggableObject
 from . import EvaluationMetrics
@@ -13,6 +13,7 @@ class Evaluator(LoggableObject):
         """
 
         super().__init__(name=evaluator_name)
+        Evaluator.reset(self)
 
     @abstractmethod
     def evaluate(self, **kwargs) -> EvaluationMetrics:
@@ -23,6 +24,61 @@ class Evaluator(LoggableObject):
         """
         pass
 
+    def reset(self) -> None:
+        """
+        Clears the state accumulated by update calls
+        """
+        self._y_true_batches = []
+        self._predictions_batches = []
+
+    def update(self, y_true_batch, predictions_batch) -> None:
+        """
+        Accumulates the evaluation state of one batch of predictions.
+        By default the batches are collected and evaluated together in finalize.
+        Override (together with reset and finalize) to accumulate only
+        the state needed for the metrics, so the full prediction list
+        never has to be held in memory.
+        :param y_true_batch: Actual values of the batch
+        :param predictions_batch: Model predictions on the batch
+        """
+        self._y_true_batches.append(y_true_batch)
+        self._predictions_batches.append(predictions_batch)
+
+    def finalize(self) -> EvaluationMetrics:
+        """
+        Calculates the evaluation metrics of all batches passed to update
+        :return: EvaluationMetrics
+        """
+        return self.evaluate(
+            self._concatenate(self._y_true_batches),
+            self._concatenate(self._predictions_batches),
+        )
+
+    def supports_streaming(self) -> bool:
+        """
+        Whether this evaluator overrides update, so it does not hold
+        all predictions in memory during a chunked evaluation
+        """
+        return type(self).update is not Evaluator.update
+
+    @staticmethod
+    def _concatenate(batches: List):
+        """
+        Joins batches into one object of their type (pandas, numpy or list)
+        """
+        if not batches:
+            return []
+        library = type(batches[0]).__module__.split(".")[0]
+        if library == "pandas":
+            import pandas as pd
+
+            return pd.concat(batches)
+        if library == "numpy":
+            import numpy as np
+
+            return np.concatenate(batches)
+        return [item for batch in batches for item in batch]
+
     def __repr__(self):
         return f"Evaluator: {self.name}"
 
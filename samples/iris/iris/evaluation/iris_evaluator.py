@@ -4,7 +4,31 @@ from sklearn import metrics
 
 
 class IrisEvaluator(Evaluator):
+    def __init__(self, evaluator_name=None):
+        """
+        Evaluates the accuracy of the predicted classes.
+        Supports streaming evaluation: accuracy is accumulated
+        as a count of correct predictions over batches
+        :param evaluator_name Name of evaluator
+        """
+        super().__init__(evaluator_name=evaluator_name)
+        self.reset()
+
     def evaluate(self, y_test, prediction) -> IrisEvaluationMetrics:
-        return IrisEvaluationMetrics(
-            accuracy=metrics.accuracy_score(prediction, y_test)
+        self.reset()
+        self.update(y_test, prediction)
+        return self.finalize()
+
+    def reset(self) -> None:
+        self._n_correct = 0
+        self._n_samples = 0
+
+    def update(self, y_true_batch, predictions_batch) -> None:
+        self._n_correct += int(
+            metrics.accuracy_score(predictions_batch, y_true_batch, normalize=False)
         )
+        self._n_samples += len(predictions_batch)
+
+    def finalize(self) -> IrisEvaluationMetrics:
+        accuracy = self._n_correct / self._n_samples if self._n_samples else 0.0
+        return IrisEvaluationMetrics(accuracy=accuracy)
@@ -0,0 +1,186 @@
+import cProfile
+import io
+import logging
+import pstats
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+from iris import LoggableObject
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class RunProfiler(LoggableObject):
+    def __init__(
+        self,
+        cpu: bool = True,
+        memory: bool = True,
+        top: int = 50,
+        traceback_frames: int = 1,
+        output_dir: str = None,
+        profiler_name: str = None,
+    ):
+        """
+        Profiles stages of an experiment (e.g. ExperimentRunner.fit_model)
+        using cProfile and/or tracemalloc. For every stage, the reports are
+        uploaded to the experiment logger under "profiles/":
+        <stage>.pstats (load with pstats.Stats), <stage>_pstats.txt
+        (functions sorted by cumulative time) and <stage>_allocations.txt
+        (the lines allocating the most memory still held at the end of the stage).
+        The peak traced memory of the stage and the peak RSS of the process
+        (so far) are logged as metrics. If tracemalloc was already tracing
+        before the stage, its peak is only reset on Python 3.9+.
+        Stages started while another stage is profiled are part of the outer stage.
+        :param cpu: Whether to profile with cProfile
+        :param memory: Whether to trace memory allocations with tracemalloc
+        (which slows down allocations considerably)
+        :param top: Number of functions and allocation sites in the text reports
+        :param traceback_frames: Number of frames stored per allocation
+        :param output_dir: Optional directory to keep the reports in.
+        By default they are written to a temporary directory and only uploaded
+        :param profiler_name: Name of profiler, for logging purposes
+        """
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.traceback_frames = traceback_frames
+        self.output_dir = output_dir
+        self.metrics = {}
+        self._active_stage = None
+        super().__init__(name=profiler_name)
+
+    @contextmanager
+    def profile(self, stage: str, experiment_logger=None):
+        """
+        Profiles the code run inside the context
+        :param stage: Name of the profiled stage, used for reports and metrics
+        :param experiment_logger: Optional Experimentation to upload reports
+        and log metrics to
+        """
+        if self._active_stage:
+            logger.debug(f"{stage} is profiled as part of {self._active_stage}")
+            yield
+            return
+
+        self._active_stage = stage
+        profiler = self._start_cpu_profile() if self.cpu else None
+        started_tracing = False
+        if self.memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.traceback_frames)
+            elif hasattr(tracemalloc, "reset_peak"):
+                # Python 3.9+. Before, the peak may be of earlier traced code
+                tracemalloc.reset_peak()
+
+        try:
+            yield
+        finally:
+            snapshot = None
+            if profiler:
+                profiler.disable()
+            if self.memory:
+                _, peak_traced = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                self.metrics[f"profile/{stage}/peak_traced_memory_mb"] = (
+                    peak_traced / MB
+                )
+            peak_rss = _peak_rss()
+            if peak_rss is not None:
+                self.metrics[f"profile/{stage}/peak_rss_mb"] = peak_rss / MB
+            self._active_stage = None
+
+            self._write_reports(stage, profiler, snapshot, experiment_logger)
+
+    def _start_cpu_profile(self):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger or an outer cProfile) is active
+            logger.warning(f"Cannot start cProfile, skipping CPU profile: {e}")
+            return None
+        return profiler
+
+    def _write_reports(self, stage, profiler, snapshot, experiment_logger):
+        if self.output_dir:
+            report_dir = Path(self.output_dir)
+            report_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            report_dir = Path(tempfile.mkdtemp())
+
+        try:
+            paths = []
+            if profiler:
+                pstats_path = Path(report_dir, f"{stage}.pstats")
+                profiler.dump_stats(str(pstats_path))
+                stream = io.StringIO()
+                stats = pstats.Stats(profiler, stream=stream)
+                stats.sort_stats("cumulative").print_stats(self.top)
+                text_path = Path(report_dir, f"{stage}_pstats.txt")
+                text_path.write_text(stream.getvalue())
+                paths += [pstats_path, text_path]
+            if snapshot is not None:
+                allocations_path = Path(report_dir, f"{stage}_allocations.txt")
+                allocations_path.write_text(self._format_allocations(snapshot))
+                paths.append(allocations_path)
+
+            stage_metrics = {
+                key: value
+                for key, value in self.metrics.items()
+                if key.startswith(f"profile/{stage}/")
+            }
+            logger.info(f"Profiled {stage}: {stage_metrics}")
+            if experiment_logger:
+                for path in paths:
+                    experiment_logger.log_artifact(str(path), artifact_path="profiles")
+                experiment_logger.log_metrics(stage_metrics)
+        finally:
+            if not self.output_dir:
+                shutil.rmtree(report_dir, ignore_errors=True)
+
+    def _format_allocations(self, snapshot: tracemalloc.Snapshot) -> str:
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        statistics = snapshot.statistics("traceback")
+        total = sum(stat.size for stat in statistics)
+        lines = [f"Total traced memory held: {total / MB:.1f} MB"]
+        for i, stat in enumerate(statistics[: self.top], start=1):
+            lines.append(f"#{i}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+        return "\n".join(lines) + "\n"
+
+    def get_params(self) -> Dict:
+        return {"profile_cpu": self.cpu, "profile_memory": self.memory}
+
+    def get_metrics(self) -> Dict:
+        return dict(self.metrics)
+
+
+def _peak_rss():
+    """
+    Peak resident set size of the process in bytes, or None if unknown
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -1,8 +1,25 @@
+import copy
+import functools
 import logging
-
-from iris.evaluation import StepEvaluationMetrics
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from time import perf_counter
+from typing import Dict
+
+import joblib
+
+from iris.evaluation import (
+    CrossValidationMetrics,
+    RunProfiler,
+    SpanRecorder,
+    StepEvaluationMetrics,
+)
 
 from . import LoggableObject
+from .caching import FitCache
 from .data.data_loader import DataLoader
 from .evaluation import EvaluationMetrics, Evaluator
 from .experimentation import Experimentation
@@ -10,6 +27,40 @@ from .models import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Data shared by the cross validation folds running in a worker process.
+# Set once per worker by _init_fold_worker (see ExperimentRunner.cross_validate)
+_fold_worker_state = {}
+
+
+def _timed(method):
+    """
+    Records the duration of an ExperimentRunner method as a span
+    (named after the method) in the runner's span recorder
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.span_recorder.span(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _profiled(method):
+    """
+    Profiles an ExperimentRunner method with the runner's profiler, if it has one
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler:
+            return method(self, *args, **kwargs)
+        experiment_logger = self.experiment_logger if self.log_experiment else None
+        with self.profiler.profile(method.__name__, experiment_logger):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
 
 class ExperimentRunner:
     def __init__(
@@ -24,6 +75,10 @@ class ExperimentRunner:
         log_experiment: bool = True,
         experiment_logger: Experimentation = None,
         experiment_name: str = None,
+        fit_cache: FitCache = None,
+        evaluation_chunk_size: int = None,
+        span_recorder: SpanRecorder = None,
+        profiler: RunProfiler = None,
         **experiment_params_to_log,
     ):
         """
@@ -44,6 +99,23 @@ class ExperimentRunner:
         (e.g. MlflowExperimentation)
         :param experiment_name: Name of experiment,
         to be used by the experimentation service
+        :param fit_cache: Optional FitCache. If passed, a model which was already
+        fitted with the same params on the same training set is loaded from the cache
+        instead of being fitted again
+        :param evaluation_chunk_size: Optional number of test samples per chunk.
+        If passed, evaluate() predicts and evaluates the test set chunk by chunk
+        (using the evaluator's update and finalize methods), so peak memory does not
+        grow with the size of the test set. Predictions are then not kept
+        (run() does not call predict()).
+        If X_test is None, the test set is read using data_loader.iter_batches
+        :param span_recorder: Optional SpanRecorder. log, fit_model, predict and
+        evaluate (and the predict and update calls of each evaluation chunk)
+        are timed as spans, and the span histograms (count, p50, p95, max)
+        are logged as metrics when each of them ends.
+        By default, a new SpanRecorder exporting to experiment_logger is used
+        :param profiler: Optional RunProfiler. If passed, fit_model, predict and
+        evaluate are profiled (cProfile and/or tracemalloc), the reports are
+        uploaded as artifacts and the peak memory is logged as metrics
 
         :example:
 
@@ -73,6 +145,10 @@ class ExperimentRunner:
         experiment_runner.predict()
         results = experiment_runner.evaluate()
 
+        # Option 4: Cross validate on X_train and y_train (X_test can be None):
+        results = experiment_runner.cross_validate(KFold(5, shuffle=True), n_jobs=5)
+        print(results.get_metrics())  # e.g. accuracy_mean and accuracy_std
+
         """
         self.model = model
         self.X_train = X_train
@@ -84,8 +160,20 @@ class ExperimentRunner:
         self.experiment_logger = experiment_logger
         self.log_experiment = log_experiment
         self.experiment_name = experiment_name
+        self.fit_cache = fit_cache
+        self.evaluation_chunk_size = evaluation_chunk_size
         self._evaluation_metrics = []  # Metrics gathered during experiment
         self._predictions = []  # Predictions gathered during experiment
+        self.span_recorder = span_recorder or SpanRecorder(
+            experiment_logger=experiment_logger if log_experiment else None
+        )
+        self.profiler = profiler
+
+        if self.evaluation_chunk_size and not self.evaluator.supports_streaming():
+            logger.warning(
+                f"{type(self.evaluator).__name__} does not support streaming "
+                "evaluation, the predictions of all chunks are held in memory"
+            )
 
         logger.info(f"Starting experiment: {self.experiment_name}...")
 
@@ -104,6 +192,7 @@ class ExperimentRunner:
 
             self.log(data_loader, evaluator, model)
 
+    @_timed
     def log(self, data_loader, evaluator, model):
         """
         Stores the parameters and metrics from the various modules
@@ -120,6 +209,10 @@ class ExperimentRunner:
             self._log_loggable_object(model.preprocessor, "Preprocessor")
         if model.postprocessor:
             self._log_loggable_object(model.postprocessor, "Postprocessor")
+        if self.fit_cache:
+            self._log_loggable_object(self.fit_cache, "FitCache")
+        if self.profiler:
+            self._log_loggable_object(self.profiler, "Profiler")
         # Log additional inputs to this class
         if self.additional_params:
             logger.info(
@@ -143,52 +236,186 @@ class ExperimentRunner:
         """
         self.fit_model()
 
-        self.predict()
+        if not self.evaluation_chunk_size:
+            # Chunked evaluation predicts the test set itself, chunk by chunk
+            self.predict()
 
         evaluation_result = self.evaluate()
 
         return evaluation_result
 
+    @_timed
+    @_profiled
     def fit_model(self) -> None:
+        if self.fit_cache:
+            key = self.fit_cache.get_key(self.model, X=self.X_train, y=self.y_train)
+            cached_model = self.fit_cache.load(key, model_class=type(self.model))
+            if cached_model is not None:
+                logger.info(f"Loaded fitted model {self.model.name} from fit cache")
+                cached_model.experiment_logger = self.model.experiment_logger
+                self.model = cached_model
+                self._log_fit_cache_metrics()
+                return
+
         logger.info(f"Fitting model {self.model.name} on {len(self.X_train)} samples")
 
         self.model.fit(X=self.X_train, y=self.y_train)
 
+        if self.fit_cache:
+            self.fit_cache.store(key, self.model)
+            self._log_fit_cache_metrics()
+
+    def _log_fit_cache_metrics(self):
+        if self.log_experiment:
+            self.experiment_logger.log_metrics(self.fit_cache.get_metrics())
+
+    @_timed
+    @_profiled
     def predict(self):
         """
         Calls the model predict function with the input X_test
         :return: None
         """
+        if self.X_test is None:
+            raise ValueError(
+                "X_test is None, cannot predict the whole test set. "
+                "Set evaluation_chunk_size to read it in batches during evaluate()"
+            )
         logger.info(
             f"Running model.predict() using model {self.model.name} "
             f"on {len(self.X_test)} test samples"
         )
         self._predictions = self.model.predict(X=self.X_test)
 
+    @_timed
+    @_profiled
     def evaluate(self) -> EvaluationMetrics:
         """
         Runs evaluation on the given model and test set
         :return: EvaluationResult
         """
 
-        if self._predictions is None or len(self._predictions) == 0:
-            logger.info("Predictions not found, running model.predict")
-            self.predict()
+        if self.evaluation_chunk_size:
+            evaluation_result = self._evaluate_in_chunks()
         else:
-            logger.info("Predictions found, skipping model.predict call")
+            if self._predictions is None or len(self._predictions) == 0:
+                logger.info("Predictions not found, running model.predict")
+                self.predict()
+            else:
+                logger.info("Predictions found, skipping model.predict call")
+
+            evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
 
-        evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
         if self.log_experiment:
             if isinstance(evaluation_result, StepEvaluationMetrics):
-                for step in evaluation_result.get_steps():
-                    step_metrics = evaluation_result.get_metrics(step=step)
-                    self.experiment_logger.log_metrics(step_metrics)
+                self.experiment_logger.log_step_metrics(evaluation_result)
             else:
                 self.experiment_logger.log_evaluation_result(evaluation_result)
 
         self._evaluation_metrics = evaluation_result
         return self._evaluation_metrics
 
+    def _evaluate_in_chunks(self) -> EvaluationMetrics:
+        """
+        Pipelines model.predict and evaluator.update over chunks of the test set,
+        so only one chunk of predictions is held in memory at a time
+        """
+        logger.info(
+            f"Predicting and evaluating in chunks of {self.evaluation_chunk_size} "
+            f"test samples"
+        )
+        if self.X_test is None:
+            # Read the test set lazily, for datasets which do not fit in memory
+            chunks = self.data_loader.iter_batches(
+                split="test", batch_size=self.evaluation_chunk_size
+            )
+        else:
+            chunks = zip(
+                _iter_chunks(self.X_test, self.evaluation_chunk_size),
+                _iter_chunks(self.y_test, self.evaluation_chunk_size),
+            )
+
+        self.evaluator.reset()
+        for X_chunk, y_chunk in chunks:
+            with self.span_recorder.span("predict"):
+                predictions = self.model.predict(X=X_chunk)
+            with self.span_recorder.span("update"):
+                self.evaluator.update(y_chunk, predictions)
+        return self.evaluator.finalize()
+
+    @_timed
+    def cross_validate(self, splitter, n_jobs: int = None) -> CrossValidationMetrics:
+        """
+        Cross validates a copy of the model on X_train and y_train: for every fold
+        of splitter, the copy is fitted on the fold's training samples and
+        evaluated on its test samples. Folds run in parallel worker processes.
+        The dataset is stored once in a temporary file and memory mapped by
+        the workers, so it isn't copied to every worker (only the fold indices are).
+        The metrics of each fold are logged as steps (the fold number),
+        along with their mean and std over the folds.
+        self.model itself is not fitted, and the fit cache is not used.
+        :param splitter: sklearn style splitter (e.g. KFold, StratifiedKFold),
+        whose split(X, y) yields the train and test indices of each fold
+        :param n_jobs: Number of worker processes. None uses all cores,
+        1 runs all folds sequentially in the current process
+        :return: CrossValidationMetrics holding the evaluation of every fold
+        """
+        X, y = self.X_train, self.y_train
+        folds = list(splitter.split(X, y))
+        logger.info(
+            f"Cross validating model {self.model.name} on {len(X)} samples "
+            f"in {len(folds)} folds"
+        )
+
+        # The experiment logger belongs to this process' run, don't copy it
+        model = copy.copy(self.model)
+        model.experiment_logger = None
+        state = {"model": model, "evaluator": self.evaluator}
+
+        if n_jobs == 1:
+            _init_fold_worker({**state, "X": X, "y": y})
+            try:
+                results = [
+                    _run_fold(fold, train_index, test_index)
+                    for fold, (train_index, test_index) in enumerate(folds)
+                ]
+            finally:
+                _fold_worker_state.clear()
+        else:
+            data_dir = tempfile.mkdtemp(prefix="cross_validation")
+            try:
+                data_path = os.path.join(data_dir, "data.joblib")
+                joblib.dump((X, y), data_path)
+                with ProcessPoolExecutor(
+                    max_workers=n_jobs,
+                    initializer=_init_fold_worker,
+                    initargs=({**state, "data_path": data_path},),
+                ) as executor:
+                    futures = [
+                        executor.submit(_run_fold, fold, train_index, test_index)
+                        for fold, (train_index, test_index) in enumerate(folds)
+                    ]
+                    results = [future.result() for future in futures]
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+        for _, _, durations in results:
+            for stage, duration in durations.items():
+                self.span_recorder.record(f"cross_validate/{stage}", duration)
+
+        evaluation_result = CrossValidationMetrics(
+            [fold_metrics for _, fold_metrics, _ in results]
+        )
+        if self.log_experiment:
+            self.experiment_logger.log_params(
+                {"cv_splitter": type(splitter).__name__, "cv_folds": len(folds)}
+            )
+            self.experiment_logger.log_step_metrics(evaluation_result)
+            self.experiment_logger.log_metrics(evaluation_result.get_metrics())
+
+        self._evaluation_metrics = evaluation_result
+        return evaluation_result
+
     def get_predictions(self):
         """
         Get already calculated predictions.
@@ -213,3 +440,62 @@ class ExperimentRunner:
             return None
         else:
             return self._evaluation_metrics
+
+
+def _init_fold_worker(state: Dict) -> None:
+    state = dict(state)
+    if "data_path" in state:
+        # Memory mapped, so the workers share the pages of the dataset
+        state["X"], state["y"] = joblib.load(state.pop("data_path"), mmap_mode="r")
+    _fold_worker_state.update(state)
+
+
+def _run_fold(fold: int, train_index, test_index):
+    """
+    Fits a copy of the model on one fold and evaluates it.
+    Executed inside a worker process (or in-process if n_jobs == 1)
+    """
+    state = _fold_worker_state
+    model = copy.deepcopy(state["model"])
+    X, y = state["X"], state["y"]
+
+    start = perf_counter()
+    model.fit(X=_take(X, train_index), y=_take(y, train_index))
+    fitted = perf_counter()
+    predictions = model.predict(X=_take(X, test_index))
+    predicted = perf_counter()
+    evaluation_result = state["evaluator"].evaluate(_take(y, test_index), predictions)
+
+    durations = {"fit": fitted - start, "predict": predicted - fitted}
+    return fold, evaluation_result, durations
+
+
+def _take(data, index):
+    """
+    Selects samples by position (pandas objects, numpy arrays or lists)
+    """
+    if data is None:
+        return None
+    if hasattr(data, "iloc"):
+        return data.iloc[index]
+    if hasattr(data, "take"):
+        return data.take(index, axis=0)
+    return [data[i] for i in index]
+
+
+def _iter_chunks(data, chunk_size: int):
+    """
+    Yields consecutive chunks of chunk_size samples
+    (pandas objects are sliced by position; None yields None for every chunk)
+    """
+    if data is None:
+        yield from repeat(None)
+    elif hasattr(data, "iloc"):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start : start + chunk_size]
+    else:
+        iterator = iter(data)
+        chunk = list(islice(iterator, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(iterator, chunk_size))
@@ -1,5 +1,22 @@
-from .experimentation import Experimentation
-from .aml_experimentation import AmlExperimentation
-from .mlflow_experimentation import MlflowExperimentation
+from iris.lazy_import import lazy_import
 
-__all__ = ["Experimentation", "AmlExperimentation", "MlflowExperimentation"]
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "Experimentation": ".experimentation",
+        "AmlExperimentation": ".aml_experimentation",
+        "MlflowExperimentation": ".mlflow_experimentation",
+        "BufferedExperimentation": ".buffered_experimentation",
+        "QueuedExperimentation": ".queued_experimentation",
+        "PackageSnapshot": ".package_snapshot",
+    },
+)
+
+__all__ = [
+    "Experimentation",
+    "AmlExperimentation",
+    "MlflowExperimentation",
+    "BufferedExperimentation",
+    "QueuedExperimentation",
+    "PackageSnapshot",
+]
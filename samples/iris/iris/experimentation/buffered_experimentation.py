@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+
+from . import Experimentation
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedExperimentation(Experimentation):
+    def __init__(
+        self,
+        experimentation: Experimentation,
+        max_batch_size: int = 1000,
+        flush_interval: float = 5.0,
+    ):
+        """
+        Wraps any Experimentation object and logs params and metrics in bulk,
+        from a background thread, instead of one call per value.
+        Values are kept in memory and flushed (using experimentation.log_batch)
+        once max_batch_size values are waiting or every flush_interval seconds.
+        All pending values are flushed when end_run is called.
+        Like in mlflow, a param can't be logged again with a different value
+        in the same run, which raises a ValueError right away.
+        :param experimentation: The Experimentation object to log into
+        (e.g. MlflowExperimentation)
+        :param max_batch_size: Number of buffered values which triggers a flush
+        :param flush_interval: Maximum number of seconds between flushes
+
+        :example:
+
+        experiment_logger = BufferedExperimentation(MlflowExperimentation())
+        experiment_logger.set_experiment("my-experiment")
+        experiment_logger.start_run()
+        for step, loss in enumerate(losses):
+            experiment_logger.log_metric("loss", loss, step=step)  # returns immediately
+        experiment_logger.end_run()  # waits until all values are logged
+        """
+        super().__init__()
+        self.experimentation = experimentation
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+
+        self._params = {}
+        self._run_params = {}
+        self._metrics = []
+        self._error = None
+        self._stop = False
+        self._thread = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+
+    def set_experiment(self, name, artifact_location=None):
+        self.experimentation.set_experiment(
+            name=name, artifact_location=artifact_location
+        )
+
+    def start_run(self):
+        self.experimentation.start_run()
+        self._run_params = {}
+        self._start_thread()
+
+    def end_run(self):
+        self._stop_thread()
+        try:
+            self.flush()
+        finally:
+            self.experimentation.end_run()
+
+    def log_param(self, key, value):
+        self._add(params={key: value})
+
+    def log_params(self, params):
+        self._add(params=params)
+
+    def log_metric(self, key, value, step=None):
+        self._add(metrics=[(key, value, step, self._timestamp())])
+
+    def log_metrics(self, metrics, step=None):
+        timestamp = self._timestamp()
+        self._add(
+            metrics=[(key, value, step, timestamp) for key, value in metrics.items()]
+        )
+
+    def log_batch(self, metrics=None, params=None):
+        self._add(metrics=metrics, params=params)
+
+    def log_image(self, title, fig):
+        self.experimentation.log_image(title, fig)
+
+    def log_artifact(self, local_path, name=None, artifact_path=None):
+        self.experimentation.log_artifact(local_path, artifact_path=artifact_path)
+
+    def log_artifacts(self, local_path, name=None, artifact_path=None):
+        self.experimentation.log_artifacts(local_path, artifact_path=artifact_path)
+
+    def flush(self):
+        """
+        Synchronously logs all buffered params and metrics
+        :return: None
+        """
+        self._send()
+        self._raise_error()
+
+    def _send(self):
+        with self._flush_lock:
+            with self._condition:
+                params, self._params = self._params, {}
+                metrics, self._metrics = self._metrics, []
+
+            if params or metrics:
+                try:
+                    self.experimentation.log_batch(metrics=metrics, params=params)
+                except Exception as e:
+                    # Keep the error for the caller's next logging call
+                    logger.warning(f"Failed to log buffered values: {e}")
+                    self._error = e
+
+    def pending(self) -> int:
+        """
+        Returns the number of params and metric values waiting to be logged
+        """
+        with self._condition:
+            return len(self._params) + len(self._metrics)
+
+    def __getstate__(self):
+        # Locks and threads cannot be copied (e.g. into a worker process)
+        state = self.__dict__.copy()
+        del state["_condition"], state["_flush_lock"]
+        state["_thread"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+
+    @staticmethod
+    def _timestamp() -> int:
+        return int(time.time() * 1000)
+
+    def _add(self, metrics=None, params=None):
+        self._raise_error()
+        with self._condition:
+            if params:
+                self._check_params(params)
+                self._run_params.update(params)
+                self._params.update(params)
+            if metrics:
+                self._metrics.extend(metrics)
+            if len(self._params) + len(self._metrics) >= self.max_batch_size:
+                self._condition.notify()
+
+    def _check_params(self, params):
+        for key, value in params.items():
+            # Values are compared the way they are logged, as strings
+            if key in self._run_params and str(self._run_params[key]) != str(value):
+                raise ValueError(
+                    f"Param {key} was already logged with value "
+                    f"{self._run_params[key]}, cannot change it to {value}"
+                )
+
+    def _raise_error(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise Exception(f"Failed to log buffered values. Exception: {error}")
+
+    def _start_thread(self):
+        if self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(
+            target=self._flush_loop, name=f"{self.name}-flush", daemon=True
+        )
+        self._thread.start()
+
+    def _stop_thread(self):
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                if not self._stop:
+                    self._condition.wait_for(
+                        lambda: self._stop
+                        or len(self._params) + len(self._metrics)
+                        >= self.max_batch_size,
+                        timeout=self.flush_interval,
+                    )
+                if self._stop:
+                    return
+            self._send()
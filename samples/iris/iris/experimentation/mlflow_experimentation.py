@@ -1,12 +1,22 @@
+import json
 import logging
 import os
+import shutil
+import tempfile
 import uuid
 from pathlib import Path
 from typing import List
 
 import mlflow
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
 
 from . import Experimentation
+from .package_snapshot import PackageSnapshot
+
+# Limits of a single mlflow log_batch request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
 
 
 class MlflowExperimentation(Experimentation):
@@ -15,42 +25,119 @@ class MlflowExperimentation(Experimentation):
         tracking_uri: str = None,
         log_package: bool = True,
         files_to_log: List[str] = None,
+        package_store: str = None,
     ):
         """
         Wrapper for the MLFlow object
         :param tracking_uri: Where runs gets stored.
         Either a local folder, or the uri of the remote (or local) tracking server.
         See https://mlflow.org/docs/0.4.0/tracking.html#where-runs-get-recorded
-        :param log_package Whether to save all code in this package into mlflow
+        :param log_package Whether to save all code in this package into mlflow.
+        Each run logs a manifest of the package files and their hashes,
+        and only files which are not yet in the package_store are logged as blobs
         :param List of file paths to save into mlflow as artifacts.
+        :param package_store: Local directory of the content addressed store
+        used for package snapshots. Defaults to experiments/package_store
         """
         super().__init__()
 
+        self.tracking_uri = tracking_uri
         self.log_package = log_package
         self.files_to_log = files_to_log
+        self.package_store = package_store
+        self.run_id = None
 
         mlflow.set_tracking_uri(tracking_uri)
 
     def set_experiment(self, name, artifact_location=None):
+        # Set again in case this object was copied into a new process
+        mlflow.set_tracking_uri(self.tracking_uri)
         mlflow.set_experiment(name)
 
     def start_run(self):
         if mlflow.active_run() is not None:
             mlflow.end_run()
-        mlflow.start_run()
+        self.run_id = mlflow.start_run().info.run_id
 
         if self.log_package:
             current_dir = os.path.dirname(os.path.realpath(__file__))
             package_dir = str(Path(current_dir, "../").resolve())
             print(f"Logging package in {package_dir}")
-            mlflow.log_artifacts(local_dir=package_dir)
+            self.log_package_snapshot(package_dir)
 
         if self.files_to_log:
             for file in self.files_to_log:
                 mlflow.log_artifact(local_path=file)
 
+    def log_package_snapshot(self, package_dir):
+        """
+        Logs a manifest of all files in package_dir, together with the files
+        whose content was not logged to this tracking server before.
+        The manifest records the run holding each file content,
+        the full package can be restored using restore_package_snapshot
+        """
+        package_store = self.package_store
+        if not package_store:
+            package_store = str(Path(package_dir, "../experiments/package_store"))
+
+        snapshot = PackageSnapshot(
+            store_dir=package_store, remote=mlflow.get_tracking_uri()
+        )
+        manifest, new_blobs = snapshot.take(package_dir)
+
+        for blob_path in new_blobs:
+            mlflow.log_artifact(
+                str(blob_path), artifact_path=f"package/blobs/{blob_path.parent.name}"
+            )
+        snapshot.add_locations(
+            [PackageSnapshot.blob_digest(blob_path) for blob_path in new_blobs],
+            mlflow.active_run().info.run_id,
+        )
+
+        locations = snapshot.locations()
+        blobs = {digest: locations[digest] for digest in manifest.values()}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = Path(tmp_dir, "manifest.json")
+            with open(manifest_path, "w") as f:
+                json.dump(
+                    {"files": manifest, "blobs": blobs}, f, indent=2, sort_keys=True
+                )
+            mlflow.log_artifact(str(manifest_path), artifact_path="package")
+
+        mlflow.set_tag("package_hash", PackageSnapshot.manifest_hash(manifest))
+        logging.info(
+            f"Logged package snapshot of {len(manifest)} files, "
+            f"{len(new_blobs)} of them new"
+        )
+
+    def restore_package_snapshot(self, run_id, target_dir):
+        """
+        Recreates the package logged by a run, downloading each file content
+        from the run holding it
+        :param run_id: Id of the run which logged the package snapshot
+        :param target_dir: Directory to write the files into
+        """
+        client = MlflowClient()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = client.download_artifacts(
+                run_id, "package/manifest.json", tmp_dir
+            )
+            with open(manifest_path) as f:
+                logged = json.load(f)
+
+            blob_paths = {}
+            for digest, blob_run_id in logged["blobs"].items():
+                blob_paths[digest] = client.download_artifacts(
+                    blob_run_id, f"package/blobs/{digest[:2]}/{digest[2:]}", tmp_dir
+                )
+            for relative_path, digest in logged["files"].items():
+                file_path = Path(target_dir, relative_path)
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(blob_paths[digest], file_path)
+
     def end_run(self):
         mlflow.end_run()
+        self.run_id = None
 
     def log_param(self, key, value):
         mlflow.log_param(key, value)
@@ -64,6 +151,39 @@ class MlflowExperimentation(Experimentation):
     def log_metrics(self, metrics, step=None):
         mlflow.log_metrics(metrics, step)
 
+    def log_batch(self, metrics=None, params=None):
+        """
+        Log metrics and params using mlflow's log_batch, which sends
+        up to 1000 metric values in a single request.
+        The run id is passed explicitly so this can be called from any thread.
+        """
+        run_id = self.run_id
+        if run_id is None:
+            active_run = mlflow.active_run()
+            if active_run is None:
+                raise ValueError(
+                    "No active mlflow run, call start_run before logging a batch"
+                )
+            run_id = active_run.info.run_id
+
+        param_entities = [
+            Param(key, str(value)) for key, value in (params or {}).items()
+        ]
+        metric_entities = [
+            Metric(key, value, timestamp, step if step is not None else 0)
+            for key, value, step, timestamp in metrics or []
+        ]
+
+        client = MlflowClient()
+        for i in range(0, len(param_entities), MAX_PARAMS_PER_BATCH):
+            client.log_batch(
+                run_id, params=param_entities[i : i + MAX_PARAMS_PER_BATCH]
+            )
+        for i in range(0, len(metric_entities), MAX_METRICS_PER_BATCH):
+            client.log_batch(
+                run_id, metrics=metric_entities[i : i + MAX_METRICS_PER_BATCH]
+            )
+
     def log_artifact(self, local_path, artifact_path=None):
         mlflow.log_artifact(local_path, artifact_path)
 
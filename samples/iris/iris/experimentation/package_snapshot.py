@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+IGNORED_DIRS = ("__pycache__", ".ipynb_checkpoints")
+IGNORED_SUFFIXES = (".pyc", ".pyo")
+
+
+class PackageSnapshot:
+    """
+    Content addressed store for snapshots of the package code.
+    Every file is stored once, under its sha256 hash. A snapshot is a manifest
+    mapping each relative file path to the hash of its content,
+    so logging an unchanged package only costs the manifest.
+    File hashes are cached by (size, modification time) in an index file,
+    so unchanged files are not even read again.
+    Blobs uploaded to a remote (e.g. a tracking server) are recorded per remote
+    with the id of the run holding them, see add_locations.
+    :param store_dir: Directory of the local content addressed store
+    :param remote: Where the blobs are uploaded to, e.g. the tracking uri
+    """
+
+    def __init__(self, store_dir: str, remote: str = None):
+        self.store_dir = Path(store_dir)
+        self.objects_dir = Path(self.store_dir, "objects")
+        self.index_path = Path(self.store_dir, "index.json")
+        remote_hash = hashlib.sha256(str(remote).encode("utf-8")).hexdigest()
+        self.locations_path = Path(self.store_dir, "locations", f"{remote_hash}.json")
+
+    def take(self, package_dir: str) -> Tuple[Dict[str, str], List[Path]]:
+        """
+        Hashes all files in package_dir and adds new ones to the store
+        :param package_dir: Directory to snapshot
+        :return: The manifest (relative path -> sha256) and
+        the store paths of blobs which were not uploaded to the remote before
+        """
+        package_dir = Path(package_dir).resolve()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        index = self._read_json(self.index_path)
+        locations = self.locations()
+
+        index_changed = False
+        manifest = {}
+        new_blobs = []
+        for file_path in self._list_files(package_dir):
+            stat = file_path.stat()
+            cached = index.get(str(file_path))
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                digest = cached[2]
+            else:
+                digest = self.hash_file(file_path)
+                index[str(file_path)] = [stat.st_size, stat.st_mtime_ns, digest]
+                index_changed = True
+
+            blob_path = self.blob_path(digest)
+            if not blob_path.exists():
+                self._write_atomic(
+                    blob_path, lambda tmp: shutil.copyfile(file_path, tmp)
+                )
+            if digest not in locations:
+                # Files with the same content share their blob
+                locations[digest] = None
+                new_blobs.append(blob_path)
+
+            manifest[file_path.relative_to(package_dir).as_posix()] = digest
+
+        if index_changed:
+            self._write_json(self.index_path, index)
+        return manifest, new_blobs
+
+    def locations(self) -> Dict[str, str]:
+        """
+        Returns the blobs uploaded to the remote (sha256 -> id of the run holding it)
+        """
+        return self._read_json(self.locations_path)
+
+    def add_locations(self, digests: List[str], run_id: str) -> None:
+        """
+        Records that the blobs were uploaded to the remote, in the run run_id
+        """
+        locations = self.locations()
+        locations.update({digest: run_id for digest in digests})
+        self._write_json(self.locations_path, locations)
+
+    def restore(self, manifest: Dict[str, str], target_dir: str) -> None:
+        """
+        Recreates the files of a snapshot from the store
+        :param manifest: Manifest returned by take()
+        :param target_dir: Directory to write the files into
+        """
+        for relative_path, digest in manifest.items():
+            file_path = Path(target_dir, relative_path)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.blob_path(digest), file_path)
+
+    def blob_path(self, digest: str) -> Path:
+        return Path(self.objects_dir, digest[:2], digest[2:])
+
+    @staticmethod
+    def blob_digest(blob_path: Path) -> str:
+        return blob_path.parent.name + blob_path.name
+
+    @staticmethod
+    def manifest_hash(manifest: Dict[str, str]) -> str:
+        """
+        Returns a single hash identifying the entire snapshot
+        """
+        content = json.dumps(manifest, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def hash_file(file_path: Path, chunk_size: int = 1 << 20) -> str:
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def _list_files(package_dir: Path) -> List[Path]:
+        files = []
+        for root, dirs, file_names in os.walk(package_dir):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+            files.extend(
+                Path(root, file_name)
+                for file_name in sorted(file_names)
+                if not file_name.endswith(IGNORED_SUFFIXES)
+            )
+        return files
+
+    @staticmethod
+    def _read_json(path: Path) -> Dict:
+        if not path.exists():
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except ValueError:
+            # Corrupted index, files will be hashed (or blobs uploaded) again
+            return {}
+
+    def _write_json(self, path: Path, content: Dict) -> None:
+        def dump(tmp):
+            with open(tmp, "w") as f:
+                json.dump(content, f)
+
+        self._write_atomic(path, dump)
+
+    @staticmethod
+    def _write_atomic(path: Path, write) -> None:
+        # Write to a temporary file first, so concurrent runs never see partial files
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
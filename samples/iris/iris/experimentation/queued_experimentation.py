@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+from . import Experimentation
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedExperimentation(Experimentation):
+    def __init__(self, experimentation: Experimentation):
+        """
+        Wraps any Experimentation object and executes its calls on a single
+        logger thread, returning immediately.
+        Using one thread keeps the calls in order, and keeps services with a
+        per thread state (e.g. mlflow's active run) consistent.
+        Errors are raised by flush. Only the calls which are not done yet
+        or failed are kept, so memory does not grow with the number of calls
+        :param experimentation: The Experimentation object to log into
+        """
+        super().__init__()
+        self.experimentation = experimentation
+        self.name = experimentation.name
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{self.name}-logger"
+        )
+        # Calls which are not done yet or failed, by id (in submission order)
+        self._futures: Dict[int, Future] = {}
+        self._futures_lock = threading.Lock()
+
+    def _submit(self, method, *args, **kwargs) -> Future:
+        future = self._executor.submit(method, *args, **kwargs)
+        with self._futures_lock:
+            self._futures[id(future)] = future
+        future.add_done_callback(self._forget_if_succeeded)
+        return future
+
+    def _forget_if_succeeded(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            with self._futures_lock:
+                self._futures.pop(id(future), None)
+
+    def _take_futures(self):
+        with self._futures_lock:
+            futures, self._futures = list(self._futures.values()), {}
+        return futures
+
+    def set_experiment(self, name, artifact_location=None):
+        self._submit(
+            self.experimentation.set_experiment,
+            name=name,
+            artifact_location=artifact_location,
+        )
+
+    def start_run(self):
+        self._submit(self.experimentation.start_run)
+
+    def end_run(self):
+        self._submit(self.experimentation.end_run)
+        self.flush()
+
+    def log_param(self, key, value):
+        self._submit(self.experimentation.log_param, key, value)
+
+    def log_params(self, params):
+        self._submit(self.experimentation.log_params, dict(params))
+
+    def log_metric(self, key, value, step=None):
+        self._submit(self.experimentation.log_metric, key, value, step)
+
+    def log_metrics(self, metrics, step=None):
+        self._submit(self.experimentation.log_metrics, dict(metrics), step)
+
+    def log_batch(self, metrics=None, params=None):
+        self._submit(
+            self.experimentation.log_batch,
+            metrics=list(metrics or []),
+            params=dict(params or {}),
+        )
+
+    def log_image(self, title, fig):
+        self._submit(self.experimentation.log_image, title, fig).result()
+
+    def log_artifact(self, local_path, name=None, artifact_path=None):
+        self._submit(
+            self.experimentation.log_artifact, local_path, artifact_path=artifact_path
+        ).result()
+
+    def log_artifacts(self, local_path, name=None, artifact_path=None):
+        self._submit(
+            self.experimentation.log_artifacts, local_path, artifact_path=artifact_path
+        ).result()
+
+    def flush(self) -> None:
+        """
+        Waits until all queued calls are done
+        :raise Exception: If any of the queued calls failed
+        """
+        futures = self._take_futures()
+        errors = [future.exception() for future in futures]
+        self._raise_errors(errors)
+
+    async def flush_async(self) -> None:
+        futures = self._take_futures()
+        results = await asyncio.gather(
+            *[asyncio.wrap_future(future) for future in futures],
+            return_exceptions=True,
+        )
+        self._raise_errors([r for r in results if isinstance(r, BaseException)])
+
+    def pending(self) -> int:
+        """
+        Returns the number of queued calls which are not done yet
+        """
+        with self._futures_lock:
+            return sum(not future.done() for future in self._futures.values())
+
+    @staticmethod
+    def _raise_errors(errors):
+        errors = [error for error in errors if error is not None]
+        if errors:
+            logger.warning(f"{len(errors)} experiment logger calls failed")
+            raise Exception(
+                f"Failed to log to the experiment logger. Exception: {errors[0]}"
+            ) from errors[0]
+
+    def __getstate__(self):
+        # Threads cannot be copied (e.g. into a worker process)
+        self.flush()
+        state = self.__dict__.copy()
+        del state["_executor"]
+        del state["_futures_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._futures_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{self.name}-logger"
+        )
@@ -1,4 +1,13 @@
-from .base_model import BaseModel
-from .svm_model import IrisSVMModel
-__all__ = ["BaseModel", "IrisSVMModel"]
+from iris.lazy_import import lazy_import
 
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "BaseModel": ".base_model",
+        "IrisSVMModel": ".svm_model",
+        "ModelSerializer": ".serialization",
+        "JoblibSerializer": ".serialization",
+    },
+)
+
+__all__ = ["BaseModel", "IrisSVMModel", "ModelSerializer", "JoblibSerializer"]
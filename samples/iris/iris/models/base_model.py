@@ -1,4 +1,5 @@
 import logging
+import os
 import pickle
 from abc import abstractmethod
 
@@ -6,12 +7,19 @@ from iris import LoggableObject
 from iris.data_processing import DataProcessor
 from iris.experimentation import Experimentation
 
+from .serialization import JoblibSerializer, ModelSerializer, load_model, save_model
+
 
 class BaseModel(LoggableObject):
     """
     Abstract class for a model with unified interface
     """
 
+    # Used by save, see iris.models.serialization
+    serializer: ModelSerializer = JoblibSerializer()
+    # Attributes which are not stored by save (they are None after load)
+    unsaved_attributes = ("experiment_logger",)
+
     def __init__(
         self,
         model_name=None,
@@ -87,22 +95,27 @@ class BaseModel(LoggableObject):
 
     def save(self, file_path: str):
         """
-        Stores a model in a pickle. Note that some objects are not pickable.
-        In such case the save method should be overridden.
-        :param file_path: Path to pickle
+        Stores a model in the directory file_path using self.serializer:
+        a manifest.json and the model's state (without unsaved_attributes),
+        with large arrays stored separately so they can be memory mapped on load.
+        Models holding objects the serializer can't store should use
+        another serializer (or override save and load).
+        :param file_path: Path to model directory. An existing model directory
+        is replaced, other existing directories are not (FileExistsError)
         :return:
         """
-        with open(file_path, "wb+") as file:
-            pickle.dump(self, file=file)
+        save_model(self, file_path, self.serializer)
 
     @classmethod
-    def load(cls, file_path):
+    def load(cls, file_path, mmap: bool = True):
         """
-        Loads a model from pickle. Note that some objects are not pickable.
-        In such case the load method should be overridden.
-        :param file_path: Path to pickle file
+        Loads a model stored by save. Pickle files of older versions
+        are loaded as well (unpickled in full).
+        :param file_path: Path to model directory (or pickle file)
+        :param mmap: Whether large arrays should be memory mapped instead of read
         :return: An model of type BaseModel
         """
-        with open(file_path, "rb") as file:
-            obj = pickle.load(file)
-        return obj
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as file:
+                return pickle.load(file)
+        return load_model(file_path, expected_class=cls, mmap=mmap)
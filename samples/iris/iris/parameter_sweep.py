@@ -0,0 +1,275 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+import pandas as pd
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from .data.data_loader import DataLoader
+from .evaluation import EvaluationMetrics, Evaluator
+from .experiment_runner import ExperimentRunner
+from .experimentation import Experimentation
+from .models import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Data shared by all trials running in a worker process.
+# Set once per worker by _init_worker, so the train and test sets
+# are not pickled again for every trial.
+_worker_state = {}
+
+
+def _init_worker(state: Dict) -> None:
+    _worker_state.update(state)
+
+
+def _run_trial(trial_id: int, params: Dict):
+    """
+    Runs one fit/predict/evaluate cycle for a specific set of parameters.
+    Executed inside a worker process (or in-process if n_jobs == 1)
+    """
+    state = _worker_state
+    model = state["model_factory"](**params)
+    experiment_logger = state["experiment_logger"]
+
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=state["X_train"],
+        X_test=state["X_test"],
+        y_train=state["y_train"],
+        y_test=state["y_test"],
+        data_loader=state["data_loader"],
+        evaluator=state["evaluator"],
+        log_experiment=state["log_experiment"],
+        experiment_logger=experiment_logger,
+        experiment_name=state["experiment_name"],
+        sweep_trial=trial_id,
+        **state["experiment_params_to_log"],
+    )
+    try:
+        evaluation_metrics = experiment_runner.run()
+    finally:
+        if state["log_experiment"]:
+            experiment_logger.end_run()
+
+    return trial_id, params, evaluation_metrics
+
+
+class ParameterSweep:
+    def __init__(
+        self,
+        model_factory: Callable[..., BaseModel],
+        X_train,
+        X_test,
+        data_loader: DataLoader,
+        evaluator: Evaluator,
+        y_test=None,
+        y_train=None,
+        param_grid: Dict[str, List] = None,
+        param_distributions: Dict = None,
+        n_iter: int = 10,
+        random_state: int = None,
+        rank_by: str = None,
+        greater_is_better: bool = True,
+        n_jobs: int = None,
+        log_experiment: bool = True,
+        experiment_logger: Experimentation = None,
+        experiment_name: str = None,
+        **experiment_params_to_log,
+    ):
+        """
+        Runs an ExperimentRunner cycle (fit, predict, evaluate) for each
+        parameter configuration, in parallel worker processes.
+        Each trial is logged as a separate run in the experimentation service.
+
+        :param model_factory: Callable which gets one parameter configuration
+        as kwargs and returns a new model instance (of type BaseModel).
+        Must be picklable (e.g. a class or a module level function, not a lambda)
+        :param X_train: Training set
+        :param X_test: Test set
+        :param data_loader: DataLoader instance used to load data
+        :param evaluator: Logic for model and results evaluation
+        :param y_test: Test set tagged values (labels)
+        :param y_train: Training set tagged values (labels)
+        :param param_grid: Dictionary of parameter names to lists of values,
+        every combination is evaluated (see sklearn's ParameterGrid)
+        :param param_distributions: Dictionary of parameter names to lists or
+        scipy distributions, n_iter random configurations are evaluated
+        (see sklearn's ParameterSampler)
+        :param n_iter: Number of configurations to sample from param_distributions
+        :param random_state: Seed for sampling from param_distributions
+        :param rank_by: Name of metric (from EvaluationMetrics.get_metrics())
+        to rank the trials by. Defaults to the first metric returned
+        :param greater_is_better: Whether higher values of rank_by are better
+        :param n_jobs: Number of worker processes. None uses all cores,
+        1 runs all trials sequentially in the current process
+        :param log_experiment: Whether to log the trials
+        into the experimentation service or not
+        :param experiment_logger: Experimentation service instance
+        (e.g. MlflowExperimentation). A copy of it is used in every worker
+        :param experiment_name: Name of experiment,
+        to be used by the experimentation service
+
+        :example:
+
+        class SVMFactory:
+            def __init__(self, features):
+                self.features = features
+
+            def __call__(self, **params):
+                return IrisSVMModel(features=self.features, **params)
+
+        sweep = ParameterSweep(
+            model_factory=SVMFactory(features),
+            X_train=X_train,
+            X_test=X_test,
+            y_train=y_train,
+            y_test=y_test,
+            data_loader=data_loader,
+            evaluator=IrisEvaluator(),
+            param_grid={"kernel": ["linear", "rbf", "poly"]},
+            experiment_logger=experiment_logger,
+            experiment_name="svm-sweep",
+        )
+        results = sweep.run()
+        print(results.head())
+        """
+        if (param_grid is None) == (param_distributions is None):
+            raise ValueError(
+                "Exactly one of param_grid or param_distributions should be passed"
+            )
+
+        if log_experiment:
+            if not experiment_logger:
+                raise ValueError(
+                    "Experimentation system not passed, cannot log experiment"
+                )
+
+            if not experiment_name:
+                raise ValueError(
+                    "Experiment name must be specified for the experiment logging system"
+                )
+
+        self.model_factory = model_factory
+        self.X_train = X_train
+        self.y_train = y_train
+        self.X_test = X_test
+        self.y_test = y_test
+        self.data_loader = data_loader
+        self.evaluator = evaluator
+        self.param_grid = param_grid
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.random_state = random_state
+        self.rank_by = rank_by
+        self.greater_is_better = greater_is_better
+        self.n_jobs = n_jobs
+        self.log_experiment = log_experiment
+        self.experiment_logger = experiment_logger
+        self.experiment_name = experiment_name
+        self.experiment_params_to_log = experiment_params_to_log
+        self._results = None
+
+    def get_trial_params(self) -> List[Dict]:
+        """
+        Returns the list of parameter configurations to evaluate
+        """
+        if self.param_grid is not None:
+            return list(ParameterGrid(self.param_grid))
+
+        return list(
+            ParameterSampler(
+                self.param_distributions,
+                n_iter=self.n_iter,
+                random_state=self.random_state,
+            )
+        )
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs all trials and ranks them
+        :return: DataFrame with one row per trial, holding the trial's parameters,
+        metrics and EvaluationMetrics object, sorted from best to worst
+        """
+        trial_params = self.get_trial_params()
+        state = {
+            "model_factory": self.model_factory,
+            "X_train": self.X_train,
+            "y_train": self.y_train,
+            "X_test": self.X_test,
+            "y_test": self.y_test,
+            "data_loader": self.data_loader,
+            "evaluator": self.evaluator,
+            "log_experiment": self.log_experiment,
+            "experiment_logger": self.experiment_logger,
+            "experiment_name": self.experiment_name,
+            "experiment_params_to_log": self.experiment_params_to_log,
+        }
+
+        logger.info(
+            f"Starting parameter sweep of {len(trial_params)} trials "
+            f"using {self.n_jobs if self.n_jobs else 'all'} workers"
+        )
+
+        if self.n_jobs == 1:
+            _init_worker(state)
+            try:
+                trials = [
+                    _run_trial(trial_id, params)
+                    for trial_id, params in enumerate(trial_params)
+                ]
+            finally:
+                _worker_state.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker, initargs=(state,)
+            ) as executor:
+                futures = [
+                    executor.submit(_run_trial, trial_id, params)
+                    for trial_id, params in enumerate(trial_params)
+                ]
+                trials = [future.result() for future in futures]
+
+        self._results = self._rank(trials)
+        return self._results
+
+    def _rank(self, trials) -> pd.DataFrame:
+        rows = []
+        for trial_id, params, evaluation_metrics in trials:
+            row = {"trial": trial_id}
+            row.update(params)
+            row.update(evaluation_metrics.get_metrics())
+            row["evaluation_metrics"] = evaluation_metrics
+            rows.append(row)
+
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+
+        rank_by = self.rank_by
+        if not rank_by:
+            rank_by = next(iter(trials[0][2].get_metrics()))
+
+        return results.sort_values(
+            by=rank_by, ascending=not self.greater_is_better, kind="stable"
+        ).reset_index(drop=True)
+
+    def get_results(self) -> pd.DataFrame:
+        """
+        Get the ranked results of the last sweep.
+        :return: Ranked trials DataFrame, or None if the sweep was not run yet
+        """
+        if self._results is None:
+            logger.info(
+                "Sweep results are empty. "
+                "Make sure you called `run()` prior to calling this method."
+            )
+        return self._results
+
+    def get_best_metrics(self) -> EvaluationMetrics:
+        """
+        Get the EvaluationMetrics of the best trial in the last sweep
+        """
+        if self._results is None or self._results.empty:
+            return None
+        return self._results.loc[0, "evaluation_metrics"]
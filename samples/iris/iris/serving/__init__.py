@@ -0,0 +1,12 @@
+from iris.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "RequestBatcher": ".request_batcher",
+        "BatchingPredictor": ".batching_predictor",
+        "ModelServer": ".model_server",
+    },
+)
+
+__all__ = ["RequestBatcher", "BatchingPredictor", "ModelServer"]
@@ -0,0 +1,115 @@
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from iris import LoggableObject
+from iris.models import BaseModel
+
+from .request_batcher import RequestBatcher
+
+
+def concat_inputs(inputs: List):
+    """
+    Default batch input: concatenated DataFrames (or numpy arrays, or lists)
+    """
+    if hasattr(inputs[0], "iloc"):
+        import pandas as pd
+
+        return pd.concat(inputs)
+    if isinstance(inputs[0], np.ndarray):
+        return np.concatenate(inputs)
+    return [sample for samples in inputs for sample in samples]
+
+
+class BatchingPredictor(LoggableObject):
+    def __init__(
+        self,
+        model: BaseModel,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        combine: Callable[[List], object] = concat_inputs,
+        predictor_name: str = None,
+    ):
+        """
+        Batches concurrent predict calls of a fitted model.
+        Every call (e.g. one sample, as a one row DataFrame) waits up to
+        max_wait_ms for other calls, then up to max_batch_size calls are
+        combined into one model.predict call (paying the feature selection,
+        preprocessing and model overhead once), and each caller gets its
+        slice of the predictions through a Future.
+        :param model: Fitted model
+        :param max_batch_size: Maximum number of calls predicted together
+        :param max_wait_ms: Maximum time a call waits for more calls to batch with
+        :param combine: Combines the inputs of several calls into one predict input.
+        The default concatenates DataFrames, numpy arrays or lists
+        :param predictor_name: Name of predictor, for logging purposes
+
+        :example:
+
+        predictor = BatchingPredictor(model, max_batch_size=64, max_wait_ms=1)
+        # From many threads (e.g. request handlers):
+        predictions = predictor.predict(X.iloc[[i]])
+        print(predictor.get_metrics()["batching/latency_p99_ms"])
+        predictor.close()
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.combine = combine
+        self.batcher = RequestBatcher(
+            self._predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+        )
+        super().__init__(name=predictor_name)
+
+    def submit(self, X) -> Future:
+        """
+        Adds X (e.g. one sample) to the next batch
+        :return: Future of model.predict(X)
+        """
+        return self.batcher.submit(X)
+
+    def predict(self, X):
+        """
+        Same as model.predict(X), predicted together with concurrent calls
+        """
+        return self.submit(X).result()
+
+    def _predict_batch(self, inputs: List) -> Future:
+        # Called by the batcher thread, so a single model.predict runs at a time
+        result = Future()
+        try:
+            predictions = self.model.predict(self.combine(inputs))
+            outputs = []
+            start = 0
+            for X in inputs:
+                outputs.append(predictions[start : start + len(X)])
+                start += len(X)
+            result.set_result(outputs)
+        except Exception as e:
+            result.set_exception(e)
+        return result
+
+    def close(self) -> None:
+        """
+        Predicts the pending calls and stops batching
+        """
+        self.batcher.close()
+
+    def __enter__(self) -> "BatchingPredictor":
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def get_params(self) -> Dict:
+        return {
+            "batching_max_batch_size": self.max_batch_size,
+            "batching_max_wait_ms": self.max_wait_ms,
+        }
+
+    def get_metrics(self) -> Dict:
+        return {
+            f"batching/{name}": value
+            for name, value in self.batcher.get_metrics().items()
+        }
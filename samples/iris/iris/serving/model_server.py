@@ -0,0 +1,432 @@
+import gc
+import itertools
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import traceback
+from concurrent.futures import Future
+from time import perf_counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from iris import LoggableObject
+from iris.models import BaseModel
+
+from .request_batcher import RequestBatcher
+
+logger = logging.getLogger(__name__)
+
+# How often the result collector checks that the workers are still alive
+WORKER_CHECK_INTERVAL_SEC = 1.0
+
+
+def records_to_frame(instances: List[Dict]):
+    """
+    Default model input: one DataFrame row per instance (a dict of feature values)
+    """
+    import pandas as pd
+
+    return pd.DataFrame.from_records(instances)
+
+
+def predictions_to_list(predictions) -> List:
+    """
+    Default model output conversion: one JSON serializable value per instance
+    """
+    return np.asarray(predictions).tolist()
+
+
+def _serve_worker(
+    worker_id: int,
+    model_path: str,
+    model: BaseModel,
+    requests,
+    results,
+    to_model_input: Callable,
+    from_model_output: Callable,
+) -> None:
+    """
+    Predicts batches until a None batch is received.
+    Runs in a worker process. Forked workers get the parent's model
+    (sharing its memory copy-on-write), others load it from model_path
+    (sharing its memory mapped arrays).
+    If a batch fails, its instances are predicted one by one, so only the
+    failing instances (e.g. missing a feature) get an error, not the
+    concurrent requests batched with them
+    """
+    if model is None:
+        model = BaseModel.load(model_path)
+
+    def predict(instances):
+        return from_model_output(model.predict(to_model_input(instances)))
+
+    for batch_id, instances in iter(requests.get, None):
+        errors = None
+        try:
+            outputs = predict(instances)
+        except Exception:
+            if len(instances) == 1:
+                outputs, errors = [None], [traceback.format_exc()]
+            else:
+                outputs, errors = [], []
+                for instance in instances:
+                    try:
+                        outputs.append(predict([instance])[0])
+                        errors.append(None)
+                    except Exception:
+                        outputs.append(None)
+                        errors.append(traceback.format_exc())
+        results.put((worker_id, batch_id, outputs, errors))
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 resets connections of concurrent clients
+    request_queue_size = 128
+
+
+class ModelServer(LoggableObject):
+    def __init__(
+        self,
+        model_path: str,
+        n_workers: int = 2,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        start_method: str = "fork",
+        to_model_input: Callable[[List], object] = records_to_frame,
+        from_model_output: Callable[[object], List] = predictions_to_list,
+        server_name: str = None,
+    ):
+        """
+        Serves a saved BaseModel over HTTP, using several worker processes.
+        The model is loaded once (see BaseModel.load) before the workers are
+        forked, so they share its weights copy-on-write (and memory mapped arrays
+        through the page cache). Incoming instances are micro-batched
+        (see RequestBatcher) and every batch is predicted by a free worker
+        using one model.predict call.
+        A worker which dies (e.g. killed when out of memory) fails the batch
+        it was predicting and is not replaced. /health returns 503 once all
+        workers are gone, so the server can be restarted.
+
+        Endpoints:
+        POST /predict with {"instances": [...]} returns {"predictions": [...]}
+        GET /metrics returns the latency and throughput metrics (see get_metrics)
+        GET /health
+
+        :param model_path: Path of a model stored by BaseModel.save
+        :param n_workers: Number of worker processes
+        :param max_batch_size: Maximum number of instances per predict call
+        :param max_wait_ms: Maximum time an instance waits for more instances
+        to batch with
+        :param host: Address to listen on
+        :param port: Port to listen on, 0 picks a free port (see self.port)
+        :param start_method: multiprocessing start method. With "spawn" or
+        "forkserver", every worker loads the model from model_path itself
+        :param to_model_input: Converts a list of instances (parsed from JSON)
+        into the model's predict input. Defaults to a DataFrame of one row per instance
+        :param from_model_output: Converts predict's output into a list with
+        a JSON serializable prediction per instance
+        :param server_name: Name of server, for logging purposes
+
+        :example:
+
+        model.save("../models/iris-svm")
+        with ModelServer("../models/iris-svm", n_workers=4, port=8080) as server:
+            server.serve_forever()
+
+        # Or, in the same process (e.g. from a web framework's handler):
+        predictions = server.predict([{"sepal length (cm)": 5.1, ...}])
+        """
+        self.model_path = str(model_path)
+        self.n_workers = n_workers
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.host = host
+        self.port = port
+        self.start_method = start_method
+        self.to_model_input = to_model_input
+        self.from_model_output = from_model_output
+
+        self.model = None
+        self.batcher = None
+        self._workers = []
+        self._worker_requests = []  # A request queue per worker
+        self._results = None
+        self._pending: Dict[int, Future] = {}
+        self._in_flight: Dict[int, int] = {}  # Worker id to batch id
+        self._pending_lock = threading.Lock()
+        self._batch_ids = itertools.count()
+        self._free_workers = queue.Queue()
+        self._dead_workers = set()
+        self._stopping = False
+        self._collector = None
+        self._http_server = None
+        super().__init__(name=server_name)
+
+    def start(self) -> "ModelServer":
+        """
+        Loads the model, starts the workers and the HTTP server
+        (which handles requests in a background thread)
+        """
+        context = multiprocessing.get_context(self.start_method)
+        forked = self.start_method == "fork"
+        self.model = BaseModel.load(self.model_path)
+        self._results = context.Queue()
+        self._stopping = False
+
+        if forked:
+            # Objects in the permanent generation are not touched by the
+            # garbage collector, which keeps the workers' pages shared
+            gc.collect()
+            gc.freeze()
+        for worker_id in range(self.n_workers):
+            requests = context.Queue()
+            worker = context.Process(
+                target=_serve_worker,
+                args=(
+                    worker_id,
+                    self.model_path,
+                    self.model if forked else None,
+                    requests,
+                    self._results,
+                    self.to_model_input,
+                    self.from_model_output,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+            self._worker_requests.append(requests)
+            self._free_workers.put(worker_id)
+        if forked:
+            gc.unfreeze()
+
+        self._collector = threading.Thread(
+            target=self._collect_results, name="ModelServerResults", daemon=True
+        )
+        self._collector.start()
+        self.batcher = RequestBatcher(
+            self._run_batch,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+        )
+
+        handler = type(
+            "ModelRequestHandler", (_ModelRequestHandler,), {"model_server": self}
+        )
+        self._http_server = _HTTPServer((self.host, self.port), handler)
+        self.port = self._http_server.server_address[1]
+        threading.Thread(
+            target=self._http_server.serve_forever, name="ModelServerHTTP", daemon=True
+        ).start()
+        logger.info(
+            f"Serving {self.model.name} on http://{self.host}:{self.port} "
+            f"with {self.n_workers} workers"
+        )
+        return self
+
+    def predict(self, instances: List) -> List:
+        """
+        Predicts a list of instances, each of them batched with concurrent requests
+        :return: One prediction per instance
+        """
+        futures = [self.batcher.submit(instance) for instance in instances]
+        return [future.result() for future in futures]
+
+    def serve_forever(self) -> None:
+        """
+        Blocks until interrupted (e.g. with Ctrl+C), then stops the server
+        """
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """
+        Stops accepting requests, waits for the pending batches
+        and stops the workers
+        """
+        if self._http_server:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server = None
+        self._stopping = True
+        if self.batcher:
+            self.batcher.close()
+        for requests in self._worker_requests:
+            requests.put(None)
+        for worker in self._workers:
+            worker.join()
+        if self._collector:
+            self._results.put(None)
+            self._collector.join()
+            self._collector = None
+        self._workers = []
+        self._worker_requests = []
+        self._dead_workers = set()
+        self._free_workers = queue.Queue()
+
+    def workers_alive(self) -> int:
+        return len(self._workers) - len(self._dead_workers)
+
+    def _run_batch(self, instances: List) -> Future:
+        # Wait for a free worker, so instances keep accumulating in the batcher
+        future = Future()
+        batch_id = next(self._batch_ids)
+        while True:
+            if not self.workers_alive():
+                raise RuntimeError("All model server workers exited")
+            try:
+                worker_id = self._free_workers.get(timeout=WORKER_CHECK_INTERVAL_SEC)
+            except queue.Empty:
+                continue
+            with self._pending_lock:
+                # Dead workers are dropped from the free workers
+                if worker_id in self._dead_workers:
+                    continue
+                if not self._workers[worker_id].is_alive():
+                    continue
+                self._pending[batch_id] = future
+                self._in_flight[worker_id] = batch_id
+            break
+        self._worker_requests[worker_id].put((batch_id, instances))
+        return future
+
+    def _collect_results(self) -> None:
+        last_check = perf_counter()
+        while True:
+            try:
+                result = self._results.get(timeout=WORKER_CHECK_INTERVAL_SEC)
+            except queue.Empty:
+                result = False
+            if result is None:
+                break
+            if result:
+                self._set_result(*result)
+            if perf_counter() - last_check >= WORKER_CHECK_INTERVAL_SEC:
+                self._check_workers()
+                last_check = perf_counter()
+
+    def _set_result(self, worker_id: int, batch_id: int, outputs: List, errors):
+        with self._pending_lock:
+            future = self._pending.pop(batch_id, None)
+            self._in_flight.pop(worker_id, None)
+        if future is None:
+            # Already failed by _check_workers
+            return
+        self._free_workers.put(worker_id)
+
+        if errors:
+            # Failed instances get an exception in place of their prediction
+            # (see RequestBatcher), the others their prediction
+            for i, error in enumerate(errors):
+                if error is not None:
+                    logger.error(f"Prediction failed in worker:\n{error}")
+                    outputs[i] = RuntimeError(error.strip().splitlines()[-1])
+        future.set_result(outputs)
+
+    def _check_workers(self) -> None:
+        """
+        Fails the batch of every worker which exited unexpectedly
+        (e.g. killed when out of memory), so its requests don't wait forever
+        """
+        if self._stopping:
+            return
+        for worker_id, worker in enumerate(self._workers):
+            if worker_id in self._dead_workers or worker.is_alive():
+                continue
+            with self._pending_lock:
+                self._dead_workers.add(worker_id)
+                batch_id = self._in_flight.pop(worker_id, None)
+                future = self._pending.pop(batch_id, None)
+            logger.error(
+                f"Worker {worker.pid} exited with code {worker.exitcode}, "
+                f"{self.workers_alive()} workers left"
+            )
+            if future is not None:
+                future.set_exception(
+                    RuntimeError(
+                        f"Model server worker exited with code {worker.exitcode} "
+                        "while predicting"
+                    )
+                )
+
+    def __enter__(self) -> "ModelServer":
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def get_params(self) -> Dict:
+        return {
+            "serving_model_path": self.model_path,
+            "serving_workers": self.n_workers,
+            "serving_max_batch_size": self.max_batch_size,
+            "serving_max_wait_ms": self.max_wait_ms,
+        }
+
+    def get_metrics(self) -> Dict:
+        if not self.batcher:
+            return {}
+        return {
+            f"serving/{name}": value
+            for name, value in self.batcher.get_metrics().items()
+        }
+
+
+class _ModelRequestHandler(BaseHTTPRequestHandler):
+    # Set per server, see ModelServer.start
+    model_server: ModelServer = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            workers_alive = self.model_server.workers_alive()
+            self._reply(
+                200 if workers_alive else 503,
+                {
+                    "status": "ok" if workers_alive else "unavailable",
+                    "model": self.model_server.model.name,
+                    "workers_alive": workers_alive,
+                },
+            )
+        elif self.path == "/metrics":
+            self._reply(200, self.model_server.get_metrics())
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            instances = json.loads(self.rfile.read(length))["instances"]
+            if not isinstance(instances, list):
+                raise TypeError("instances should be a list")
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {"error": f"Invalid request: {e!r}"})
+            return
+
+        try:
+            self._reply(200, {"predictions": self.model_server.predict(instances)})
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+
+    def _reply(self, status: int, body: Dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
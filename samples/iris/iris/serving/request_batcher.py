@@ -0,0 +1,164 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from iris import LoggableObject
+from iris.evaluation.time_took import SpanHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBatcher(LoggableObject):
+    def __init__(
+        self,
+        run_batch: Callable[[List], Future],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_samples: int = 10000,
+        batcher_name: str = None,
+    ):
+        """
+        Groups single items submitted concurrently (e.g. one sample per request)
+        into batches. A batch is dispatched once it holds max_batch_size items,
+        or max_wait_ms after its first item arrived, whichever comes first.
+        Results are returned to each caller through a Future.
+        While run_batch blocks (e.g. all workers are busy), new items keep
+        accumulating, so batches grow with the load.
+        :param run_batch: Gets a list of items and returns a Future of
+        the list of their results (in the same order). An exception in place
+        of an item's result fails that item only
+        :param max_batch_size: Maximum number of items per batch
+        :param max_wait_ms: Maximum time to wait for more items
+        before dispatching a partial batch
+        :param max_samples: Number of latencies kept for percentiles
+        :param batcher_name: Name of batcher, for logging purposes
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.latencies = SpanHistogram(max_samples)
+        self.batch_sizes = SpanHistogram(max_samples)
+        self._first_submit = None
+        self._last_result = None
+        self._lock = threading.Lock()
+        self._items = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, name="RequestBatcher", daemon=True
+        )
+        self._thread.start()
+        super().__init__(name=batcher_name)
+
+    def submit(self, item: Any) -> Future:
+        """
+        Adds an item to the next batch
+        :return: Future of the item's result
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed RequestBatcher")
+        future = Future()
+        submitted = perf_counter()
+        with self._lock:
+            if self._first_submit is None:
+                self._first_submit = submitted
+        self._items.put((item, future, submitted))
+        return future
+
+    def close(self) -> None:
+        """
+        Dispatches the pending items and stops the dispatching thread
+        """
+        if not self._closed:
+            self._closed = True
+            self._items.put(None)
+            self._thread.join()
+
+    def _dispatch_loop(self) -> None:
+        stop = False
+        while not stop:
+            first = self._items.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = perf_counter() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - perf_counter()
+                try:
+                    entry = (
+                        self._items.get(timeout=timeout)
+                        if timeout > 0
+                        else self._items.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List) -> None:
+        items = [item for item, _, _ in batch]
+        try:
+            results = self.run_batch(items)
+        except Exception as e:
+            results = Future()
+            results.set_exception(e)
+        results.add_done_callback(lambda done: self._scatter(batch, done))
+
+    def _scatter(self, batch: List, done: Future) -> None:
+        error = done.exception()
+        if error is None and len(done.result()) != len(batch):
+            error = ValueError(
+                f"Got {len(done.result())} results for a batch of {len(batch)} items"
+            )
+
+        finished = perf_counter()
+        with self._lock:
+            self._last_result = finished
+            self.batch_sizes.add(len(batch))
+            for _, _, submitted in batch:
+                self.latencies.add(finished - submitted)
+
+        for i, (_, future, _) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            elif isinstance(done.result()[i], BaseException):
+                future.set_exception(done.result()[i])
+            else:
+                future.set_result(done.result()[i])
+
+    def get_params(self) -> Dict:
+        return {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait_ms}
+
+    def get_metrics(self) -> Dict:
+        """
+        Latency (from submit until the result is available) percentiles,
+        batch sizes, and throughput since the first submitted item
+        """
+        with self._lock:
+            elapsed = (
+                self._last_result - self._first_submit
+                if self._last_result is not None
+                else 0.0
+            )
+            return {
+                "requests": self.latencies.count,
+                "batches": self.batch_sizes.count,
+                "mean_batch_size": self.batch_sizes.total / self.batch_sizes.count
+                if self.batch_sizes.count
+                else 0.0,
+                "latency_p50_ms": self.latencies.percentile(50) * 1000,
+                "latency_p95_ms": self.latencies.percentile(95) * 1000,
+                "latency_p99_ms": self.latencies.percentile(99) * 1000,
+                "latency_max_ms": self.latencies.max * 1000,
+                "throughput_per_sec": self.latencies.count / elapsed
+                if elapsed > 0
+                else 0.0,
+            }
@@ -0,0 +1,13 @@
+import mlflow
+import pytest
+
+
+@pytest.fixture
+def no_active_mlflow_run():
+    """
+    Ends the mlflow run an earlier test left active (possibly in another
+    tracking store), and the run left active by the test itself
+    """
+    mlflow.end_run()
+    yield
+    mlflow.end_run()
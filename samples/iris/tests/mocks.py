@@ -0,0 +1,84 @@
+from iris.experimentation import Experimentation
+
+
+class MockExperimentation(Experimentation):
+    def __init__(self):
+        self.params = {}
+        self.metrics = {}
+        super().__init__()
+
+    def set_experiment(self, name, artifact_location=None):
+        pass
+
+    def start_run(self):
+        pass
+
+    def end_run(self):
+        pass
+
+    def log_param(self, key, value):
+        self.params[key] = value
+
+    def log_params(self, params):
+        self.params.update(params)
+
+    def log_metric(self, key, value, step=None):
+        self.metrics[key] = value
+
+    def log_metrics(self, metrics, step=None):
+        self.metrics.update(metrics)
+
+    def log_image(self, title, fig):
+        pass
+
+    def log_artifact(self, local_path, name=None, artifact_path=None):
+        pass
+
+    def log_artifacts(self, local_path, name=None, artifact_path=None):
+        pass
+
+
+class RecordingExperimentation(MockExperimentation):
+    """
+    Records the start_run and end_run calls, the params and metrics logged
+    in each run, and the (metrics, params) batches sent with log_batch
+    :param fail: Whether log_batch raises, like an unreachable tracking server
+    """
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.runs = []
+        self.batches = []
+        self.fail = fail
+        super().__init__()
+
+    def start_run(self):
+        self.calls.append("start_run")
+        self.runs.append({"params": {}, "metrics": {}})
+
+    def end_run(self):
+        self.calls.append("end_run")
+
+    def log_param(self, key, value):
+        super().log_param(key, value)
+        self.runs[-1]["params"][key] = value
+
+    def log_params(self, params):
+        super().log_params(params)
+        self.runs[-1]["params"].update(params)
+
+    def log_metric(self, key, value, step=None):
+        super().log_metric(key, value, step)
+        self.runs[-1]["metrics"][key] = value
+
+    def log_metrics(self, metrics, step=None):
+        super().log_metrics(metrics, step)
+        self.runs[-1]["metrics"].update(metrics)
+
+    def log_batch(self, metrics=None, params=None):
+        if self.fail:
+            raise ValueError("Tracking server is down")
+        self.batches.append((metrics, params))
+
+    def logged_metrics(self):
+        return [metric for metrics, _ in self.batches for metric in metrics]
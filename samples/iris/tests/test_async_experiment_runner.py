@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.model_selection import train_test_split
+
+from iris import AsyncExperimentRunner, ExperimentRunner
+from iris.data import IrisDataLoader
+from iris.evaluation import IrisEvaluator
+from iris.experimentation import QueuedExperimentation
+from iris.models import IrisSVMModel
+from tests.mocks import MockExperimentation
+
+LOGGER_LATENCY = 0.01
+
+
+class SlowExperimentation(MockExperimentation):
+    """
+    Simulates a remote tracking server, and records the thread of each call
+    """
+
+    def __init__(self):
+        self.threads = set()
+        super().__init__()
+
+    def _call(self):
+        self.threads.add(threading.get_ident())
+        time.sleep(LOGGER_LATENCY)
+
+    def start_run(self):
+        self._call()
+
+    def log_params(self, params):
+        self._call()
+        super().log_params(params)
+
+    def log_param(self, key, value):
+        self._call()
+        super().log_param(key, value)
+
+    def log_metrics(self, metrics, step=None):
+        self._call()
+        super().log_metrics(metrics, step)
+
+
+class SlowModel(IrisSVMModel):
+    def fit(self, X, y=None) -> None:
+        time.sleep(0.2)
+        super().fit(X, y)
+
+
+def make_runner(runner_class, experiment_logger, model=None, **kwargs):
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    return runner_class(
+        model=model or SlowModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        experiment_logger=experiment_logger,
+        experiment_name="async",
+        **kwargs,
+    )
+
+
+def test_async_runner_logs_the_same_run():
+    sync_logger = SlowExperimentation()
+    sync_results = make_runner(ExperimentRunner, sync_logger).run()
+
+    async_logger = SlowExperimentation()
+    start = time.perf_counter()
+    runner = make_runner(AsyncExperimentRunner, async_logger)
+    setup_time = time.perf_counter() - start
+    async_results = runner.run()
+
+    assert async_results.get_metrics() == sync_results.get_metrics()
+    assert async_logger.params == sync_logger.params
+    assert set(async_logger.metrics) == set(sync_logger.metrics)
+    # Logging was queued, and done by a single (non main) thread
+    assert setup_time < LOGGER_LATENCY
+    assert len(async_logger.threads) == 1
+    assert threading.get_ident() not in async_logger.threads
+
+
+def test_run_async_overlaps_logging_with_compute():
+    async def run_all(runners):
+        return await asyncio.gather(*[runner.run_async() for runner in runners])
+
+    loggers = [SlowExperimentation() for _ in range(2)]
+    runners = [make_runner(AsyncExperimentRunner, logger) for logger in loggers]
+    start = time.perf_counter()
+    results = asyncio.run(run_all(runners))
+
+    # Both fits (0.2 seconds each) ran concurrently
+    assert time.perf_counter() - start < 0.4
+    assert results[0].get_metrics() == results[1].get_metrics()
+    assert set(loggers[0].metrics) == set(loggers[1].metrics)
+
+
+def test_run_async_predicts_in_chunks_only():
+    predicted_sizes = []
+
+    class RecordingModel(IrisSVMModel):
+        def predict(self, X):
+            predicted_sizes.append(len(X))
+            return super().predict(X)
+
+    runner = make_runner(
+        AsyncExperimentRunner,
+        SlowExperimentation(),
+        model=RecordingModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        evaluation_chunk_size=10,
+    )
+    expected = make_runner(ExperimentRunner, MockExperimentation()).run()
+    results = asyncio.run(runner.run_async())
+
+    assert predicted_sizes == [10, 10, 10, 10, 5]
+    assert results.get_metrics() == expected.get_metrics()
+
+
+def test_queued_experimentation_raises_errors_on_flush():
+    class FailingExperimentation(MockExperimentation):
+        def log_metric(self, key, value, step=None):
+            raise ValueError("Tracking server unavailable")
+
+    experiment_logger = QueuedExperimentation(FailingExperimentation())
+    experiment_logger.log_metric("loss", 1.0)
+
+    with pytest.raises(Exception, match="Tracking server unavailable"):
+        experiment_logger.flush()
+
+
+def test_queued_experimentation_keeps_only_failed_or_pending_calls():
+    class FailingExperimentation(MockExperimentation):
+        def log_param(self, key, value):
+            raise ValueError("Tracking server unavailable")
+
+    experiment_logger = QueuedExperimentation(FailingExperimentation())
+    for step in range(1000):
+        experiment_logger.log_metric("loss", 1.0 / (step + 1), step=step)
+    experiment_logger.log_param("kernel", "rbf")
+
+    deadline = time.time() + 5
+    while len(experiment_logger._futures) > 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(experiment_logger._futures) == 1
+    assert experiment_logger.pending() == 0
+    assert experiment_logger.experimentation.metrics["loss"] == 1.0 / 1000
+    with pytest.raises(Exception, match="Tracking server unavailable"):
+        experiment_logger.flush()
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+
+from iris.models import IrisSVMModel
+from iris.serving import BatchingPredictor
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+class CountingSVMModel(IrisSVMModel):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.predict_calls = 0
+
+    def predict(self, X):
+        self.predict_calls += 1
+        return super().predict(X)
+
+
+@pytest.fixture
+def fitted_model():
+    iris = load_iris(as_frame=True)
+    model = CountingSVMModel(features=FEATURES, kernel="rbf")
+    model.fit(iris.data, iris.target)
+    return model, iris.data
+
+
+def test_concurrent_calls_are_batched(fitted_model):
+    model, X = fitted_model
+    expected = model.predict(X)
+    model.predict_calls = 0
+    results = [None] * len(X)
+
+    with BatchingPredictor(model, max_batch_size=50, max_wait_ms=20) as predictor:
+        barrier = threading.Barrier(len(X))
+
+        def call(i):
+            barrier.wait()
+            results[i] = predictor.predict(X.iloc[[i]])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(len(X))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert all(len(result) == 1 for result in results)
+    np.testing.assert_array_equal(np.concatenate(results), expected)
+    assert model.predict_calls < len(X)
+
+    metrics = predictor.get_metrics()
+    assert metrics["batching/requests"] == len(X)
+    assert metrics["batching/batches"] == model.predict_calls
+    assert metrics["batching/mean_batch_size"] > 1
+    assert metrics["batching/throughput_per_sec"] > 0
+
+
+def test_multi_row_calls_get_their_slice(fitted_model):
+    model, X = fitted_model
+    with BatchingPredictor(model, max_wait_ms=20) as predictor:
+        futures = [predictor.submit(X.iloc[i : i + 3]) for i in range(0, 30, 3)]
+        results = [future.result() for future in futures]
+
+    for i, result in zip(range(0, 30, 3), results):
+        np.testing.assert_array_equal(result, model.predict(X.iloc[i : i + 3]))
+
+
+def test_predict_errors_reach_every_caller(fitted_model):
+    model, X = fitted_model
+    with BatchingPredictor(model, max_wait_ms=20) as predictor:
+        missing_features = X[["petal width (cm)"]]
+        futures = [predictor.submit(missing_features.iloc[[i]]) for i in range(3)]
+        for future in futures:
+            with pytest.raises(KeyError):
+                future.result()
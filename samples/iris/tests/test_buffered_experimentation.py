@@ -0,0 +1,112 @@
+import pickle
+import time
+
+import pytest
+
+from iris.experimentation import BufferedExperimentation, MlflowExperimentation
+from tests.mocks import RecordingExperimentation
+
+
+def test_buffered_experimentation_drains_on_end_run():
+    backend = RecordingExperimentation()
+    experiment_logger = BufferedExperimentation(backend, flush_interval=60)
+    experiment_logger.start_run()
+    experiment_logger.log_param("kernel", "rbf")
+    experiment_logger.log_params({"C": 1.0})
+    for step in range(10):
+        experiment_logger.log_metric("loss", 1.0 / (step + 1), step=step)
+    experiment_logger.log_metrics({"accuracy": 0.9, "f1": 0.8})
+
+    assert backend.batches == []
+    experiment_logger.end_run()
+
+    assert backend.calls == ["start_run", "end_run"]
+    # Values are only logged in batches
+    assert backend.runs == [{"params": {}, "metrics": {}}]
+    assert len(backend.batches) == 1
+    metrics, params = backend.batches[0]
+    assert params == {"kernel": "rbf", "C": 1.0}
+    assert [(key, step) for key, _, step, _ in metrics[:10]] == [
+        ("loss", step) for step in range(10)
+    ]
+    assert {key for key, _, _, _ in metrics[10:]} == {"accuracy", "f1"}
+
+
+def test_buffered_experimentation_rejects_changed_params():
+    backend = RecordingExperimentation()
+    experiment_logger = BufferedExperimentation(backend, flush_interval=60)
+    experiment_logger.start_run()
+    experiment_logger.log_param("kernel", "rbf")
+    experiment_logger.flush()
+    experiment_logger.log_params({"kernel": "rbf", "C": 1})
+
+    with pytest.raises(ValueError, match="kernel"):
+        experiment_logger.log_param("kernel", "linear")
+    experiment_logger.end_run()
+
+    assert [params for _, params in backend.batches] == [
+        {"kernel": "rbf"},
+        {"kernel": "rbf", "C": 1},
+    ]
+
+    # A new run can log other values
+    experiment_logger.start_run()
+    experiment_logger.log_param("kernel", "linear")
+    experiment_logger.end_run()
+
+
+def test_buffered_experimentation_flushes_on_batch_size():
+    backend = RecordingExperimentation()
+    experiment_logger = BufferedExperimentation(
+        backend, max_batch_size=100, flush_interval=60
+    )
+    experiment_logger.start_run()
+    for step in range(250):
+        experiment_logger.log_metric("loss", step, step=step)
+
+    deadline = time.time() + 5
+    while len(backend.logged_metrics()) < 200 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(backend.logged_metrics()) >= 200
+
+    experiment_logger.end_run()
+    assert [step for _, _, step, _ in backend.logged_metrics()] == list(range(250))
+
+
+def test_buffered_experimentation_flushes_on_interval():
+    backend = RecordingExperimentation()
+    experiment_logger = BufferedExperimentation(backend, flush_interval=0.05)
+    experiment_logger.start_run()
+    experiment_logger.log_metric("loss", 0.5)
+
+    deadline = time.time() + 5
+    while not backend.batches and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(backend.logged_metrics()) == 1
+    assert experiment_logger.pending() == 0
+    experiment_logger.end_run()
+
+
+def test_buffered_experimentation_raises_backend_errors():
+    backend = RecordingExperimentation(fail=True)
+    experiment_logger = BufferedExperimentation(backend, flush_interval=60)
+    experiment_logger.start_run()
+    experiment_logger.log_metric("loss", 0.5)
+
+    with pytest.raises(Exception, match="Tracking server is down"):
+        experiment_logger.end_run()
+    assert backend.calls == ["start_run", "end_run"]
+
+
+def test_mlflow_log_batch_requires_active_run():
+    with pytest.raises(ValueError, match="No active mlflow run"):
+        MlflowExperimentation().log_batch(metrics=[("loss", 0.5, 0, 0)])
+
+
+def test_buffered_experimentation_is_picklable():
+    experiment_logger = BufferedExperimentation(RecordingExperimentation())
+    copy = pickle.loads(pickle.dumps(experiment_logger))
+    copy.start_run()
+    copy.log_metric("loss", 0.5)
+    copy.end_run()
+    assert len(copy.experimentation.batches) == 1
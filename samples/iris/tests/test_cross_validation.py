@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.model_selection import KFold, StratifiedKFold
+
+from iris import ExperimentRunner
+from iris.data import IrisDataLoader
+from iris.evaluation import CrossValidationMetrics, IrisEvaluator
+from iris.models import IrisSVMModel
+from tests.mocks import MockExperimentation
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+class StepMockExperimentation(MockExperimentation):
+    def __init__(self):
+        self.steps = []
+        super().__init__()
+
+    def log_metric(self, key, value, step=None):
+        self.steps.append((key, value, step))
+        super().log_metric(key, value, step)
+
+
+@pytest.fixture
+def iris_data():
+    iris = load_iris(as_frame=True)
+    return iris.data, iris.target
+
+
+def make_runner(X, y, experiment_logger=None):
+    return ExperimentRunner(
+        model=IrisSVMModel(features=FEATURES),
+        X_train=X,
+        X_test=None,
+        y_train=y,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        log_experiment=experiment_logger is not None,
+        experiment_logger=experiment_logger,
+        experiment_name="CrossValidation",
+    )
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_cross_validate_matches_manual_folds(iris_data, n_jobs):
+    X, y = iris_data
+    splitter = StratifiedKFold(n_splits=4, shuffle=True, random_state=0)
+
+    result = make_runner(X, y).cross_validate(splitter, n_jobs=n_jobs)
+
+    expected = []
+    for train_index, test_index in splitter.split(X, y):
+        model = IrisSVMModel(features=FEATURES)
+        model.fit(X.iloc[train_index], y.iloc[train_index])
+        predictions = model.predict(X.iloc[test_index])
+        expected.append(np.mean(predictions == y.iloc[test_index].values))
+
+    assert isinstance(result, CrossValidationMetrics)
+    assert [result.get_metrics(step)["accuracy"] for step in result.get_steps()] == (
+        pytest.approx(expected)
+    )
+    assert result.get_metrics()["accuracy_mean"] == pytest.approx(np.mean(expected))
+    assert result.get_metrics()["accuracy_std"] == pytest.approx(np.std(expected))
+
+
+def test_cross_validate_logs_folds_as_steps(iris_data):
+    X, y = iris_data
+    experiment_logger = StepMockExperimentation()
+    runner = make_runner(X, y, experiment_logger)
+
+    result = runner.cross_validate(KFold(n_splits=3), n_jobs=1)
+
+    fold_steps = [(step, value) for key, value, step in experiment_logger.steps]
+    assert fold_steps == [
+        (fold, result.get_metrics(fold)["accuracy"]) for fold in range(3)
+    ]
+    assert experiment_logger.params["cv_folds"] == 3
+    assert experiment_logger.params["cv_splitter"] == "KFold"
+    assert "accuracy_mean" in experiment_logger.metrics
+    assert experiment_logger.metrics["timing/cross_validate/fit/count"] == 3
+    # The runner's model is left unfitted
+    assert runner.model.model is None
@@ -1,10 +1,16 @@
+from pathlib import Path
 from typing import Dict
 
-from iris.data import DataLoader
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.model_selection import train_test_split
+
+from iris.data import DataLoader, IrisDataLoader
 from iris.experimentation import Experimentation, MlflowExperimentation
-from iris.models import BaseModel
-from iris.evaluation import Evaluator, EvaluationMetrics
+from iris.models import BaseModel, IrisSVMModel
+from iris.evaluation import Evaluator, EvaluationMetrics, IrisEvaluator, RunProfiler
 from iris import ExperimentRunner
+from tests.mocks import MockExperimentation
 
 
 class MockModel(BaseModel):
@@ -97,3 +103,212 @@ def test_experiment_runner():
 
     assert results.precision == expected_precision
     assert results.recall == expected_recall
+
+
+def test_experiment_runner_evaluates_in_chunks():
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    model = IrisSVMModel(features=["sepal length (cm)", "sepal width (cm)"])
+    model.fit(X_train, y_train)
+
+    def evaluate(evaluation_chunk_size):
+        return ExperimentRunner(
+            model=model,
+            X_train=X_train,
+            X_test=X_test,
+            y_train=y_train,
+            y_test=y_test,
+            data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+            evaluator=IrisEvaluator(),
+            log_experiment=False,
+            evaluation_chunk_size=evaluation_chunk_size,
+        ).evaluate()
+
+    assert evaluate(evaluation_chunk_size=7).accuracy == evaluate(None).accuracy
+
+
+def test_experiment_runner_run_predicts_in_chunks_only():
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    predicted_sizes = []
+
+    class RecordingModel(IrisSVMModel):
+        def predict(self, X):
+            predicted_sizes.append(len(X))
+            return super().predict(X)
+
+    ExperimentRunner(
+        model=RecordingModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        log_experiment=False,
+        evaluation_chunk_size=10,
+    ).run()
+
+    assert predicted_sizes == [10, 10, 10, 10, 5]
+
+
+def test_experiment_runner_chunks_without_streaming_evaluator():
+    evaluated = []
+
+    class CollectingEvaluator(Evaluator):
+        def evaluate(self, y_test, prediction) -> EvaluationMetrics:
+            evaluated.append((list(y_test), list(prediction)))
+            return IrisEvaluator().evaluate(y_test, prediction)
+
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    evaluator = CollectingEvaluator()
+    assert not evaluator.supports_streaming()
+
+    result = ExperimentRunner(
+        model=IrisSVMModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=evaluator,
+        log_experiment=False,
+        evaluation_chunk_size=10,
+    ).run()
+
+    # The chunks are evaluated together, in their original order
+    assert len(evaluated) == 1
+    assert evaluated[0][0] == list(y_test)
+    assert result.accuracy == IrisEvaluator().evaluate(*evaluated[0]).accuracy
+
+
+class InMemoryDataLoader(DataLoader):
+    def __init__(self, dataset):
+        self.dataset = dataset
+        super().__init__(dataset_name="X", dataset_version=1)
+
+    def download_dataset(self) -> None:
+        pass
+
+    def get_dataset(self):
+        return self.dataset
+
+
+def test_data_loader_slices_dataset_into_batches():
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+
+    for dataset in [
+        (X_train, y_train, X_test, y_test),
+        {"X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test},
+    ]:
+        batches = list(InMemoryDataLoader(dataset).iter_batches("test", batch_size=10))
+        assert [len(X_batch) for X_batch, _ in batches] == [10, 10, 10, 10, 5]
+        assert list(batches[-1][1].index) == list(y_test.index[40:])
+
+    with pytest.raises(ValueError):
+        next(InMemoryDataLoader((X_train, X_test)).iter_batches("test"))
+
+
+def test_experiment_runner_reads_test_set_in_batches(tmp_path, monkeypatch):
+    iris = load_iris(as_frame=True).frame.rename(columns={"target": "Species"})
+    iris.index.name = "Id"
+    train, test = train_test_split(iris, test_size=0.3, random_state=0)
+    Path(tmp_path, "data", "processed").mkdir(parents=True)
+    train.to_csv(Path(tmp_path, "data", "processed", "iris-1-train.csv"))
+    test.to_csv(Path(tmp_path, "data", "processed", "iris-1-test.csv"))
+    Path(tmp_path, "notebooks").mkdir()
+    monkeypatch.chdir(Path(tmp_path, "notebooks"))
+
+    data_loader = IrisDataLoader(dataset_name="iris", dataset_version="1")
+    batches = list(data_loader.iter_batches(split="test", batch_size=10))
+    assert [len(X_batch) for X_batch, _ in batches] == [10, 10, 10, 10, 5]
+
+    X_train, y_train, _, y_test = data_loader.get_dataset()
+    model = IrisSVMModel(features=["sepal length (cm)", "sepal width (cm)"])
+    model.fit(X_train, y_train)
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=X_train,
+        X_test=None,
+        y_train=y_train,
+        data_loader=data_loader,
+        evaluator=IrisEvaluator(),
+        log_experiment=False,
+        evaluation_chunk_size=10,
+    )
+
+    X_test = test.drop("Species", axis=1)
+    expected = IrisEvaluator().evaluate(y_test, model.predict(X_test))
+    assert experiment_runner.evaluate().accuracy == expected.accuracy
+    assert experiment_runner.run().accuracy == expected.accuracy
+
+
+def test_experiment_runner_predict_requires_test_set():
+    experiment_runner = ExperimentRunner(
+        model=MockModel(),
+        X_train=[1, 2],
+        X_test=None,
+        data_loader=None,
+        evaluator=MockEvaluator(expected_recall=0.5, expected_precision=0.7),
+        log_experiment=False,
+    )
+    with pytest.raises(ValueError):
+        experiment_runner.run()
+
+
+def test_experiment_runner_records_spans():
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    experiment_logger = MockExperimentation()
+    ExperimentRunner(
+        model=IrisSVMModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        experiment_logger=experiment_logger,
+        experiment_name="spans",
+        evaluation_chunk_size=10,
+    ).run()
+
+    for span in ("log", "fit_model", "evaluate", "evaluate/predict"):
+        assert f"timing/{span}/p95_sec" in experiment_logger.metrics
+    assert experiment_logger.metrics["timing/evaluate/update/count"] == 5
+
+
+def test_experiment_runner_profiles_stages():
+    iris = load_iris(as_frame=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        iris.data, iris.target, test_size=0.3, random_state=0
+    )
+    experiment_logger = MockExperimentation()
+    ExperimentRunner(
+        model=IrisSVMModel(features=["sepal length (cm)", "sepal width (cm)"]),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        experiment_logger=experiment_logger,
+        experiment_name="profile",
+        profiler=RunProfiler(),
+    ).run()
+
+    for stage in ("fit_model", "predict", "evaluate"):
+        assert f"profile/{stage}/peak_traced_memory_mb" in experiment_logger.metrics
+    assert experiment_logger.params["profile_cpu"]
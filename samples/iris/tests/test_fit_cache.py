@@ -0,0 +1,123 @@
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.model_selection import train_test_split
+
+from iris import ExperimentRunner
+from iris.caching import FitCache, fingerprint_params
+from iris.caching.fit_cache import _dir_size
+from iris.data import IrisDataLoader
+from iris.evaluation import IrisEvaluator
+from iris.models import IrisSVMModel
+from tests.mocks import MockExperimentation
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+class CountingSVMModel(IrisSVMModel):
+    fit_calls = 0
+
+    def fit(self, X, y=None) -> None:
+        CountingSVMModel.fit_calls += 1
+        super().fit(X, y)
+
+
+@pytest.fixture
+def iris_split():
+    iris = load_iris(as_frame=True)
+    return train_test_split(iris.data, iris.target, test_size=0.3, random_state=0)
+
+
+def run_experiment(iris_split, fit_cache, kernel="linear", experiment_logger=None):
+    X_train, X_test, y_train, y_test = iris_split
+    experiment_runner = ExperimentRunner(
+        model=CountingSVMModel(features=FEATURES, kernel=kernel),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        log_experiment=experiment_logger is not None,
+        experiment_logger=experiment_logger,
+        experiment_name="FitCache",
+        fit_cache=fit_cache,
+    )
+    return experiment_runner.run()
+
+
+def test_fit_cache_skips_refitting(iris_split, tmp_path):
+    fit_cache = FitCache(cache_dir=tmp_path)
+    CountingSVMModel.fit_calls = 0
+
+    first = run_experiment(iris_split, fit_cache)
+    second = run_experiment(iris_split, fit_cache)
+
+    assert CountingSVMModel.fit_calls == 1
+    assert first.accuracy == second.accuracy
+    assert fit_cache.hits == 1
+    assert fit_cache.misses == 1
+
+
+def test_fit_cache_key_depends_on_params_and_data(iris_split, tmp_path):
+    X_train, _, y_train, _ = iris_split
+    fit_cache = FitCache(cache_dir=tmp_path)
+    linear = IrisSVMModel(features=FEATURES, kernel="linear")
+    rbf = IrisSVMModel(features=FEATURES, kernel="rbf")
+
+    key = fit_cache.get_key(linear, X_train, y_train)
+    assert key == fit_cache.get_key(
+        IrisSVMModel(features=FEATURES, kernel="linear"), X_train.copy(), y_train
+    )
+    assert key != fit_cache.get_key(rbf, X_train, y_train)
+    assert key != fit_cache.get_key(linear, X_train.iloc[1:], y_train.iloc[1:])
+    assert key != fit_cache.get_key(linear, X_train, y_train.sample(frac=1.0))
+
+
+class Kernel:
+    def __init__(self, degree):
+        self.degree = degree
+
+
+def test_fingerprint_params_uses_content_of_objects_without_repr():
+    assert fingerprint_params({"kernel": Kernel(3)}) == fingerprint_params(
+        {"kernel": Kernel(3)}
+    )
+    assert fingerprint_params({"kernel": Kernel(3)}) != fingerprint_params(
+        {"kernel": Kernel(2)}
+    )
+    with pytest.raises(TypeError):
+        fingerprint_params({"kernel": lambda x: x})
+
+
+def test_dir_size_includes_nested_files(tmp_path):
+    (tmp_path / "weights").mkdir()
+    (tmp_path / "manifest.json").write_bytes(b"a" * 10)
+    (tmp_path / "weights" / "layer.npy").write_bytes(b"a" * 100)
+
+    assert _dir_size(tmp_path) == 110
+
+
+def test_fit_cache_evicts_least_recently_used(iris_split, tmp_path):
+    fit_cache = FitCache(cache_dir=tmp_path, max_entries=2)
+    CountingSVMModel.fit_calls = 0
+
+    run_experiment(iris_split, fit_cache, kernel="linear")
+    run_experiment(iris_split, fit_cache, kernel="rbf")
+    run_experiment(iris_split, fit_cache, kernel="linear")  # hit, now most recent
+    run_experiment(iris_split, fit_cache, kernel="poly")  # evicts rbf
+    run_experiment(iris_split, fit_cache, kernel="linear")  # still cached
+
+    assert CountingSVMModel.fit_calls == 3
+    assert fit_cache.evictions == 1
+    assert len([path for path in tmp_path.iterdir() if path.is_dir()]) == 2
+
+
+def test_fit_cache_metrics_are_logged(iris_split, tmp_path):
+    fit_cache = FitCache(cache_dir=tmp_path)
+    experiment_logger = MockExperimentation()
+
+    run_experiment(iris_split, fit_cache, experiment_logger=experiment_logger)
+    run_experiment(iris_split, fit_cache, experiment_logger=experiment_logger)
+
+    assert experiment_logger.metrics["fit_cache_hits"] == 1
+    assert experiment_logger.metrics["fit_cache_misses"] == 1
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sklearn.datasets import load_iris
+
+from iris.data import IrisDataLoader
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    """
+    Creates data/raw and data/processed folders, and runs from a sibling folder
+    (as notebooks do)
+    """
+    iris = load_iris(as_frame=True)
+    data = iris.frame.rename(columns={"target": "Species"})
+    data["Species"] = iris.target_names[iris.target]
+    data.index.name = "Id"
+
+    Path(tmp_path, "data", "raw").mkdir(parents=True)
+    Path(tmp_path, "data", "processed").mkdir(parents=True)
+    Path(tmp_path, "notebooks").mkdir()
+    data.to_csv(Path(tmp_path, "data", "raw", "iris.csv"))
+    monkeypatch.chdir(Path(tmp_path, "notebooks"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("data_format", ["parquet", "arrow"])
+def test_columnar_formats_match_csv(project_dir, data_format):
+    data_loader = IrisDataLoader("iris", "1", data_format=data_format)
+    data_loader.prep_dataset_for_modeling()
+    X_train, y_train, X_test, y_test = data_loader.get_dataset()
+
+    # Splits keep the index and dtypes of the raw csv
+    raw = pd.read_csv(Path(project_dir, "data", "raw", "iris.csv"), index_col="Id")
+    for X, y in ((X_train, y_train), (X_test, y_test)):
+        expected = raw.loc[X.index]
+        pd.testing.assert_frame_equal(X, expected.drop("Species", axis=1))
+        pd.testing.assert_series_equal(y, expected["Species"])
+
+    batches = list(data_loader.iter_batches(split="test", batch_size=20))
+    pd.testing.assert_frame_equal(pd.concat([X for X, _ in batches]), X_test)
+
+
+def test_get_params_records_format_and_file_hashes(project_dir):
+    data_loader = IrisDataLoader("iris", "1", data_format="arrow")
+    assert "train_file_hash" not in data_loader.get_params()
+
+    data_loader.prep_dataset_for_modeling()
+    params = data_loader.get_params()
+
+    assert params["data_format"] == "arrow"
+    assert params["train_file_hash"] != params["test_file_hash"]
+
+
+def test_get_params_hashes_each_file_version_once(project_dir, monkeypatch):
+    from iris.data import iris_data_loader
+
+    data_loader = IrisDataLoader("iris", "1")
+    data_loader.prep_dataset_for_modeling()
+    hashed = []
+    fingerprint_file = iris_data_loader.fingerprint_file
+    monkeypatch.setattr(
+        iris_data_loader,
+        "fingerprint_file",
+        lambda path: hashed.append(path) or fingerprint_file(path),
+    )
+
+    params = data_loader.get_params()
+    assert data_loader.get_params() == params
+    assert len(hashed) == 2
+
+    data_loader.prep_dataset_for_modeling()
+    assert data_loader.get_params()["train_file_hash"] != params["train_file_hash"]
+    assert len(hashed) == 4
+
+
+def test_unknown_data_format():
+    with pytest.raises(ValueError):
+        IrisDataLoader("iris", "1", data_format="xlsx")
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+import iris
+from iris.lazy_import import lazy_import
+
+HEAVY_MODULES = ("mlflow", "sklearn", "pandas")
+
+
+def test_import_iris_does_not_import_heavy_dependencies():
+    # A fresh interpreter, as the test session already imported everything
+    code = (
+        "import sys, iris; "
+        "from iris import LoggableObject; "
+        "from iris.evaluation import EvaluationMetrics, TimeTook; "
+        "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    imported = set(output.strip().split(","))
+
+    assert not imported & set(HEAVY_MODULES)
+
+
+def test_lazy_attributes_are_imported_on_access():
+    from iris.experiment_runner import ExperimentRunner
+
+    assert iris.ExperimentRunner is ExperimentRunner
+    assert "ExperimentRunner" in dir(iris)
+    assert iris.models.IrisSVMModel.__name__ == "IrisSVMModel"
+
+
+def test_unknown_attribute_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        iris.NoSuchAttribute
+
+    __getattr__, _ = lazy_import("iris.data", {})
+    with pytest.raises(AttributeError):
+        __getattr__("NoSuchLoader")
@@ -0,0 +1,112 @@
+import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+
+from iris.data_processing import EmptyProcessor
+from iris.models import BaseModel, IrisSVMModel
+from iris.models.serialization import MANIFEST_FILE
+from tests.mocks import MockExperimentation
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+@pytest.fixture
+def fitted_model():
+    iris = load_iris(as_frame=True)
+    model = IrisSVMModel(features=FEATURES, kernel="rbf")
+    model.fit(iris.data, iris.target)
+    model.experiment_logger = MockExperimentation()
+    return model, iris.data
+
+
+def test_save_writes_manifest_without_experiment_logger(fitted_model, tmp_path):
+    model, _ = fitted_model
+    path = tmp_path / "model"
+    model.save(str(path))
+
+    with open(path / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    assert manifest["serializer"] == "joblib"
+    assert manifest["model_class"] == "iris.models.svm_model:IrisSVMModel"
+    assert set(manifest["files"]) == {"state.joblib"}
+
+    loaded = IrisSVMModel.load(str(path))
+    assert loaded.experiment_logger is None
+    assert model.experiment_logger is not None
+
+
+def test_load_memory_maps_arrays(fitted_model, tmp_path):
+    model, X = fitted_model
+    path = tmp_path / "model"
+    model.save(str(path))
+
+    loaded = BaseModel.load(str(path))
+    assert type(loaded) is IrisSVMModel
+    assert isinstance(loaded.model.support_vectors_, np.memmap)
+    assert isinstance(loaded.preprocessor, EmptyProcessor)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+    in_memory = BaseModel.load(str(path), mmap=False)
+    assert not isinstance(in_memory.model.support_vectors_, np.memmap)
+
+
+def test_save_replaces_existing_model(fitted_model, tmp_path):
+    model, X = fitted_model
+    path = tmp_path / "model"
+    model.save(str(path))
+    model.kernel = "linear"
+    model.fit(X, load_iris().target)
+    model.save(str(path))
+
+    assert IrisSVMModel.load(str(path)).kernel == "linear"
+    assert [p.name for p in tmp_path.iterdir()] == ["model"]
+
+
+def test_concurrent_saves_leave_one_model(fitted_model, tmp_path):
+    model, X = fitted_model
+    path = tmp_path / "model"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: model.save(str(path)), range(32)))
+
+    loaded = IrisSVMModel.load(str(path))
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    assert [p.name for p in tmp_path.iterdir()] == ["model"]
+
+
+def test_save_does_not_replace_other_directories(fitted_model, tmp_path):
+    model, _ = fitted_model
+    (tmp_path / "important.txt").write_text("keep me")
+
+    with pytest.raises(FileExistsError):
+        model.save(str(tmp_path))
+    assert (tmp_path / "important.txt").read_text() == "keep me"
+
+
+def test_load_checks_model_class(fitted_model, tmp_path):
+    class OtherModel(BaseModel):
+        def fit(self, X, y=None):
+            pass
+
+        def predict(self, X):
+            pass
+
+    model, _ = fitted_model
+    model.save(str(tmp_path / "model"))
+    with pytest.raises(TypeError):
+        OtherModel.load(str(tmp_path / "model"))
+
+
+def test_load_pickle_file(fitted_model, tmp_path):
+    model, X = fitted_model
+    model.experiment_logger = None
+    path = tmp_path / "model.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+
+    loaded = IrisSVMModel.load(str(path))
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+
+from iris.models import IrisSVMModel
+from iris.serving import ModelServer, RequestBatcher
+from iris.serving.model_server import records_to_frame
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+@pytest.fixture
+def saved_model(tmp_path):
+    iris = load_iris(as_frame=True)
+    model = IrisSVMModel(features=FEATURES)
+    model.fit(iris.data, iris.target)
+    model.save(str(tmp_path / "model"))
+    return str(tmp_path / "model"), model, iris.data
+
+
+def crash_on_exit_instance(instances):
+    # Simulates a worker killed while predicting (e.g. when out of memory)
+    if any("exit" in instance for instance in instances):
+        os._exit(1)
+    return records_to_frame(instances)
+
+
+def get(server, path):
+    try:
+        with urllib.request.urlopen(
+            f"http://{server.host}:{server.port}{path}"
+        ) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def post(server, body):
+    request = urllib.request.Request(
+        f"http://{server.host}:{server.port}/predict",
+        data=json.dumps(body).encode("utf-8"),
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def test_batcher_groups_concurrent_items():
+    def run_batch(items):
+        time.sleep(0.01)
+        future = Future()
+        future.set_result([item * 2 for item in items])
+        return future
+
+    batcher = RequestBatcher(run_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(20)]
+    assert [future.result() for future in futures] == [i * 2 for i in range(20)]
+    batcher.close()
+
+    metrics = batcher.get_metrics()
+    assert metrics["requests"] == 20
+    assert metrics["batches"] == 3
+    assert metrics["latency_p99_ms"] >= metrics["latency_p50_ms"] > 0
+
+
+def test_batcher_propagates_errors():
+    def run_batch(items):
+        raise ValueError("bad batch")
+
+    batcher = RequestBatcher(run_batch, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.submit(1).result()
+    batcher.close()
+
+
+def test_server_predictions_match_model(saved_model):
+    model_path, model, X = saved_model
+    instances = X.head(20).to_dict("records")
+
+    with ModelServer(model_path, n_workers=2, port=0) as server:
+        results = [None] * len(instances)
+
+        def request(i):
+            results[i] = post(server, {"instances": [instances[i]]})["predictions"][0]
+
+        clients = [
+            threading.Thread(target=request, args=(i,)) for i in range(len(instances))
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        metrics = server.get_metrics()
+
+    np.testing.assert_array_equal(results, model.predict(X.head(20)))
+    assert metrics["serving/requests"] == 20
+    assert metrics["serving/batches"] <= 20
+
+
+def test_server_rejects_invalid_requests(saved_model):
+    model_path, _, _ = saved_model
+    with ModelServer(model_path, n_workers=1, port=0) as server:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(server, {"rows": []})
+        assert error.value.code == 400
+
+        # Missing features fail inside the worker
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(server, {"instances": [{"petal width (cm)": 1.0}]})
+        assert error.value.code == 500
+
+        # The worker keeps serving after a failed batch
+        instance = {feature: 5.0 for feature in FEATURES}
+        assert len(post(server, {"instances": [instance]})["predictions"]) == 1
+
+
+def test_server_fails_only_invalid_instances_of_a_batch(saved_model):
+    model_path, model, X = saved_model
+    instances = X.head(6).to_dict("records")
+    instances[2] = {"petal width (cm)": 1.0}
+
+    with ModelServer(
+        model_path, n_workers=1, max_batch_size=len(instances), max_wait_ms=500, port=0
+    ) as server:
+        futures = [server.batcher.submit(instance) for instance in instances]
+        with pytest.raises(RuntimeError):
+            futures[2].result()
+        predictions = [futures[i].result() for i in (0, 1, 3, 4, 5)]
+        metrics = server.get_metrics()
+
+    expected = model.predict(X.head(6))
+    np.testing.assert_array_equal(predictions, expected[[0, 1, 3, 4, 5]])
+    assert metrics["serving/batches"] == 1
+
+
+def test_server_fails_batches_of_dead_workers(saved_model):
+    model_path, _, _ = saved_model
+    instance = {feature: 5.0 for feature in FEATURES}
+
+    with ModelServer(
+        model_path, n_workers=2, port=0, to_model_input=crash_on_exit_instance
+    ) as server:
+        with pytest.raises(RuntimeError, match="exited"):
+            server.predict([{**instance, "exit": True}])
+        assert server.workers_alive() == 1
+        assert get(server, "/health") == (
+            200,
+            {"status": "ok", "model": server.model.name, "workers_alive": 1},
+        )
+
+        # The remaining worker keeps serving
+        assert len(post(server, {"instances": [instance]})["predictions"]) == 1
+
+        with pytest.raises(RuntimeError, match="exited"):
+            server.predict([{**instance, "exit": True}])
+        assert get(server, "/health")[0] == 503
+        with pytest.raises(RuntimeError, match="All model server workers exited"):
+            server.predict([instance])
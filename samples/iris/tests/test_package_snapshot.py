@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+
+import mlflow
+
+from iris.experimentation import MlflowExperimentation, PackageSnapshot
+
+
+def write_package(package_dir: Path):
+    Path(package_dir, "sub").mkdir(parents=True)
+    Path(package_dir, "__pycache__").mkdir()
+    Path(package_dir, "__init__.py").write_text("import sub\n")
+    Path(package_dir, "sub", "model.py").write_text("KERNEL = 'linear'\n")
+    Path(package_dir, "sub", "copy_of_model.py").write_text("KERNEL = 'linear'\n")
+    Path(package_dir, "__pycache__", "model.cpython-37.pyc").write_bytes(b"\x00")
+
+
+def test_snapshot_stores_each_content_once(tmp_path):
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    snapshot = PackageSnapshot(store_dir=Path(tmp_path, "store"))
+
+    manifest, new_blobs = snapshot.take(package_dir)
+
+    assert sorted(manifest) == ["__init__.py", "sub/copy_of_model.py", "sub/model.py"]
+    assert manifest["sub/model.py"] == manifest["sub/copy_of_model.py"]
+    assert len(new_blobs) == 2
+
+
+def upload(snapshot: PackageSnapshot, new_blobs, run_id="run"):
+    snapshot.add_locations(
+        [PackageSnapshot.blob_digest(blob_path) for blob_path in new_blobs], run_id
+    )
+
+
+def test_unchanged_snapshot_has_no_new_blobs(tmp_path):
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    snapshot = PackageSnapshot(store_dir=Path(tmp_path, "store"))
+
+    first_manifest, first_blobs = snapshot.take(package_dir)
+    upload(snapshot, first_blobs)
+    second_manifest, new_blobs = snapshot.take(package_dir)
+
+    assert new_blobs == []
+    assert first_manifest == second_manifest
+    first_hash = PackageSnapshot.manifest_hash(first_manifest)
+    assert first_hash == PackageSnapshot.manifest_hash(second_manifest)
+
+
+def test_changed_file_adds_only_its_blob(tmp_path):
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    snapshot = PackageSnapshot(store_dir=Path(tmp_path, "store"))
+    first_manifest, first_blobs = snapshot.take(package_dir)
+    upload(snapshot, first_blobs)
+
+    Path(package_dir, "sub", "model.py").write_text("KERNEL = 'rbf'\n")
+    second_manifest, new_blobs = snapshot.take(package_dir)
+
+    assert new_blobs == [snapshot.blob_path(second_manifest["sub/model.py"])]
+    assert first_manifest["__init__.py"] == second_manifest["__init__.py"]
+    assert first_manifest["sub/model.py"] != second_manifest["sub/model.py"]
+
+
+def test_blobs_are_uploaded_to_each_remote(tmp_path):
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    store_dir = Path(tmp_path, "store")
+    snapshot = PackageSnapshot(store_dir=store_dir, remote="http://server-a")
+    _, first_blobs = snapshot.take(package_dir)
+    upload(snapshot, first_blobs)
+
+    other_snapshot = PackageSnapshot(store_dir=store_dir, remote="http://server-b")
+    _, new_blobs = other_snapshot.take(package_dir)
+
+    assert new_blobs == first_blobs
+
+
+def test_restore_snapshot(tmp_path):
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    snapshot = PackageSnapshot(store_dir=Path(tmp_path, "store"))
+    manifest, _ = snapshot.take(package_dir)
+
+    restored_dir = Path(tmp_path, "restored")
+    snapshot.restore(manifest, restored_dir)
+
+    for relative_path in manifest:
+        assert (
+            Path(restored_dir, relative_path).read_text()
+            == Path(package_dir, relative_path).read_text()
+        )
+
+
+def test_restore_snapshot_from_mlflow(tmp_path, monkeypatch, no_active_mlflow_run):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    package_dir = Path(tmp_path, "package")
+    write_package(package_dir)
+    experiment_logger = MlflowExperimentation(
+        tracking_uri=Path(tmp_path, "mlruns").as_uri(),
+        log_package=False,
+        package_store=str(Path(tmp_path, "store")),
+    )
+    experiment_logger.set_experiment("package_snapshot")
+
+    run_ids = []
+    for _ in range(2):
+        experiment_logger.start_run()
+        run_ids.append(experiment_logger.run_id)
+        experiment_logger.log_package_snapshot(package_dir)
+        experiment_logger.end_run()
+
+    # The second run logs no blobs, they are downloaded from the first run
+    manifest_path = mlflow.artifacts.download_artifacts(
+        run_id=run_ids[1], artifact_path="package/manifest.json", dst_path=tmp_path
+    )
+    with open(manifest_path) as f:
+        assert set(json.load(f)["blobs"].values()) == {run_ids[0]}
+
+    restored_dir = Path(tmp_path, "restored")
+    experiment_logger.restore_package_snapshot(run_ids[1], restored_dir)
+
+    for relative_path in ["__init__.py", "sub/model.py", "sub/copy_of_model.py"]:
+        assert (
+            Path(restored_dir, relative_path).read_text()
+            == Path(package_dir, relative_path).read_text()
+        )
+    assert not Path(restored_dir, "__pycache__").exists()
@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.model_selection import train_test_split
+
+from iris import ParameterSweep
+from iris.parameter_sweep import _worker_state
+from iris.data import IrisDataLoader
+from iris.evaluation import IrisEvaluator
+from iris.models import IrisSVMModel
+from tests.mocks import RecordingExperimentation
+
+FEATURES = ["sepal length (cm)", "sepal width (cm)"]
+
+
+class SVMFactory:
+    def __call__(self, **params):
+        return IrisSVMModel(features=FEATURES, **params)
+
+
+@pytest.fixture
+def iris_split():
+    iris = load_iris(as_frame=True)
+    return train_test_split(iris.data, iris.target, test_size=0.3, random_state=0)
+
+
+def test_parameter_sweep_grid_ranks_trials(iris_split):
+    X_train, X_test, y_train, y_test = iris_split
+
+    sweep = ParameterSweep(
+        model_factory=SVMFactory(),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        param_grid={"kernel": ["linear", "rbf", "poly", "sigmoid"]},
+        n_jobs=2,
+        log_experiment=False,
+    )
+    results = sweep.run()
+
+    assert len(results) == 4
+    assert set(results["kernel"]) == {"linear", "rbf", "poly", "sigmoid"}
+    assert results["accuracy"].is_monotonic_decreasing
+    assert sweep.get_best_metrics().accuracy == results.loc[0, "accuracy"]
+
+
+def test_parameter_sweep_random_search_logs_every_trial(iris_split):
+    X_train, X_test, y_train, y_test = iris_split
+    experiment_logger = RecordingExperimentation()
+
+    sweep = ParameterSweep(
+        model_factory=SVMFactory(),
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+        evaluator=IrisEvaluator(),
+        param_distributions={"kernel": ["linear", "rbf"]},
+        n_iter=2,
+        random_state=42,
+        n_jobs=1,
+        experiment_logger=experiment_logger,
+        experiment_name="Sweep",
+    )
+    results = sweep.run()
+
+    assert len(results) == 2
+    assert isinstance(results, pd.DataFrame)
+    assert sorted(results["trial"]) == [0, 1]
+    # The datasets are not kept alive after an in-process sweep
+    assert _worker_state == {}
+
+    # Every trial is logged as a separate run, with its own params and metrics
+    assert experiment_logger.calls == ["start_run", "end_run"] * 2
+    runs = experiment_logger.runs
+    assert sorted(run["params"]["sweep_trial"] for run in runs) == [0, 1]
+    for run in runs:
+        trial = results.set_index("trial").loc[run["params"]["sweep_trial"]]
+        assert run["params"]["kernel"] == trial["kernel"]
+        assert run["metrics"]["accuracy"] == trial["accuracy"]
+
+
+def test_parameter_sweep_requires_one_search_space(iris_split):
+    X_train, X_test, y_train, y_test = iris_split
+
+    with pytest.raises(ValueError):
+        ParameterSweep(
+            model_factory=SVMFactory(),
+            X_train=X_train,
+            X_test=X_test,
+            data_loader=IrisDataLoader(dataset_name="iris", dataset_version="1"),
+            evaluator=IrisEvaluator(),
+            log_experiment=False,
+        )
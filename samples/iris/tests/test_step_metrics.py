@@ -0,0 +1,73 @@
+from pathlib import Path
+from unittest import mock
+
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from iris.evaluation import StepEvaluationMetrics
+from iris.experimentation import MlflowExperimentation
+from tests.mocks import RecordingExperimentation
+
+
+class ThresholdCurve(StepEvaluationMetrics):
+    def __init__(self, thresholds):
+        self.thresholds = thresholds
+        super().__init__()
+
+    def get_metrics(self, step=None):
+        return {"threshold": step, "recall": 1 - step}
+
+    def get_steps(self):
+        return self.thresholds
+
+
+class EpochCurve(StepEvaluationMetrics):
+    def get_metrics(self, step=None):
+        return {"loss": 1.0 / (step + 1)}
+
+    def get_steps(self):
+        return range(1, 4)
+
+
+def test_log_step_metrics_logs_one_batch_with_steps():
+    experiment_logger = RecordingExperimentation()
+    experiment_logger.log_step_metrics(ThresholdCurve([0.1, 0.5, 0.9]))
+
+    assert len(experiment_logger.batches) == 1
+    metrics, _ = experiment_logger.batches[0]
+    # Non integer steps are logged by their index
+    assert [(key, value, step) for key, value, step, _ in metrics] == [
+        ("threshold", 0.1, 0),
+        ("recall", 0.9, 0),
+        ("threshold", 0.5, 1),
+        ("recall", 0.5, 1),
+        ("threshold", 0.9, 2),
+        ("recall", 0.09999999999999998, 2),
+    ]
+
+    experiment_logger.log_step_metrics(EpochCurve())
+    metrics, _ = experiment_logger.batches[1]
+    assert [step for _, _, step, _ in metrics] == [1, 2, 3]
+
+
+def test_mlflow_logs_10k_steps_in_bulk(tmp_path, monkeypatch, no_active_mlflow_run):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    experiment_logger = MlflowExperimentation(
+        tracking_uri=Path(tmp_path, "mlruns").as_uri(), log_package=False
+    )
+    experiment_logger.set_experiment("step-metrics")
+    experiment_logger.start_run()
+    thresholds = [i / 10000 for i in range(10000)]
+
+    with mock.patch.object(
+        MlflowClient, "log_batch", autospec=True, side_effect=MlflowClient.log_batch
+    ) as log_batch:
+        experiment_logger.log_step_metrics(ThresholdCurve(thresholds))
+    run_id = experiment_logger.run_id
+    experiment_logger.end_run()
+
+    # 20k values, in requests of up to 1000 values (mlflow's limit)
+    assert log_batch.call_count == 20
+    history = MlflowClient().get_metric_history(run_id, "recall")
+    assert sorted(metric.step for metric in history) == list(range(10000))
+    assert mlflow.get_run(run_id).data.metrics["recall"] == 1 - thresholds[-1]
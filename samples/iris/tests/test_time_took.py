@@ -0,0 +1,80 @@
+import pytest
+
+from iris.evaluation import SpanRecorder, TimeTook
+from iris.evaluation.time_took import SpanHistogram
+from tests.mocks import MockExperimentation
+
+
+def test_nested_spans_are_named_by_their_parents():
+    recorder = SpanRecorder()
+    with recorder.span("outer") as outer:
+        for _ in range(3):
+            with recorder.span("inner") as inner:
+                pass
+
+    assert outer.name == "outer"
+    assert inner.name == "outer/inner"
+    assert outer.elapsed >= inner.elapsed
+    metrics = recorder.get_metrics()
+    assert metrics["timing/outer/count"] == 1
+    assert metrics["timing/outer/inner/count"] == 3
+
+
+def test_outermost_span_exports_to_experiment_logger():
+    experiment_logger = MockExperimentation()
+    recorder = SpanRecorder(experiment_logger=experiment_logger)
+
+    with recorder.span("fit"):
+        with recorder.span("epoch"):
+            assert experiment_logger.metrics == {}
+
+    assert set(experiment_logger.metrics) == {
+        f"timing/{span}/{stat}"
+        for span in ("fit", "fit/epoch")
+        for stat in ("count", "total_sec", "p50_sec", "p95_sec", "max_sec")
+    }
+
+
+def test_recorder_spans_ignore_other_open_spans():
+    experiment_logger = MockExperimentation()
+    recorder = SpanRecorder(experiment_logger=experiment_logger)
+
+    with TimeTook("run"):
+        with recorder.span("fit") as fit:
+            with TimeTook("step"):
+                with recorder.span("epoch") as epoch:
+                    pass
+        assert "timing/fit/count" in experiment_logger.metrics
+
+    assert fit.name == "fit"
+    assert epoch.name == "fit/epoch"
+    assert experiment_logger.metrics["timing/fit/epoch/count"] == 1
+
+
+def test_span_without_recorder():
+    with TimeTook("sample") as span:
+        pass
+    assert span.elapsed >= 0
+
+
+def test_histogram_percentiles():
+    histogram = SpanHistogram()
+    for duration in range(1, 101):
+        histogram.add(duration)
+
+    metrics = histogram.get_metrics()
+    assert metrics["count"] == 100
+    assert metrics["p50_sec"] == 50
+    assert metrics["p95_sec"] == 95
+    assert metrics["max_sec"] == 100
+
+
+def test_histogram_keeps_bounded_sample():
+    histogram = SpanHistogram(max_samples=10)
+    for duration in range(1000):
+        histogram.add(duration)
+
+    assert len(histogram.samples) == 10
+    assert histogram.count == 1000
+    assert histogram.total == pytest.approx(sum(range(1000)))
+    assert histogram.max == 999
@@ -0,0 +1,81 @@
+"""
+Compares keeping the test set's gold labels as deep copied flair labels
+(a gold_ner layer on every token) with the GoldLabels side store,
+on a synthetic CONLL 03 test fold.
+
+Usage:
+python benchmarks/benchmark_gold_labels.py --sentences 3500
+"""
+import argparse
+import copy
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from flair.datasets import ColumnDataset
+
+from ner_sample.data.conll_data_loader import CONLL_03_COLUMNS
+from ner_sample.evaluation import GoldLabels
+
+TAGS = ["O"] * 6 + ["B-PER", "I-PER", "B-LOC", "I-LOC", "B-ORG", "B-MISC"]
+
+
+def write_fold(path, sentences):
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        for _ in range(sentences):
+            for i in range(rng.randint(5, 25)):
+                f.write(f"word{i} NN I-NP {rng.choice(TAGS)}\n")
+            f.write("\n")
+
+
+def deepcopy_gold_labels(sentences):
+    for sentence in sentences:
+        for token in sentence.tokens:
+            token.annotation_layers["gold_ner"] = copy.deepcopy(
+                token.annotation_layers["ner"]
+            )
+            token.annotation_layers["ner"][0].value = "O"
+
+
+def side_store_gold_labels(sentences):
+    return GoldLabels.from_sentences(sentences)
+
+
+def measure(fold_path, store_gold_labels):
+    sentences = list(ColumnDataset(fold_path, CONLL_03_COLUMNS, tag_to_bioes="ner"))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    gold_labels = store_gold_labels(sentences)
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del gold_labels
+    return elapsed, memory
+
+
+def main(sentences):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fold_path = Path(tmp_dir, "eng.testb")
+        write_fold(fold_path, sentences)
+
+        for name, store_gold_labels in (
+            ("deepcopy", deepcopy_gold_labels),
+            ("GoldLabels", side_store_gold_labels),
+        ):
+            elapsed, memory = measure(fold_path, store_gold_labels)
+            print(
+                f"{name:>10}: {sentences} sentences, "
+                f"{elapsed:.3f}s, {memory / 2 ** 20:.1f}MB of gold labels"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=3500)
+    args = parser.parse_args()
+    main(args.sentences)
@@ -0,0 +1,260 @@
+"""
+Benchmark suite of the NER pipeline stages, on synthetic data
+at several scales (asv style: setup is not timed, every benchmark is repeated).
+Results are stored as JSON (by default in benchmarks/results/<commit>.json),
+so runs of different commits can be compared offline.
+
+Usage:
+python benchmarks/benchmark_suite.py --repeats 5
+python benchmarks/benchmark_suite.py --quick --benchmarks ner_evaluate
+python benchmarks/benchmark_suite.py --compare results/abc.json results/def.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from flair.data import Sentence, Token
+from flair.datasets import ColumnDataset
+
+from ner_sample import LoggableObject
+from ner_sample.data.conll_data_loader import CONLL_03_COLUMNS
+from ner_sample.evaluation import GoldLabels, NEREvaluator
+
+TAGS = ["O"] * 6 + ["B-PER", "I-PER", "B-LOC", "I-LOC", "B-ORG", "B-MISC"]
+
+# Minimum duration of one repeat of a benchmark
+MIN_REPEAT_SEC = 0.01
+
+# name -> (benchmark function, scales)
+BENCHMARKS = {}
+
+
+def benchmark(name, scales):
+    """
+    Registers a benchmark. The benchmark is a generator function, called with
+    the scale and a temporary work directory: it runs its (untimed) setup,
+    yields the function to time, and runs its teardown after the last repeat
+    """
+
+    def register(function):
+        BENCHMARKS[name] = (function, scales)
+        return function
+
+    return register
+
+
+def make_tag_sequences(n_sentences: int, seed: int = 0):
+    """
+    Generates the words and tags of n_sentences sentences of 5 to 25 tokens
+    """
+    rng = random.Random(seed)
+    return [
+        [(f"word{i}", rng.choice(TAGS)) for i in range(rng.randint(5, 25))]
+        for _ in range(n_sentences)
+    ]
+
+
+def make_sentences(sequences, tag_type="ner"):
+    sentences = []
+    for sequence in sequences:
+        sentence = Sentence()
+        for word, tag in sequence:
+            token = Token(word)
+            token.add_tag(tag_type, tag)
+            sentence.add_token(token)
+        sentences.append(sentence)
+    return sentences
+
+
+def write_fold(path, sequences):
+    with open(path, "w") as f:
+        for sequence in sequences:
+            for word, tag in sequence:
+                f.write(f"{word} NN I-NP {tag}\n")
+            f.write("\n")
+
+
+class SyntheticLoggable(LoggableObject):
+    def __init__(self, n_fields: int):
+        for i in range(n_fields):
+            setattr(self, f"param_{i}", i if i % 3 else f"value_{i}")
+        super().__init__()
+
+    def get_metrics(self):
+        return {}
+
+
+@benchmark("ner_evaluate", scales=(1000, 10000, 50000))
+def bench_ner_evaluate(scale, work_dir):
+    sequences = make_tag_sequences(scale)
+    gold_labels = GoldLabels.from_sentences(make_sentences(sequences))
+    # Predict a random tag for about 10% of the tokens
+    rng = random.Random(1)
+    predictions = make_sentences(
+        [
+            [(word, rng.choice(TAGS) if rng.random() < 0.1 else tag) for word, tag in s]
+            for s in sequences
+        ]
+    )
+    evaluator = NEREvaluator()
+    yield lambda: evaluator.evaluate(gold_labels, predictions)
+
+
+@benchmark("gold_labels_from_sentences", scales=(1000, 10000, 50000))
+def bench_gold_labels_from_sentences(scale, work_dir):
+    sentences = make_sentences(make_tag_sequences(scale))
+    yield lambda: GoldLabels.from_sentences(sentences)
+
+
+@benchmark("conll_fold_load", scales=(1000, 10000, 50000))
+def bench_conll_fold_load(scale, work_dir):
+    path = Path(work_dir, "test.txt")
+    write_fold(path, make_tag_sequences(scale))
+    yield lambda: list(ColumnDataset(path, CONLL_03_COLUMNS, tag_to_bioes="ner"))
+
+
+@benchmark("get_params", scales=(10, 100, 1000))
+def bench_get_params(scale, work_dir):
+    loggable = SyntheticLoggable(n_fields=scale)
+    yield loggable.get_params
+
+
+def run_benchmark(name, scale, repeats):
+    """
+    Times one benchmark at one scale
+    :return: Time per call of each repeat, and their statistics
+    """
+    function, _ = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory() as work_dir:
+        steps = function(scale, work_dir)
+        timed = next(steps)
+
+        # Warm up, and call fast benchmarks several times per repeat,
+        # so every repeat takes at least MIN_REPEAT_SEC
+        start = time.perf_counter()
+        timed()
+        warm_up = time.perf_counter() - start
+        number = max(1, min(int(MIN_REPEAT_SEC / max(warm_up, 1e-9)), 10000))
+
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                timed()
+            times.append((time.perf_counter() - start) / number)
+        # Run the teardown
+        next(steps, None)
+
+    median = statistics.median(times)
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "number": number,
+        "times_sec": times,
+        "min_sec": min(times),
+        "median_sec": median,
+        "mean_sec": statistics.mean(times),
+        "stdev_sec": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "items_per_sec": scale / median if median > 0 else None,
+    }
+
+
+def get_metadata(repeats):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "repeats": repeats,
+    }
+
+
+def run_suite(names, repeats, quick, output):
+    results = []
+    for name in names:
+        _, scales = BENCHMARKS[name]
+        for scale in scales[:1] if quick else scales:
+            result = run_benchmark(name, scale, repeats)
+            print(
+                f"{name:>26} scale={scale:<8} "
+                f"median {result['median_sec'] * 1000:12.4f} ms  "
+                f"min {result['min_sec'] * 1000:12.4f} ms"
+            )
+            results.append(result)
+
+    metadata = get_metadata(repeats)
+    if not output:
+        output = Path(Path(__file__).parent, "results", f"{metadata['commit']}.json")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"metadata": metadata, "results": results}, f, indent=2)
+    print(f"Results stored in {output}")
+
+
+def compare(baseline_path, current_path, threshold):
+    """
+    Prints the median time ratio (current / baseline) of every benchmark
+    :return: Number of benchmarks slower than threshold
+    """
+    with open(baseline_path) as f:
+        baseline = {
+            (r["benchmark"], r["scale"]): r for r in json.load(f)["results"]
+        }
+    with open(current_path) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    for result in current:
+        key = (result["benchmark"], result["scale"])
+        if key not in baseline:
+            continue
+        ratio = result["median_sec"] / baseline[key]["median_sec"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(
+            f"{key[0]:>26} scale={key[1]:<8} "
+            f"{baseline[key]['median_sec'] * 1000:12.4f} ms -> "
+            f"{result['median_sec'] * 1000:12.4f} ms ({ratio:5.2f}x) {flag}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--quick", action="store_true", help="Only run the smallest scale"
+    )
+    parser.add_argument("--output", help="JSON results file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="JSON results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Median time ratio above which a benchmark is a regression",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run_suite(args.benchmarks, args.repeats, args.quick, args.output)
@@ -2,7 +2,7 @@ import logging
 import sys
 
 from .loggable_object import LoggableObject
-from .experiment_runner import ExperimentRunner
+from .lazy_import import lazy_import
 
 logging.basicConfig(
     format="%(asctime)s | %(levelname)s : %(message)s",
@@ -10,4 +10,13 @@ logging.basicConfig(
     stream=sys.stdout,
 )
 
-__all__ = ["LoggableObject", "ExperimentRunner"]
+# Imported on first access, see lazy_import
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "ExperimentRunner": ".experiment_runner",
+        "SuccessiveHalvingSearch": ".successive_halving",
+    },
+)
+
+__all__ = ["LoggableObject", "ExperimentRunner", "SuccessiveHalvingSearch"]
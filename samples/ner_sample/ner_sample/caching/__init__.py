@@ -0,0 +1,13 @@
+from ner_sample.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "CorpusCache": ".corpus_cache",
+        "fingerprint_data": ".fingerprint",
+        "fingerprint_params": ".fingerprint",
+        "PredictionCache": ".prediction_cache",
+    },
+)
+
+__all__ = ["CorpusCache", "fingerprint_data", "fingerprint_params", "PredictionCache"]
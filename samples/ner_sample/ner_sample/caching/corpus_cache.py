@@ -0,0 +1,196 @@
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from flair.data import Corpus, Sentence, Token
+from flair.datasets import SentenceDataset
+
+from ner_sample import LoggableObject
+
+from .fingerprint import fingerprint_params
+
+logger = logging.getLogger(__name__)
+
+# Increment when the snapshot layout changes, so old snapshots are not loaded
+SNAPSHOT_FORMAT_VERSION = 1
+
+FOLDS = ("train", "dev", "test")
+
+
+class CorpusCache(LoggableObject):
+    def __init__(
+        self,
+        cache_dir: str = "../data/interim/corpus_cache",
+        tag_types: List[str] = ("pos", "np", "ner"),
+        cache_name: str = None,
+    ):
+        """
+        On disk cache of tokenized (and downsampled) flair corpora.
+        A corpus is stored as integer arrays (token ids into a vocabulary,
+        tag ids of each tag type and sentence offsets), one .npy file per array,
+        so loading it again (even in a new process) skips parsing the text files.
+        :param cache_dir: Directory to store snapshots in
+        :param tag_types: Tag types (label layers) to store for each token
+        :param cache_name: Name of cache, for logging purposes
+        """
+        self.cache_dir = str(cache_dir)
+        self.tag_types = list(tag_types)
+        self.hits = 0
+        self.misses = 0
+        super().__init__(name=cache_name)
+
+    def get_key(self, dataset_name: str, dataset_version: str, **params) -> str:
+        """
+        Returns the cache key of a dataset
+        :param params: Any other parameter affecting the corpus (e.g. downsample ratio)
+        """
+        return fingerprint_params(
+            {
+                "dataset_name": dataset_name,
+                "dataset_version": dataset_version,
+                "tag_types": self.tag_types,
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                **params,
+            }
+        )
+
+    def load(self, key: str) -> Corpus:
+        """
+        Loads a corpus from the cache
+        :param key: Cache key (see get_key)
+        :return: The corpus, or None if the key is not in the cache
+        """
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        arrays = {
+            array_path.stem: np.load(array_path, mmap_mode="r")
+            for array_path in path.glob("*.npy")
+        }
+        vocabulary = _decode_strings(arrays["vocabulary"], arrays["vocabulary_offsets"])
+        tag_names = {
+            tag_type: arrays[f"{tag_type}_names"].tolist()
+            for tag_type in self.tag_types
+        }
+        folds = [
+            SentenceDataset(self._decode_fold(arrays, fold, vocabulary, tag_names))
+            for fold in FOLDS
+        ]
+        self.hits += 1
+        return Corpus(*folds, name=key)
+
+    def store(self, key: str, corpus: Corpus) -> None:
+        """
+        Stores a corpus in the cache
+        :param key: Cache key (see get_key)
+        :param corpus: flair corpus with train, dev and test folds
+        """
+        vocabulary = {}
+        tag_ids = {tag_type: {} for tag_type in self.tag_types}
+        arrays = {}
+        for fold in FOLDS:
+            arrays.update(
+                self._encode_fold(getattr(corpus, fold), fold, vocabulary, tag_ids)
+            )
+        arrays["vocabulary"], arrays["vocabulary_offsets"] = _encode_strings(
+            list(vocabulary)
+        )
+        for tag_type in self.tag_types:
+            arrays[f"{tag_type}_names"] = np.asarray(list(tag_ids[tag_type]), dtype=str)
+
+        path = self._path(key)
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+
+        # Write into a temporary folder first, so a partial entry is never loaded
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            for name, array in arrays.items():
+                np.save(Path(tmp_dir, f"{name}.npy"), array, allow_pickle=False)
+            if path.exists():
+                shutil.rmtree(path)
+            os.replace(tmp_dir, path)
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+
+    def _encode_fold(
+        self, sentences, fold: str, vocabulary: Dict, tag_ids: Dict
+    ) -> Dict[str, np.ndarray]:
+        token_ids = []
+        tags = {tag_type: [] for tag_type in self.tag_types}
+        offsets = [0]
+        for sentence in sentences:
+            for token in sentence.tokens:
+                token_ids.append(vocabulary.setdefault(token.text, len(vocabulary)))
+                for tag_type in self.tag_types:
+                    value = token.get_tag(tag_type).value
+                    ids = tag_ids[tag_type]
+                    tags[tag_type].append(ids.setdefault(value, len(ids)))
+            offsets.append(len(token_ids))
+
+        arrays = {
+            f"{fold}_tokens": np.asarray(token_ids, dtype=np.int32),
+            f"{fold}_offsets": np.asarray(offsets, dtype=np.int64),
+        }
+        for tag_type in self.tag_types:
+            arrays[f"{fold}_{tag_type}"] = np.asarray(tags[tag_type], dtype=np.int32)
+        return arrays
+
+    def _decode_fold(
+        self, arrays: Dict, fold: str, vocabulary: List[str], tag_names: Dict
+    ) -> List[Sentence]:
+        offsets = arrays[f"{fold}_offsets"].tolist()
+        words = [vocabulary[token_id] for token_id in arrays[f"{fold}_tokens"]]
+        tags = {
+            tag_type: [tag_names[tag_type][i] for i in arrays[f"{fold}_{tag_type}"]]
+            for tag_type in self.tag_types
+        }
+
+        sentences = []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            sentence = Sentence()
+            for i in range(start, end):
+                token = Token(words[i])
+                for tag_type in self.tag_types:
+                    # Empty values are tags which were missing on the original token
+                    if tags[tag_type][i]:
+                        token.add_tag(tag_type, tags[tag_type][i])
+                sentence.add_token(token)
+            sentences.append(sentence)
+        return sentences
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir, key)
+
+    def get_params(self) -> Dict:
+        return {"corpus_cache_dir": self.cache_dir}
+
+    def get_metrics(self) -> Dict:
+        return {
+            "corpus_cache_hits": self.hits,
+            "corpus_cache_misses": self.misses,
+        }
+
+
+def _encode_strings(strings: List[str]):
+    """
+    Encodes a list of strings as one utf-8 buffer and the offset of each string
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_strings(buffer: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = buffer.tobytes()
+    offsets = offsets.tolist()
+    return [
+        data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])
+    ]
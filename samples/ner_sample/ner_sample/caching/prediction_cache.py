@@ -0,0 +1,103 @@
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from ner_sample import LoggableObject
+from ner_sample.models import BaseModel
+
+from .fingerprint import fingerprint_params
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache(LoggableObject):
+    def __init__(
+        self, cache_dir: str = "../models/prediction_cache", cache_name: str = None
+    ):
+        """
+        On disk cache of model predictions.
+        Predictions are keyed by a fingerprint of the fitted model and
+        a fingerprint of the test set. They are stored as numpy arrays
+        (see BaseModel.predictions_to_arrays), one .npy file per array,
+        and memory mapped when loaded, so evaluating again
+        (even in a new process) does not require calling model.predict.
+        :param cache_dir: Directory to store predictions in
+        :param cache_name: Name of cache, for logging purposes
+        """
+        self.cache_dir = str(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        super().__init__(name=cache_name)
+
+    def get_key(self, model: BaseModel, X, model_fingerprint: str = None) -> str:
+        """
+        Returns the cache key of running model.predict on X.
+        Should be called before predict, as some models (e.g. flair) modify X
+        :param model_fingerprint: model.fingerprint(), if already calculated.
+        Passed when predicting many chunks, as fingerprinting a large model is slow
+        """
+        if model_fingerprint is None:
+            model_fingerprint = model.fingerprint()
+        return fingerprint_params(
+            {"model": model_fingerprint, "X": model.fingerprint_input(X)}
+        )
+
+    def load(self, key: str, model: BaseModel, X):
+        """
+        Loads predictions from the cache
+        :param key: Cache key (see get_key)
+        :param model: Model used for converting the stored arrays into predictions
+        :param X: The input the predictions were calculated on
+        :return: The predictions, or None if the key is not in the cache
+        """
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        arrays = {
+            array_path.stem: np.load(array_path, mmap_mode="r")
+            for array_path in path.glob("*.npy")
+        }
+        self.hits += 1
+        return model.predictions_from_arrays(arrays, X)
+
+    def store(self, key: str, model: BaseModel, predictions) -> None:
+        """
+        Stores predictions in the cache
+        :param key: Cache key (see get_key)
+        :param model: Model used for converting the predictions into arrays
+        :param predictions: Output of model.predict
+        """
+        path = self._path(key)
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+        arrays = model.predictions_to_arrays(predictions)
+
+        # Write into a temporary folder first, so a partial entry is never loaded
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            for name, array in arrays.items():
+                np.save(Path(tmp_dir, f"{name}.npy"), array, allow_pickle=False)
+            if path.exists():
+                shutil.rmtree(path)
+            os.replace(tmp_dir, path)
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir, key)
+
+    def get_params(self) -> Dict:
+        return {"prediction_cache_dir": self.cache_dir}
+
+    def get_metrics(self) -> Dict:
+        return {
+            "prediction_cache_hits": self.hits,
+            "prediction_cache_misses": self.misses,
+        }
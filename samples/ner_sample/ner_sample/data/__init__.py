@@ -1,4 +1,8 @@
-from .data_loader import DataLoader
-from .conll_data_loader import ConllDataLoader
+from ner_sample.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {"DataLoader": ".data_loader", "ConllDataLoader": ".conll_data_loader"},
+)
 
 __all__ = ["DataLoader", "ConllDataLoader"]
@@ -1,11 +1,21 @@
-import copy
+import hashlib
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Tuple
 
 import requests
-from flair.datasets import CONLL_03
+from requests.adapters import HTTPAdapter
+from flair.data import Corpus
+from flair.datasets import CONLL_03, ColumnDataset, SentenceDataset
 
+from ner_sample.caching import CorpusCache
 from ner_sample.data import DataLoader
+from ner_sample.evaluation import GoldLabels
+
+# Column format of the CONLL 03 files (as defined by flair's CONLL_03 corpus)
+CONLL_03_COLUMNS = {0: "text", 1: "pos", 2: "np", 3: "ner"}
 
 
 class ConllDataLoader(DataLoader):
@@ -15,38 +25,86 @@ class ConllDataLoader(DataLoader):
         dataset_version="1",
         local_data_path="../data/processed/",
         dataset_path="https://raw.githubusercontent.com/glample/tagger/master/dataset/",
-        downsample=0.05
+        downsample=0.05,
+        checksums: Dict[str, str] = None,
+        max_workers: int = 3,
+        download_retries: int = 3,
+        chunk_size: int = 1 << 16,
+        seed: int = 42,
+        corpus_cache: CorpusCache = None,
     ):
         """
         Data Loader for the CONLL 03 dataset.
         download_dataset downloads the three datasets (train, testa and testb) from Github
-        get_dataset returns a flair Corpus object holding the three datasets.
+        get_dataset returns a flair Corpus object holding the three datasets,
+        and the test sentences. The gold labels of the test sentences are moved
+        to self.gold_labels (to be passed as y_test to NEREvaluator)
+        :param checksums: Optional sha256 hex digest of each fold,
+        e.g. {"eng.train": "..."}. Folds are verified after downloading,
+        and existing folds which don't match are downloaded again
+        :param max_workers: Number of folds downloaded concurrently
+        :param download_retries: Number of times an interrupted download is resumed
+        :param chunk_size: Number of bytes written to disk at a time
+        :param seed: Random seed for downsampling, so every load returns the same folds
+        :param corpus_cache: Optional CorpusCache. If passed, the tokenized and
+        downsampled corpus is stored in the cache, and later loads skip parsing
         """
         self.folds = ("eng.train", "eng.testa", "eng.testb")
         self.local_data_path = local_data_path
         self.dataset_path = dataset_path
         self.downsample = downsample
-        super().__init__(dataset_name=dataset_name, dataset_version=dataset_version, downsample=downsample)
+        self.checksums = checksums if checksums else {}
+        self.max_workers = max_workers
+        self.download_retries = download_retries
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.corpus_cache = corpus_cache
+        self.gold_labels = None
+        super().__init__(
+            dataset_name=dataset_name,
+            dataset_version=dataset_version,
+            downsample=downsample,
+            seed=seed,
+        )
 
     def download_dataset(self) -> None:
+        """
+        Downloads the missing folds concurrently, over one pooled HTTP session.
+        Each fold is streamed into a .part file, which is resumed
+        (using an HTTP range request) if the download is interrupted,
+        and is only renamed to the fold's name once it is complete and verified
+        """
         if self.dataset_name == "conll_03" and self.dataset_version == "1":
+            local_path = Path(self.local_data_path, self.dataset_name).resolve()
+            local_path.mkdir(parents=True, exist_ok=True)
 
-            for fold in self.folds:
-                local_path = Path(self.local_data_path, self.dataset_name).resolve()
-                fold_path = self.dataset_path + fold
-                if not local_path.exists():
-                    local_path.mkdir(parents=True)
+            missing_folds = [
+                fold
+                for fold in self.folds
+                if not self._fold_exists(Path(local_path, fold), fold)
+            ]
+            if not missing_folds:
+                print("Dataset already exists, skipping download")
+                return
 
-                dataset_file = Path(local_path, fold)
-                if dataset_file.exists():
-                    print("Dataset already exists, skipping download")
-                    return
+            with requests.Session() as session:
+                adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
 
-                response = requests.get(fold_path)
-                dataset_raw = response.text
-                with open(dataset_file, "w") as f:
-                    f.write(dataset_raw)
-                print(f"Finished writing fold {fold} to {self.local_data_path}")
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = {
+                        executor.submit(
+                            self._download_fold, session, fold, Path(local_path, fold)
+                        ): fold
+                        for fold in missing_folds
+                    }
+                    for future in as_completed(futures):
+                        future.result()
+                        print(
+                            f"Finished writing fold {futures[future]} "
+                            f"to {self.local_data_path}"
+                        )
 
             print(
                 f"Finished downloading dataset {self.dataset_name} version {self.dataset_version}"
@@ -55,22 +113,111 @@ class ConllDataLoader(DataLoader):
         else:
             raise ValueError("Selected dataset was not found")
 
+    def _fold_exists(self, dataset_file: Path, fold: str) -> bool:
+        if not dataset_file.exists():
+            return False
+        if fold in self.checksums and _sha256(dataset_file) != self.checksums[fold]:
+            print(f"Checksum of existing fold {fold} does not match, downloading again")
+            return False
+        return True
+
+    def _download_fold(
+        self, session: requests.Session, fold: str, dataset_file: Path
+    ) -> None:
+        part_file = dataset_file.with_name(dataset_file.name + ".part")
+        for attempt in range(self.download_retries + 1):
+            try:
+                self._download_to_part_file(session, fold, part_file)
+                break
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+            ):
+                if attempt == self.download_retries:
+                    raise
+                print(f"Download of fold {fold} was interrupted, resuming")
+
+        if fold in self.checksums and _sha256(part_file) != self.checksums[fold]:
+            part_file.unlink()
+            raise ValueError(f"Checksum mismatch for downloaded fold {fold}")
+        os.replace(part_file, dataset_file)
+
+    def _download_to_part_file(
+        self, session: requests.Session, fold: str, part_file: Path
+    ) -> None:
+        """
+        Streams a fold into part_file, continuing from the end of part_file
+        if it holds a previous partial download
+        """
+        offset = part_file.stat().st_size if part_file.exists() else 0
+        # The range must apply to the decoded bytes of part_file,
+        # so compressed responses are not accepted when resuming
+        headers = (
+            {"Range": f"bytes={offset}-", "Accept-Encoding": "identity"}
+            if offset
+            else {}
+        )
+
+        with session.get(
+            self.dataset_path + fold, headers=headers, stream=True, timeout=60
+        ) as response:
+            if response.status_code == 416:
+                if _total_size(response) == offset:
+                    # The partial file already holds the entire fold
+                    return
+                part_file.unlink()
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Partial download of fold {fold} does not match the fold's size"
+                )
+            response.raise_for_status()
+
+            if response.status_code != 206:
+                # The server ignored the range request, so start over
+                offset = 0
+            elif response.headers.get("Content-Encoding", "identity") != "identity":
+                part_file.unlink()
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Got a compressed range of fold {fold}, downloading it again"
+                )
+            expected_size = _expected_size(response, offset)
+
+            with open(part_file, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                f.truncate()
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                size = f.tell()
+
+        if expected_size is not None and size != expected_size:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Received {size} out of {expected_size} bytes of fold {fold}"
+            )
+
     def get_dataset(self) -> Tuple:
         try:
-            corpus = CONLL_03(base_path=self.local_data_path, in_memory=True)
-            corpus = corpus.downsample(self.downsample)  # Just for example purposes
+            corpus = None
+            if self.corpus_cache:
+                key = self.corpus_cache.get_key(
+                    self.dataset_name,
+                    self.dataset_version,
+                    downsample=self.downsample,
+                    seed=self.seed,
+                )
+                corpus = self.corpus_cache.load(key)
+
+            if corpus is None:
+                corpus = CONLL_03(base_path=self.local_data_path, in_memory=True)
+                corpus = self._downsample(corpus)  # Just for example purposes
+                if self.corpus_cache:
+                    self.corpus_cache.store(key, corpus)
 
             train = corpus  # includes train and dev
 
             test = corpus.test
 
-            # Copy labels to a new tag (Flair overrides the ner tag during prediction)
-            for sentence in test:
-                for token in sentence.tokens:
-                    token.annotation_layers["gold_ner"] = copy.deepcopy(
-                        token.annotation_layers["ner"]
-                    )
-                    token.annotation_layers["ner"][0].value = "O"
+            # Move the gold labels into a side store
+            # (Flair overrides the ner tag during prediction)
+            self.gold_labels = GoldLabels.from_sentences(test)
 
             return train, test
 
@@ -78,3 +225,75 @@ class ConllDataLoader(DataLoader):
             print(
                 f"Dataset {self.dataset_name} with version {self.dataset_version} not found in data/raw"
             )
+
+    def _downsample(self, corpus: Corpus) -> Corpus:
+        """
+        Keeps a random sample of self.downsample of each fold (in the original order).
+        Unlike Corpus.downsample, the sample only depends on self.seed
+        """
+        rng = random.Random(self.seed)
+        folds = []
+        for dataset in (corpus.train, corpus.dev, corpus.test):
+            sampled_size = round(len(dataset) * self.downsample)
+            indices = sorted(rng.sample(range(len(dataset)), sampled_size))
+            folds.append(SentenceDataset([dataset[i] for i in indices]))
+        return Corpus(*folds, name=corpus.name)
+
+    def iter_batches(self, split: str = "test", batch_size: int = 32):
+        """
+        Reads one fold lazily (flair keeps only the file offset of each sentence
+        in memory) and yields batches of batch_size sentences.
+        Unlike get_dataset, the fold is not downsampled.
+        :param split: "train", "dev" or "test"
+        :param batch_size: Number of sentences per batch
+        :return: A generator of (sentences, gold_labels) tuples. As in get_dataset,
+        the gold labels of the test split are moved to a GoldLabels side store
+        (gold_labels is None for the other splits)
+        """
+        folds = dict(zip(("train", "dev", "test"), self.folds))
+        if split not in folds:
+            raise ValueError(f"Unknown split {split}, expected one of {list(folds)}")
+
+        dataset = ColumnDataset(
+            Path(self.local_data_path, self.dataset_name, folds[split]),
+            CONLL_03_COLUMNS,
+            tag_to_bioes="ner",
+            in_memory=False,
+        )
+        for start in range(0, len(dataset), batch_size):
+            batch = [
+                dataset[i] for i in range(start, min(start + batch_size, len(dataset)))
+            ]
+            gold_labels = GoldLabels.from_sentences(batch) if split == "test" else None
+            yield batch, gold_labels
+
+
+def _expected_size(response: requests.Response, offset: int):
+    """
+    Total size of the file, according to the response headers (if available)
+    """
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total != "*" else None
+    content_length = response.headers.get("Content-Length")
+    if content_length and "Content-Encoding" not in response.headers:
+        return offset + int(content_length)
+    return None
+
+
+def _total_size(response: requests.Response):
+    """
+    Total size of the file, according to a 416 response's Content-Range
+    (e.g. "bytes */1234"), if available
+    """
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _sha256(file_path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,73 @@
+from typing import List
+
+import numpy as np
+
+from ner_sample.evaluation.span_metrics import TagEncoder
+
+
+class GoldLabels:
+    def __init__(self, tag_ids: np.ndarray, offsets: np.ndarray, tag_names: List[str]):
+        """
+        Side store of the gold tags of a list of sentences,
+        held as integer arrays instead of flair labels.
+        Use from_sentences to create it, and pass it as y_test to NEREvaluator.
+        Slicing (e.g. gold_labels[10:20]) returns the gold labels of those sentences
+        :param tag_ids: flat array of tag ids of all tokens
+        :param offsets: offset of each sentence's first token, plus the total length
+        :param tag_names: tag name of each tag id
+        """
+        self.tag_ids = tag_ids
+        self.offsets = offsets
+        self.tag_names = tag_names
+
+    @classmethod
+    def from_sentences(cls, sentences, tag_type: str = "ner") -> "GoldLabels":
+        """
+        Moves the labels of tag_type into a new GoldLabels store.
+        The label values on the sentences are set to "O",
+        so they can't leak into the predictions
+        :param sentences: flair sentences holding the gold labels
+        :param tag_type: Label layer holding the gold labels
+        """
+        encoder = TagEncoder()
+        tag_ids = []
+        offsets = [0]
+        for sentence in sentences:
+            for token in sentence.tokens:
+                label = token.annotation_layers[tag_type][0]
+                tag_ids.append(encoder.encode_tag(label.value))
+                label.value = "O"
+            offsets.append(len(tag_ids))
+
+        return cls(
+            tag_ids=np.asarray(tag_ids, dtype=np.int32),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            tag_names=encoder.tag_names,
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: slice) -> "GoldLabels":
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("GoldLabels only supports slicing with a step of 1")
+
+        start, stop, _ = index.indices(len(self))
+        stop = max(start, stop)
+        offsets = self.offsets[start : stop + 1]
+        return GoldLabels(
+            tag_ids=self.tag_ids[offsets[0] : offsets[-1]],
+            offsets=offsets - offsets[0],
+            tag_names=self.tag_names,
+        )
+
+    def sentence_tags(self, sentence_index: int) -> List[str]:
+        """
+        Returns the gold tag names of one sentence
+        """
+        start, end = self.offsets[sentence_index], self.offsets[sentence_index + 1]
+        return [self.tag_names[tag_id] for tag_id in self.tag_ids[start:end]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.tag_ids.nbytes + self.offsets.nbytes
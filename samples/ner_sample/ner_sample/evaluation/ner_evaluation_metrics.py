@@ -6,16 +6,26 @@ class NEREvaluationMetrics(EvaluationMetrics):
     This class holds the metrics calculated during the experiment run
     """
 
-    def __init__(self, f1, accuracy):
+    def __init__(self, f1, accuracy, precision=None, recall=None):
         self.f1 = f1
         self.accuracy = accuracy
+        self.precision = precision
+        self.recall = recall
         super().__init__()
 
     def __repr__(self):
-        return f"F1 score: {self.f1}, Accuracy score: {self.accuracy}"
+        return (
+            f"F1 score: {self.f1}, Accuracy score: {self.accuracy}, "
+            f"Precision: {self.precision}, Recall: {self.recall}"
+        )
 
     def get_metrics(self):
         """
-        Return a dict with f1 and accuracy values
+        Return a dict with f1 and accuracy values (and precision and recall, if set)
         """
-        return { "f1": self.f1, "accuracy":self.accuracy }
\ No newline at end of file
+        metrics = { "f1": self.f1, "accuracy":self.accuracy }
+        if self.precision is not None:
+            metrics["precision"] = self.precision
+        if self.recall is not None:
+            metrics["recall"] = self.recall
+        return metrics
@@ -1,24 +1,93 @@
-from seqeval.metrics import f1_score, accuracy_score
+import numpy as np
 
 from ner_sample.evaluation import Evaluator, NEREvaluationMetrics
+from ner_sample.evaluation.gold_labels import GoldLabels
+from ner_sample.evaluation.span_metrics import (
+    TagEncoder,
+    precision_recall_f1,
+    span_counts,
+)
 
 
 class NEREvaluator(Evaluator):
     """
-    This class holds the logic for evaluating a prediction outcome
-    y_test in our case is None
+    This class holds the logic for evaluating a prediction outcome.
+    y_test holds the gold labels of the test sentences (a GoldLabels object).
+    Gold and predicted tags are encoded into integer arrays in a single pass,
+    and span level scores are then calculated with vectorized numpy operations
+    (returning the same values as seqeval's f1_score and accuracy_score).
+    Supports streaming evaluation: span and token counts are accumulated
+    over batches of sentences
     """
 
+    def __init__(self, evaluator_name=None):
+        super().__init__(evaluator_name=evaluator_name)
+        self.reset()
+
     def evaluate(self, y_test, predictions) -> NEREvaluationMetrics:
+        self.reset()
+        self.update(y_test, predictions)
+        return self.finalize()
+
+    def reset(self) -> None:
+        self._encoder = TagEncoder()
+        self._span_counts = np.zeros(3, dtype=np.int64)
+        self._n_correct_tokens = 0
+        self._n_tokens = 0
+
+    def update(self, y_true_batch: GoldLabels, predictions_batch) -> None:
+        """
+        :param y_true_batch: Gold labels of the batch's sentences
+        (see ConllDataLoader.gold_labels). If None, gold labels are read
+        from the gold_ner tag of each token, which must be set by the caller
+        (ConllDataLoader.get_dataset does not create it)
+        :param predictions_batch: Tagged sentences
+        """
+        if y_true_batch is None:
+            golds = []
+            for sentence in predictions_batch:
+                for token in sentence.tokens:
+                    if not token.annotation_layers.get("gold_ner"):
+                        raise ValueError(
+                            f"Token '{token.text}' has no gold_ner tag. "
+                            "Pass the gold labels as y_test "
+                            "(e.g. ConllDataLoader.gold_labels)"
+                        )
+                    golds.append(
+                        self._encoder.encode_tag(token.get_tag("gold_ner").value)
+                    )
+            golds = np.asarray(golds, dtype=np.int32)
+        else:
+            # Map the gold store's tag ids to this evaluator's tag ids
+            tag_id_map = np.asarray(
+                [self._encoder.encode_tag(tag) for tag in y_true_batch.tag_names],
+                dtype=np.int32,
+            )
+            golds = tag_id_map[y_true_batch.tag_ids]
 
-        golds = []
         predicted = []
-        for sentence in predictions:
-            gold_tags = [token.get_tag("gold_ner").value for token in sentence.tokens]
-            golds.append(gold_tags)
-            predicted_tags = [token.get_tag("ner").value for token in sentence.tokens]
-            predicted.append(predicted_tags)
-
-        f1 = f1_score(golds, predicted)
-        accuracy = accuracy_score(golds, predicted)
-        return NEREvaluationMetrics(f1=f1, accuracy=accuracy)
+        offsets = [0]
+        for sentence in predictions_batch:
+            for token in sentence.tokens:
+                predicted.append(self._encoder.encode_tag(token.get_tag("ner").value))
+            offsets.append(len(predicted))
+        predicted = np.asarray(predicted, dtype=np.int32)
+        offsets = np.asarray(offsets, dtype=np.int64)
+
+        if y_true_batch is not None and not np.array_equal(
+            offsets, y_true_batch.offsets
+        ):
+            raise ValueError("Gold labels do not match the predicted sentences")
+
+        self._span_counts += span_counts(
+            golds, predicted, offsets, self._encoder.tag_names
+        )
+        self._n_correct_tokens += int(np.count_nonzero(golds == predicted))
+        self._n_tokens += len(golds)
+
+    def finalize(self) -> NEREvaluationMetrics:
+        precision, recall, f1 = precision_recall_f1(*self._span_counts.tolist())
+        accuracy = self._n_correct_tokens / self._n_tokens if self._n_tokens else 0.0
+        return NEREvaluationMetrics(
+            f1=f1, accuracy=accuracy, precision=precision, recall=recall
+        )
@@ -0,0 +1,184 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+# Codes of a tag's chunk prefix (its first character, as in seqeval)
+OUTSIDE, BEGIN, INSIDE, END, SINGLE, DOT, OTHER = range(7)
+_PREFIX_CODES = {"O": OUTSIDE, "B": BEGIN, "I": INSIDE, "E": END, "S": SINGLE, ".": DOT}
+
+# Type code of tags without a type (such as "O"),
+# and of the (virtual) tag before the first token
+_UNTYPED = 0
+_NO_TYPE = -1
+
+
+class TagEncoder:
+    """
+    Maps tag strings (e.g. "B-PER") to integer ids.
+    Gold and predicted tags should be encoded using the same encoder.
+    :param tag_names: Optional tags to register upfront
+    """
+
+    def __init__(self, tag_names: Iterable[str] = ()):
+        self.tag_ids = {}
+        for tag_name in tag_names:
+            self.encode_tag(tag_name)
+
+    def encode_tag(self, tag_name: str) -> int:
+        return self.tag_ids.setdefault(tag_name, len(self.tag_ids))
+
+    def encode(self, sequences: Iterable[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encodes a list of tag sequences (one per sentence)
+        :return: flat array of tag ids, and the offset of each sentence's first tag
+        (with one extra offset holding the total number of tags)
+        """
+        tag_ids = []
+        offsets = [0]
+        for sequence in sequences:
+            tag_ids.extend(self.encode_tag(tag_name) for tag_name in sequence)
+            offsets.append(len(tag_ids))
+        return np.asarray(tag_ids, dtype=np.int32), np.asarray(offsets, dtype=np.int64)
+
+    @property
+    def tag_names(self) -> List[str]:
+        return list(self.tag_ids)
+
+
+def token_accuracy(gold_ids: np.ndarray, predicted_ids: np.ndarray) -> float:
+    """
+    Ratio of tokens whose predicted tag equals the gold tag
+    (same as seqeval's accuracy_score)
+    """
+    if len(gold_ids) == 0:
+        return 0.0
+    return int(np.count_nonzero(gold_ids == predicted_ids)) / len(gold_ids)
+
+
+def span_scores(
+    gold_ids: np.ndarray,
+    predicted_ids: np.ndarray,
+    offsets: np.ndarray,
+    tag_names: List[str],
+) -> Tuple[float, float, float]:
+    """
+    Span level (entity level) micro averaged precision, recall and f1.
+    Chunks are extracted with the same (conlleval compatible) rules as seqeval's
+    default mode, using vectorized operations on the encoded tags.
+    :param gold_ids: flat array of gold tag ids
+    :param predicted_ids: flat array of predicted tag ids
+    :param offsets: offset of each sentence's first tag, plus the total length
+    :param tag_names: tag name of each tag id (see TagEncoder.tag_names)
+    :return: precision, recall, f1
+    """
+    return precision_recall_f1(
+        *span_counts(gold_ids, predicted_ids, offsets, tag_names)
+    )
+
+
+def span_counts(
+    gold_ids: np.ndarray,
+    predicted_ids: np.ndarray,
+    offsets: np.ndarray,
+    tag_names: List[str],
+) -> Tuple[int, int, int]:
+    """
+    Counts the spans needed for calculating precision, recall and f1.
+    Spans never cross sentence boundaries, so counts of
+    different batches of sentences can be summed.
+    See span_scores for the parameters
+    :return: number of correctly predicted spans, predicted spans and gold spans
+    """
+    prefixes, types = _parse_tags(tag_names)
+    positions = _flat_positions(offsets)
+    gold_spans = _extract_spans(gold_ids, positions, prefixes, types)
+    predicted_spans = _extract_spans(predicted_ids, positions, prefixes, types)
+
+    nb_correct = len(np.intersect1d(gold_spans, predicted_spans, assume_unique=True))
+    return nb_correct, len(predicted_spans), len(gold_spans)
+
+
+def precision_recall_f1(
+    nb_correct: int, nb_pred: int, nb_true: int
+) -> Tuple[float, float, float]:
+    """
+    Micro averaged precision, recall and f1 out of span counts (see span_counts)
+    """
+    precision = nb_correct / nb_pred if nb_pred > 0 else 0.0
+    recall = nb_correct / nb_true if nb_true > 0 else 0.0
+    denominator = precision + recall
+    if denominator == 0:
+        denominator = 1
+    f1 = 2.0 * precision * recall / denominator
+    return precision, recall, f1
+
+
+def _parse_tags(tag_names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splits each tag into prefix code and type code, the way seqeval does
+    """
+    type_codes = {"_": _UNTYPED}
+    prefixes = np.empty(len(tag_names), dtype=np.int8)
+    types = np.empty(len(tag_names), dtype=np.int64)
+    for tag_id, tag_name in enumerate(tag_names):
+        prefixes[tag_id] = _PREFIX_CODES.get(tag_name[0], OTHER)
+        type_name = tag_name[1:].split("-", maxsplit=1)[-1] or "_"
+        types[tag_id] = type_codes.setdefault(type_name, len(type_codes))
+    return prefixes, types
+
+
+def _flat_positions(offsets: np.ndarray) -> np.ndarray:
+    """
+    Position of each token once sentences are concatenated with
+    an "O" tag after each sentence (as seqeval flattens nested lists)
+    """
+    lengths = np.diff(offsets)
+    sentence_index = np.repeat(np.arange(len(lengths)), lengths)
+    return np.arange(offsets[-1]) + sentence_index
+
+
+def _extract_spans(
+    tag_ids: np.ndarray,
+    positions: np.ndarray,
+    prefixes: np.ndarray,
+    types: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized version of seqeval's get_entities.
+    :return: sorted array of unique span ids, each encoding (type, start, end)
+    """
+    # Flattened sequence, with an "O" between sentences and at the end
+    length = (positions[-1] + 2) if len(positions) else 1
+    prefix = np.full(length, OUTSIDE, dtype=np.int8)
+    type_ = np.full(length, _UNTYPED, dtype=np.int64)
+    prefix[positions] = prefixes[tag_ids]
+    type_[positions] = types[tag_ids]
+
+    prev_prefix = np.concatenate(([OUTSIDE], prefix[:-1]))
+    prev_type = np.concatenate(([_NO_TYPE], type_[:-1]))
+
+    type_changed = prev_type != type_
+    closes = np.isin(prefix, (BEGIN, SINGLE, OUTSIDE))
+    chunk_end = (
+        np.isin(prev_prefix, (END, SINGLE))
+        | (np.isin(prev_prefix, (BEGIN, INSIDE)) & closes)
+        | (~np.isin(prev_prefix, (OUTSIDE, DOT)) & type_changed)
+    )
+    chunk_start = (
+        np.isin(prefix, (BEGIN, SINGLE))
+        | (
+            np.isin(prev_prefix, (END, SINGLE, OUTSIDE))
+            & np.isin(prefix, (END, INSIDE))
+        )
+        | (~np.isin(prefix, (OUTSIDE, DOT)) & type_changed)
+    )
+
+    index = np.arange(length)
+    last_start = np.maximum.accumulate(np.where(chunk_start, index, 0))
+
+    # A chunk ending at i covers [start, i - 1], where start is the last chunk start
+    # before i. No chunk can end at index 0, as nothing precedes it
+    ends = np.flatnonzero(chunk_end)
+    starts = last_start[ends - 1]
+    span_types = prev_type[ends]
+    return (span_types * (length + 1) + starts) * (length + 1) + (ends - 1)
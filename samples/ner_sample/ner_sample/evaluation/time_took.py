@@ -0,0 +1,179 @@
+import logging
+import math
+import random
+import threading
+from time import perf_counter
+from typing import Dict, List
+
+from ner_sample import LoggableObject
+
+logger = logging.getLogger(__name__)
+
+# Names of the spans currently open in each thread, outermost first.
+# Every recorder has its own stack (spans without a recorder share one), so a
+# recorder's spans are named and exported regardless of the other open spans
+_open_spans = threading.local()
+
+
+def _span_stack(recorder: "SpanRecorder" = None) -> List[str]:
+    if not hasattr(_open_spans, "stacks"):
+        _open_spans.stacks = {}
+    return _open_spans.stacks.setdefault(id(recorder), [])
+
+
+def _close_span(recorder: "SpanRecorder" = None) -> List[str]:
+    stack = _span_stack(recorder)
+    stack.pop()
+    if not stack:
+        del _open_spans.stacks[id(recorder)]
+    return stack
+
+
+class TimeTook(object):
+    """
+    Calculates the time a block took to run, using a monotonic clock.
+    Spans can be nested: a span opened inside another span of the same recorder
+    is named "<outer>/<inner>" (e.g. "evaluate/predict").
+    If a SpanRecorder is passed, every duration is added to the span's histogram.
+    Example usage:
+    with TimeTook("sample"):
+        s = [x for x in range(10000000)]
+    Modified from:
+    https://blog.usejournal.com/how-to-create-your-own-timing-context-manager-in-python-a0e944b48cf8
+    """
+
+    def __init__(self, description, recorder: "SpanRecorder" = None):
+        self.description = description
+        self.recorder = recorder
+        self.name = description
+        self.elapsed = None
+
+    def __enter__(self):
+        stack = _span_stack(self.recorder)
+        stack.append(self.description)
+        self.name = "/".join(stack)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.end = perf_counter()
+        self.elapsed = self.end - self.start
+        stack = _close_span(self.recorder)
+
+        # Nested spans can be on a hot path, only log the outermost ones
+        log = logger.debug if stack else logger.info
+        log(f"Time took for {self.name}: {self.elapsed}")
+        if self.recorder:
+            self.recorder.record(self.name, self.elapsed)
+            if not stack:
+                self.recorder.export(prefix=self.name)
+
+
+class SpanHistogram:
+    def __init__(self, max_samples: int = 1024):
+        """
+        Distribution of the durations of one span.
+        count, max and total are exact, percentiles are calculated on
+        a uniform sample (reservoir) of at most max_samples durations
+        :param max_samples: Maximum number of durations kept
+        """
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self._random = random.Random(0)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(duration)
+        else:
+            i = self._random.randrange(self.count)
+            if i < self.max_samples:
+                self.samples[i] = duration
+
+    def percentile(self, q: float) -> float:
+        """
+        Nearest rank percentile of the sampled durations
+        :param q: Percentile, between 0 and 100
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(math.ceil(q / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def get_metrics(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_sec": self.total,
+            "p50_sec": self.percentile(50),
+            "p95_sec": self.percentile(95),
+            "max_sec": self.max,
+        }
+
+
+class SpanRecorder(LoggableObject):
+    def __init__(
+        self, experiment_logger=None, max_samples: int = 1024, recorder_name=None
+    ):
+        """
+        Collects the durations of TimeTook spans into a histogram per span.
+        When an outermost span of this recorder ends, the histograms of it and
+        its nested spans are logged as metrics to the experiment logger
+        (if passed), named
+        "timing/<span name>/<count|total_sec|p50_sec|p95_sec|max_sec>"
+        :param experiment_logger: Optional Experimentation to export the spans to
+        :param max_samples: Number of durations kept per span for percentiles
+        :param recorder_name: Name of recorder, for logging purposes
+        """
+        self.experiment_logger = experiment_logger
+        self.max_samples = max_samples
+        self.histograms: Dict[str, SpanHistogram] = {}
+        self._lock = threading.Lock()
+        super().__init__(name=recorder_name)
+
+    def span(self, description) -> TimeTook:
+        """
+        Returns a TimeTook span recording into this recorder
+        """
+        return TimeTook(description, recorder=self)
+
+    def record(self, name: str, duration: float) -> None:
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = SpanHistogram(self.max_samples)
+            self.histograms[name].add(duration)
+
+    def export(self, prefix: str = None) -> None:
+        """
+        Logs the span metrics to the experiment logger
+        :param prefix: Only export this span and the spans nested in it
+        """
+        if self.experiment_logger:
+            self.experiment_logger.log_metrics(self.get_metrics(prefix))
+
+    def get_metrics(self, prefix: str = None) -> Dict:
+        with self._lock:
+            histograms = list(self.histograms.items())
+
+        metrics = {}
+        for name, histogram in histograms:
+            if prefix and name != prefix and not name.startswith(prefix + "/"):
+                continue
+            for stat, value in histogram.get_metrics().items():
+                metrics[f"timing/{name}/{stat}"] = value
+        return metrics
+
+    def __getstate__(self):
+        # Locks can't be pickled (e.g. when sent to a worker process)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -1,14 +1,54 @@
+import functools
 import logging
+from itertools import islice, repeat
 
 from ner_sample import LoggableObject
+from ner_sample.caching import PredictionCache
 from ner_sample.data.data_loader import DataLoader
-from ner_sample.evaluation import EvaluationMetrics, StepEvaluationMetrics, Evaluator
+from ner_sample.evaluation import (
+    EvaluationMetrics,
+    RunProfiler,
+    SpanRecorder,
+    StepEvaluationMetrics,
+    Evaluator,
+    GoldLabels,
+)
 from ner_sample.experimentation import Experimentation
 from ner_sample.models import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
+def _timed(method):
+    """
+    Records the duration of an ExperimentRunner method as a span
+    (named after the method) in the runner's span recorder
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.span_recorder.span(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _profiled(method):
+    """
+    Profiles an ExperimentRunner method with the runner's profiler, if it has one
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler:
+            return method(self, *args, **kwargs)
+        experiment_logger = self.experiment_logger if self.log_experiment else None
+        with self.profiler.profile(method.__name__, experiment_logger):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class ExperimentRunner:
     def __init__(
         self,
@@ -22,6 +62,10 @@ class ExperimentRunner:
         log_experiment: bool = True,
         experiment_logger: Experimentation = None,
         experiment_name: str = None,
+        prediction_cache: PredictionCache = None,
+        evaluation_chunk_size: int = None,
+        span_recorder: SpanRecorder = None,
+        profiler: RunProfiler = None,
         **experiment_params_to_log,
     ):
         """
@@ -42,6 +86,23 @@ class ExperimentRunner:
         (e.g. MlflowExperimentation)
         :param experiment_name: Name of experiment,
         to be used by the experimentation service
+        :param prediction_cache: Optional PredictionCache. If passed, predictions of
+        the same fitted model on the same test set are loaded from the cache
+        instead of calling model.predict
+        :param evaluation_chunk_size: Optional number of test samples per chunk.
+        If passed, evaluate() predicts and evaluates the test set chunk by chunk
+        (using the evaluator's update and finalize methods), so peak memory does not
+        grow with the size of the test set. Predictions are then not kept
+        (run() does not call predict()).
+        If X_test is None, the test set is read using data_loader.iter_batches
+        :param span_recorder: Optional SpanRecorder. log, fit_model, predict and
+        evaluate (and the predict and update calls of each evaluation chunk)
+        are timed as spans, and the span histograms (count, p50, p95, max)
+        are logged as metrics when each of them ends.
+        By default, a new SpanRecorder exporting to experiment_logger is used
+        :param profiler: Optional RunProfiler. If passed, fit_model, predict and
+        evaluate are profiled (cProfile and/or tracemalloc), the reports are
+        uploaded as artifacts and the peak memory is logged as metrics
 
         :example:
 
@@ -82,8 +143,20 @@ class ExperimentRunner:
         self.experiment_logger = experiment_logger
         self.log_experiment = log_experiment
         self.experiment_name = experiment_name
+        self.prediction_cache = prediction_cache
+        self.evaluation_chunk_size = evaluation_chunk_size
         self._evaluation_metrics = []  # Metrics gathered during experiment
         self._predictions = []  # Predictions gathered during experiment
+        self.span_recorder = span_recorder or SpanRecorder(
+            experiment_logger=experiment_logger if log_experiment else None
+        )
+        self.profiler = profiler
+
+        if self.evaluation_chunk_size and not self.evaluator.supports_streaming():
+            logger.warning(
+                f"{type(self.evaluator).__name__} does not support streaming "
+                "evaluation, the predictions of all chunks are held in memory"
+            )
 
         logger.info(f"Starting experiment: {self.experiment_name}...")
 
@@ -102,6 +175,7 @@ class ExperimentRunner:
 
             self.log(data_loader, evaluator, model)
 
+    @_timed
     def log(self, data_loader, evaluator, model):
         """
         Stores the parameters and metrics from the various modules
@@ -118,6 +192,10 @@ class ExperimentRunner:
             self._log_loggable_object(model.preprocessor, "Preprocessor")
         if model.postprocessor:
             self._log_loggable_object(model.postprocessor, "Postprocessor")
+        if self.prediction_cache:
+            self._log_loggable_object(self.prediction_cache, "PredictionCache")
+        if self.profiler:
+            self._log_loggable_object(self.profiler, "Profiler")
         # Log additional inputs to this class
         if self.additional_params:
             logger.info(
@@ -141,51 +219,125 @@ class ExperimentRunner:
         """
         self.fit_model()
 
-        self.predict()
+        if not self.evaluation_chunk_size:
+            # Chunked evaluation predicts the test set itself, chunk by chunk
+            self.predict()
 
         evaluation_result = self.evaluate()
 
         return evaluation_result
 
+    @_timed
+    @_profiled
     def fit_model(self) -> None:
         logger.info(f"Fitting model {self.model.name} on {len(self.X_train)} samples")
 
         self.model.fit(X=self.X_train, y=self.y_train)
 
+    @_timed
+    @_profiled
     def predict(self):
         """
         Calls the model predict function with the input X_test
         :return: None
         """
+        if self.X_test is None:
+            raise ValueError(
+                "X_test is None, cannot predict the whole test set. "
+                "Set evaluation_chunk_size to read it in batches during evaluate()"
+            )
+        self._predictions = self._predict(self.X_test)
+
+    def _predict(self, X, model_fingerprint: str = None):
+        """
+        Predicts X, or loads the predictions from the prediction cache if available
+        :param model_fingerprint: Fingerprint of the model for the cache key,
+        calculated here if not passed
+        """
+        if self.prediction_cache:
+            # Calculated before predict, since predict might modify X
+            key = self.prediction_cache.get_key(self.model, X, model_fingerprint)
+            predictions = self.prediction_cache.load(key, self.model, X)
+            if predictions is not None:
+                logger.info("Loaded predictions from cache, skipping model.predict call")
+                self._log_prediction_cache_metrics()
+                return predictions
+
         logger.info(
-            f"Running model.predict() using model {self.model.name} on {len(self.X_test)} test samples"
+            f"Running model.predict() using model {self.model.name} on {len(X)} test samples"
         )
-        self._predictions = self.model.predict(X=self.X_test)
+        predictions = self.model.predict(X=X)
+
+        if self.prediction_cache:
+            self.prediction_cache.store(key, self.model, predictions)
+            self._log_prediction_cache_metrics()
+        return predictions
 
+    def _log_prediction_cache_metrics(self):
+        if self.log_experiment:
+            self.experiment_logger.log_metrics(self.prediction_cache.get_metrics())
+
+    @_timed
+    @_profiled
     def evaluate(self) -> EvaluationMetrics:
         """
         Runs evaluation on the given model and test set
         :return: EvaluationResult
         """
 
-        if self._predictions is None or len(self._predictions) == 0:
-            logger.info("Predictions not found, running model.predict")
-            self.predict()
+        if self.evaluation_chunk_size:
+            evaluation_result = self._evaluate_in_chunks()
         else:
-            logger.info("Predictions found, skipping model.predict call")
+            if self._predictions is None or len(self._predictions) == 0:
+                logger.info("Predictions not found, running model.predict")
+                self.predict()
+            else:
+                logger.info("Predictions found, skipping model.predict call")
+
+            evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
 
-        evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
         if self.log_experiment:
             if isinstance(evaluation_result, StepEvaluationMetrics):
-                for step in evaluation_result.get_steps():
-                    step_metrics = evaluation_result.get_metrics(step=step)
-                    self.experiment_logger.log_metrics(step_metrics)
+                self.experiment_logger.log_step_metrics(evaluation_result)
             else:
                 self.experiment_logger.log_evaluation_result(evaluation_result)
 
         self._evaluation_metrics = evaluation_result
         return self._evaluation_metrics
 
+    def _evaluate_in_chunks(self) -> EvaluationMetrics:
+        """
+        Pipelines model.predict and evaluator.update over chunks of the test set,
+        so only one chunk of predictions is held in memory at a time
+        """
+        logger.info(
+            f"Predicting and evaluating in chunks of {self.evaluation_chunk_size} "
+            f"test samples"
+        )
+        if self.X_test is None:
+            # Read the test set lazily, for datasets which do not fit in memory
+            chunks = self.data_loader.iter_batches(
+                split="test", batch_size=self.evaluation_chunk_size
+            )
+        else:
+            chunks = zip(
+                _iter_chunks(self.X_test, self.evaluation_chunk_size),
+                _iter_chunks(self.y_test, self.evaluation_chunk_size),
+            )
+
+        # The model does not change between chunks, fingerprint it only once
+        model_fingerprint = None
+        if self.prediction_cache:
+            model_fingerprint = self.model.fingerprint()
+
+        self.evaluator.reset()
+        for X_chunk, y_chunk in chunks:
+            with self.span_recorder.span("predict"):
+                predictions = self._predict(X_chunk, model_fingerprint)
+            with self.span_recorder.span("update"):
+                self.evaluator.update(y_chunk, predictions)
+        return self.evaluator.finalize()
+
     def get_predictions(self):
         """
         Get already calculated predictions.
@@ -209,3 +361,25 @@ class ExperimentRunner:
             return None
         else:
             return self._evaluation_metrics
+
+
+def _iter_chunks(data, chunk_size: int):
+    """
+    Yields consecutive chunks of chunk_size samples
+    (pandas objects and gold labels are sliced by position;
+    None yields None for every chunk)
+    """
+    if data is None:
+        yield from repeat(None)
+    elif hasattr(data, "iloc"):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start : start + chunk_size]
+    elif isinstance(data, GoldLabels):
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+    else:
+        iterator = iter(data)
+        chunk = list(islice(iterator, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(iterator, chunk_size))
@@ -1,5 +1,12 @@
-from .experimentation import Experimentation
-from .aml_experimentation import AmlExperimentation
-from .mlflow_experimentation import MlflowExperimentation
+from ner_sample.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "Experimentation": ".experimentation",
+        "AmlExperimentation": ".aml_experimentation",
+        "MlflowExperimentation": ".mlflow_experimentation",
+    },
+)
 
 __all__ = ["Experimentation", "AmlExperimentation", "MlflowExperimentation"]
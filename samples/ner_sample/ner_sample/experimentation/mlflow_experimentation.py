@@ -5,9 +5,15 @@ from pathlib import Path
 from typing import List
 
 import mlflow
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
 
 from ner_sample.experimentation import Experimentation
 
+# Limits of a single mlflow log_batch request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+
 
 class MlflowExperimentation(Experimentation):
     def __init__(
@@ -64,6 +70,36 @@ class MlflowExperimentation(Experimentation):
     def log_metrics(self, metrics, step=None):
         mlflow.log_metrics(metrics, step)
 
+    def log_batch(self, metrics=None, params=None):
+        """
+        Log metrics and params using mlflow's log_batch, which sends
+        up to 1000 metric values in a single request
+        """
+        active_run = mlflow.active_run()
+        if active_run is None:
+            raise ValueError(
+                "No active mlflow run, call start_run before logging a batch"
+            )
+        run_id = active_run.info.run_id
+
+        param_entities = [
+            Param(key, str(value)) for key, value in (params or {}).items()
+        ]
+        metric_entities = [
+            Metric(key, value, timestamp, step if step is not None else 0)
+            for key, value, step, timestamp in metrics or []
+        ]
+
+        client = MlflowClient()
+        for i in range(0, len(param_entities), MAX_PARAMS_PER_BATCH):
+            client.log_batch(
+                run_id, params=param_entities[i : i + MAX_PARAMS_PER_BATCH]
+            )
+        for i in range(0, len(metric_entities), MAX_METRICS_PER_BATCH):
+            client.log_batch(
+                run_id, metrics=metric_entities[i : i + MAX_METRICS_PER_BATCH]
+            )
+
     def log_artifact(self, local_path, artifact_path=None):
         mlflow.log_artifact(local_path, artifact_path)
 
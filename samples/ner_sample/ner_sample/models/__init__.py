@@ -1,3 +1,12 @@
-from .base_model import BaseModel
+from ner_sample.lazy_import import lazy_import
 
-__all__ = ["BaseModel"]
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "BaseModel": ".base_model",
+        "ModelSerializer": ".serialization",
+        "JoblibSerializer": ".serialization",
+    },
+)
+
+__all__ = ["BaseModel", "ModelSerializer", "JoblibSerializer"]
@@ -1,17 +1,29 @@
+import hashlib
 import logging
+import os
 import pickle
 from abc import abstractmethod
+from typing import Dict
+
+import numpy as np
 
 from ner_sample import LoggableObject
 from ner_sample.data_processing import DataProcessor
 from ner_sample.experimentation import Experimentation
 
+from .serialization import JoblibSerializer, ModelSerializer, load_model, save_model
+
 
 class BaseModel(LoggableObject):
     """
     Abstract class for a model with unified interface
     """
 
+    # Used by save, see ner_sample.models.serialization
+    serializer: ModelSerializer = JoblibSerializer()
+    # Attributes which are not stored by save (they are None after load)
+    unsaved_attributes = ("experiment_logger",)
+
     def __init__(
         self,
         model_name=None,
@@ -82,24 +94,71 @@ class BaseModel(LoggableObject):
     def __repr__(self):
         return f"Model: {self.name}"
 
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the fitted model, used as a cache key for its predictions.
+        By default hashes the pickled model (without the experiment logger).
+        Override if the model is not picklable or if there's a cheaper way.
+        :return: sha256 hex digest
+        """
+        experiment_logger = self.experiment_logger
+        self.experiment_logger = None
+        try:
+            return hashlib.sha256(pickle.dumps(self)).hexdigest()
+        finally:
+            self.experiment_logger = experiment_logger
+
+    def fingerprint_input(self, X) -> str:
+        """
+        Returns a hash of a model input (e.g. the test set),
+        used as a cache key for the predictions on it.
+        Override if X can be hashed in a cheaper or more stable way
+        :param X: dataset to run prediction on
+        :return: sha256 hex digest
+        """
+        return hashlib.sha256(pickle.dumps(X)).hexdigest()
+
+    def predictions_to_arrays(self, predictions) -> Dict[str, np.ndarray]:
+        """
+        Converts the output of predict into numpy arrays, for storing predictions.
+        Override if predict doesn't return an array-like of numbers or strings.
+        :param predictions: Output of predict
+        :return: Dictionary of array name to numpy array
+        """
+        return {"predictions": np.asarray(predictions)}
+
+    def predictions_from_arrays(self, arrays: Dict[str, np.ndarray], X):
+        """
+        Reverse of predictions_to_arrays
+        :param arrays: Dictionary of array name to (memory mapped) numpy array
+        :param X: The dataset the predictions were calculated on
+        :return: Predictions, in the same format predict returns them
+        """
+        return arrays["predictions"]
+
     def save(self, file_path: str):
         """
-        Stores a model in a pickle. Note that some objects are not pickable.
-        In such case the save method should be overridden.
-        :param file_path: Path to pickle
+        Stores a model in the directory file_path using self.serializer:
+        a manifest.json and the model's state (without unsaved_attributes),
+        with large arrays stored separately so they can be memory mapped on load.
+        Models holding objects the serializer can't store should use
+        another serializer (or override save and load).
+        :param file_path: Path to model directory. An existing model directory
+        is replaced, other existing directories are not (FileExistsError)
         :return:
         """
-        with open(file_path, "wb+") as f:
-            pickle.dump(self, file=f)
+        save_model(self, file_path, self.serializer)
 
     @classmethod
-    def load(cls, file_path):
+    def load(cls, file_path, mmap: bool = True):
         """
-        Loads a model from pickle. Note that some objects are not pickable.
-        In such case the load method should be overridden.
-        :param file_path: Path to pickle file
+        Loads a model stored by save. Pickle files of older versions
+        are loaded as well (unpickled in full).
+        :param file_path: Path to model directory (or pickle file)
+        :param mmap: Whether large arrays should be memory mapped instead of read
         :return: An model of type BaseModel
         """
-        with open(file_path, "rb") as f:
-            obj = pickle.load(f)
-        return obj
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as f:
+                return pickle.load(f)
+        return load_model(file_path, expected_class=cls, mmap=mmap)
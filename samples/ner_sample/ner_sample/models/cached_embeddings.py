@@ -0,0 +1,216 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import flair
+import numpy as np
+import torch
+from flair.data import Corpus, Sentence
+from flair.embeddings import TokenEmbeddings
+
+from ner_sample.caching import fingerprint_params
+
+
+class CachedTokenEmbeddings(TokenEmbeddings):
+    def __init__(
+        self,
+        embeddings: TokenEmbeddings,
+        corpus: Corpus,
+        cache_dir: str = "../models/embedding_cache",
+        dtype: str = "float16",
+        batch_size: int = 1024,
+    ):
+        """
+        Wraps static token embeddings (e.g. GloVe WordEmbeddings) with a
+        precomputed embedding matrix. The embedding of every token in the corpus
+        is computed once, stored in cache_dir as a float16/float32 matrix
+        (indexed by token id), and memory mapped.
+        Tokens are then embedded using one vectorized lookup per batch,
+        and tokens which are not in the matrix fall back to the wrapped embeddings.
+        :param embeddings: Static token embeddings to wrap
+        :param corpus: Corpus whose tokens (train, dev and test) are precomputed
+        :param cache_dir: Directory to store embedding matrices in
+        :param dtype: "float16" (half the disk and memory) or "float32"
+        :param batch_size: Number of tokens embedded at a time during precomputation
+        """
+        super().__init__()
+        if not embeddings.static_embeddings:
+            raise ValueError("Only static embeddings can be cached")
+
+        self.embeddings = embeddings
+        self.name = embeddings.name
+        self.static_embeddings = True
+        self.cache_dir = str(cache_dir)
+        self.dtype = dtype
+
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self.seconds_per_token = 0.0  # Embedding time of the wrapped embeddings
+
+        vocabulary = sorted(
+            {
+                token.text
+                for fold in (corpus.train, corpus.dev, corpus.test)
+                for sentence in fold
+                for token in sentence.tokens
+            }
+        )
+        key = fingerprint_params(
+            {"embeddings": str(embeddings), "dtype": dtype, "vocabulary": vocabulary}
+        )
+        self.path = Path(self.cache_dir, key)
+        if not self.path.exists():
+            self._precompute(vocabulary, batch_size, corpus.train)
+        self._load()
+
+    @property
+    def embedding_length(self) -> int:
+        return self.embeddings.embedding_length
+
+    def _precompute(
+        self, vocabulary: List[str], batch_size: int, sentences: Iterable[Sentence]
+    ) -> None:
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+
+        # Write into a temporary folder first, so a partial entry is never loaded
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            matrix = np.lib.format.open_memmap(
+                Path(tmp_dir, "matrix.npy"),
+                mode="w+",
+                dtype=self.dtype,
+                shape=(len(vocabulary), self.embedding_length),
+            )
+            for start in range(0, len(vocabulary), batch_size):
+                words = vocabulary[start : start + batch_size]
+                matrix[start : start + len(words)] = self._embed_words(words)
+            matrix.flush()
+            del matrix
+
+            seconds_per_token = self._time_sentences(sentences)
+            with open(Path(tmp_dir, "vocabulary.json"), "w") as f:
+                json.dump(
+                    {"vocabulary": vocabulary, "seconds_per_token": seconds_per_token},
+                    f,
+                )
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            os.replace(tmp_dir, self.path)
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+
+    def _embed_words(self, words: List[str]) -> np.ndarray:
+        """
+        Embeds each word on its own, using the wrapped embeddings
+        """
+        sentences = []
+        for word in words:
+            sentence = Sentence()
+            sentence.add_token(word)
+            sentences.append(sentence)
+        self.embeddings.embed(sentences)
+        return np.stack(
+            [
+                sentence.tokens[0].get_embedding().detach().cpu().numpy()
+                for sentence in sentences
+            ]
+        )
+
+    def _time_sentences(
+        self, sentences: Iterable[Sentence], sample_size: int = 100
+    ) -> float:
+        """
+        Seconds the wrapped embeddings take per token, measured on copies of
+        up to sample_size corpus sentences. Timing the 1-token sentences of
+        the precomputation would overstate the time saved on real sentences
+        """
+        sample = []
+        for sentence in islice(sentences, sample_size):
+            copy = Sentence()
+            for token in sentence.tokens:
+                copy.add_token(token.text)
+            sample.append(copy)
+        n_tokens = sum(len(sentence.tokens) for sentence in sample)
+        if not n_tokens:
+            return 0.0
+
+        start_time = time.perf_counter()
+        self.embeddings.embed(sample)
+        return (time.perf_counter() - start_time) / n_tokens
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            # e.g. a saved model loaded on another machine: embed everything
+            # using the wrapped embeddings
+            self.token_ids = {}
+            self.matrix = None
+            return
+
+        with open(Path(self.path, "vocabulary.json")) as f:
+            stored = json.load(f)
+        self.token_ids = {word: i for i, word in enumerate(stored["vocabulary"])}
+        self.seconds_per_token = stored["seconds_per_token"]
+        self.matrix = np.load(Path(self.path, "matrix.npy"), mmap_mode="r")
+
+    def _add_embeddings_internal(self, sentences: List[Sentence]) -> List[Sentence]:
+        start_time = time.perf_counter()
+        tokens = [token for sentence in sentences for token in sentence.tokens]
+        ids = [self.token_ids.get(token.text, -1) for token in tokens]
+        cached = [i for i, token_id in enumerate(ids) if token_id >= 0]
+
+        if cached:
+            vectors = torch.from_numpy(
+                np.asarray(self.matrix[[ids[i] for i in cached]], dtype=np.float32)
+            ).to(flair.device)
+            for i, vector in zip(cached, vectors):
+                tokens[i].set_embedding(self.name, vector)
+        self.lookup_seconds += time.perf_counter() - start_time
+
+        self.hits += len(cached)
+        self.misses += len(tokens) - len(cached)
+        if len(cached) < len(tokens):
+            missing = [sent for sent in sentences if self._has_missing(sent)]
+            self.embeddings._add_embeddings_internal(missing)
+        return sentences
+
+    def _has_missing(self, sentence: Sentence) -> bool:
+        return any(token.text not in self.token_ids for token in sentence.tokens)
+
+    def get_metrics(self) -> Dict:
+        """
+        Cache hit rate, and the estimated time saved by not calling
+        the wrapped embeddings for the cached tokens,
+        since the last reset_metrics call
+        """
+        total = self.hits + self.misses
+        return {
+            "embedding_cache_hit_rate": self.hits / total if total else 0.0,
+            "embedding_cache_time_saved_sec": max(
+                self.hits * self.seconds_per_token - self.lookup_seconds, 0.0
+            ),
+        }
+
+    def reset_metrics(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+
+    def __getstate__(self):
+        # The memory mapped matrix is reopened from self.path when unpickled
+        state = self.__dict__.copy()
+        state["matrix"] = None
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._load()
+
+    def __str__(self):
+        return f"Cached({self.embeddings})"
@@ -1,5 +1,11 @@
-from typing import List
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, List
 
+import flair
+import numpy as np
+import torch
 from flair.data import Corpus
 from flair.embeddings import (
     TokenEmbeddings,
@@ -11,10 +17,65 @@ from flair.models import SequenceTagger
 from flair.trainers import ModelTrainer
 from tqdm import tqdm
 
+from ner_sample.experimentation import Experimentation
 from ner_sample.models import BaseModel
+from ner_sample.models.cached_embeddings import CachedTokenEmbeddings
+from ner_sample.models.serialization import JoblibSerializer, register_serializer
+
+
+@register_serializer
+class FlairSerializer(JoblibSerializer):
+    """
+    Stores the SequenceTagger in flair's format (its torch state_dict and
+    the definitions of its embeddings), and the rest of the model using joblib.
+    The tagger weights are memory mapped on load (with torch >= 2.1),
+    so loading for inference doesn't read them in full,
+    and processes loading the same model share their pages.
+    """
+
+    name = "flair_state_dict"
+    tagger_file = "tagger.pt"
+
+    def get_state(self, model) -> Dict:
+        state = super().get_state(model)
+        # All of these are part of the tagger
+        for key in ("tagger", "embeddings", "word_embeddings_cache"):
+            state.pop(key, None)
+        return state
+
+    def save(self, model, path: Path) -> List[str]:
+        files = super().save(model, path)
+        model.tagger.save(Path(path, self.tagger_file))
+        return files + [self.tagger_file]
+
+    def load(self, model_class, path: Path, mmap: bool = True):
+        model = super().load(model_class, path, mmap=mmap)
+        tagger_path = str(Path(path, self.tagger_file))
+        try:
+            state = torch.load(
+                tagger_path, map_location="cpu", mmap=mmap, weights_only=False
+            )
+        except TypeError:  # torch < 2.1 can't memory map
+            state = torch.load(tagger_path, map_location="cpu")
+
+        model.tagger = SequenceTagger._init_model_with_state_dict(state)
+        model.tagger.eval()
+        model.tagger.to(flair.device)
+        model.embeddings = model.tagger.embeddings
+        model.word_embeddings_cache = next(
+            (
+                embeddings
+                for embeddings in model.embeddings.embeddings
+                if isinstance(embeddings, CachedTokenEmbeddings)
+            ),
+            None,
+        )
+        return model
 
 
 class FlairNERModel(BaseModel):
+    serializer = FlairSerializer()
+
     def __init__(
         self,
         corpus: Corpus,
@@ -23,12 +84,25 @@ class FlairNERModel(BaseModel):
         word_embeddings: str = "glove",
         train_with_dev: bool = True,
         max_epochs: int = 10,
+        mini_batch_size: int = 32,
+        embedding_cache_dir: str = None,
+        embedding_cache_dtype: str = "float16",
+        experiment_logger: Experimentation = None,
     ):
         """
         NER detector using the Flair NLP package.
         Source: https://github.com/flairNLP/flair/blob/master/resources/docs/EXPERIMENTS.md
-        All class inputs (except for the corpus) are model hyper parameters.
+        All class inputs (except for the corpus and experiment logger)
+        are model hyper parameters.
         They are then directed to the base class and get logged into the experiment logger
+        :param mini_batch_size: Number of sentences tagged together during predict
+        :param embedding_cache_dir: Optional directory for precomputed word embeddings.
+        If set, the word embeddings of every token in the corpus are computed once,
+        stored as a memory mapped matrix and looked up during training and predict
+        :param embedding_cache_dtype: dtype of the precomputed embeddings
+        ("float16" or "float32")
+        :param experiment_logger: Optional experimentation object, used for logging
+        the prediction throughput (sentences/sec)
         """
         self.tag_type = "ner"
         self.tag_dictionary = None
@@ -40,6 +114,10 @@ class FlairNERModel(BaseModel):
         self.word_embeddings = word_embeddings
         self.train_with_dev = train_with_dev
         self.max_epochs = max_epochs
+        self.mini_batch_size = mini_batch_size
+        self.embedding_cache_dir = embedding_cache_dir
+        self.embedding_cache_dtype = embedding_cache_dtype
+        self.word_embeddings_cache = None
 
         self.set_tagger_definition(corpus)
 
@@ -49,27 +127,150 @@ class FlairNERModel(BaseModel):
             word_embeddings=word_embeddings,
             train_with_dev=train_with_dev,
             max_epochs=max_epochs,
+            mini_batch_size=mini_batch_size,
+            embedding_cache_dir=embedding_cache_dir,
+            embedding_cache_dtype=embedding_cache_dtype,
         )
 
-        super().__init__(**hyper_params)
+        super().__init__(experiment_logger=experiment_logger, **hyper_params)
 
     def fit(self, X, y=None) -> None:
+        if self.word_embeddings_cache:
+            self.word_embeddings_cache.reset_metrics()
+
         # initialize trainer
         trainer: ModelTrainer = ModelTrainer(self.tagger, X)
 
-        trainer.train(
+        result = trainer.train(
             "models/taggers/flair-ner",
             train_with_dev=self.train_with_dev,
             max_epochs=self.max_epochs,
         )
 
+        if self.word_embeddings_cache:
+            metrics = self.word_embeddings_cache.get_metrics()
+            metrics["embedding_cache_time_saved_per_epoch_sec"] = metrics[
+                "embedding_cache_time_saved_sec"
+            ] / self._epochs_run(trainer, result)
+            self._log_embedding_cache_metrics(metrics)
+
+    def _epochs_run(self, trainer: ModelTrainer, result) -> int:
+        """
+        Number of epochs the last fit actually ran
+        (fewer than max_epochs if annealing stopped the training early)
+        """
+        loss_history = (result or {}).get("train_loss_history")
+        if loss_history:
+            return len(loss_history)
+        return getattr(trainer, "epoch", None) or self.max_epochs
+
     def predict(self, X):
-        tagged_sentences = []
-        for sentence in tqdm(X):
-            self.tagger.predict(sentence)
-            tagged_sentences.append(sentence)
-        print(f"Tagged {len(tagged_sentences)} sentences")
-        return tagged_sentences
+        """
+        Tags the sentences in X in mini batches of self.mini_batch_size sentences.
+        Sentences are grouped by length so every batch holds sentences of
+        similar length, which minimizes padding.
+        :return: The tagged sentences, in the original order
+        """
+        sentences = list(X)
+        by_length = sorted(
+            range(len(sentences)), key=lambda i: len(sentences[i]), reverse=True
+        )
+
+        if self.word_embeddings_cache:
+            self.word_embeddings_cache.reset_metrics()
+
+        start = time.perf_counter()
+        with tqdm(total=len(sentences)) as progress:
+            for i in range(0, len(by_length), self.mini_batch_size):
+                batch = [
+                    sentences[j] for j in by_length[i : i + self.mini_batch_size]
+                ]
+                self.tagger.predict(batch, mini_batch_size=self.mini_batch_size)
+                progress.update(len(batch))
+        elapsed = time.perf_counter() - start
+
+        sentences_per_sec = len(sentences) / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Tagged {len(sentences)} sentences "
+            f"({sentences_per_sec:.1f} sentences/sec)"
+        )
+        if self.experiment_logger:
+            self.experiment_logger.log_metric(
+                "predict_sentences_per_sec", sentences_per_sec
+            )
+        if self.word_embeddings_cache:
+            self._log_embedding_cache_metrics(self.word_embeddings_cache.get_metrics())
+        return sentences
+
+    def _log_embedding_cache_metrics(self, metrics: Dict) -> None:
+        print(
+            f"Embedding cache hit rate: {metrics['embedding_cache_hit_rate']:.2%}, "
+            f"time saved: {metrics['embedding_cache_time_saved_sec']:.1f} sec"
+        )
+        if self.experiment_logger:
+            self.experiment_logger.log_metrics(metrics)
+
+    def fingerprint(self) -> str:
+        """
+        Hashes the tagger weights instead of pickling the entire model
+        """
+        sha = hashlib.sha256()
+        for name, tensor in self.tagger.state_dict().items():
+            sha.update(name.encode("utf-8"))
+            sha.update(tensor.detach().cpu().numpy().tobytes())
+        return sha.hexdigest()
+
+    def fingerprint_input(self, X) -> str:
+        """
+        Hashes the tokens of each sentence (and not the flair objects,
+        which also hold tags and embeddings)
+        """
+        sha = hashlib.sha256()
+        for sentence in X:
+            sha.update(sentence.to_tokenized_string().encode("utf-8"))
+            sha.update(b"\n")
+        return sha.hexdigest()
+
+    def predictions_to_arrays(self, predictions) -> Dict[str, np.ndarray]:
+        """
+        Stores the predicted tags as a flat array of tag ids,
+        with the offset of each sentence's first token
+        """
+        tag_ids = {}
+        tags = []
+        scores = []
+        offsets = [0]
+        for sentence in predictions:
+            for token in sentence.tokens:
+                tag = token.get_tag(self.tag_type)
+                tags.append(tag_ids.setdefault(tag.value, len(tag_ids)))
+                scores.append(tag.score)
+            offsets.append(len(tags))
+
+        return {
+            "tags": np.asarray(tags, dtype=np.int32),
+            "scores": np.asarray(scores, dtype=np.float32),
+            "offsets": np.asarray(offsets, dtype=np.int64),
+            "tag_names": np.asarray(list(tag_ids), dtype=str),
+        }
+
+    def predictions_from_arrays(self, arrays: Dict[str, np.ndarray], X):
+        """
+        Sets the stored tags on the sentences of X
+        """
+        tag_names = arrays["tag_names"].tolist()
+        tags = arrays["tags"]
+        scores = arrays["scores"]
+        offsets = arrays["offsets"]
+        for i, sentence in enumerate(X):
+            start = offsets[i]
+            for j, token in enumerate(sentence.tokens):
+                token.add_tag(
+                    self.tag_type,
+                    tag_names[tags[start + j]],
+                    float(scores[start + j]),
+                )
+        return list(X)
 
     def get_hyper_params(self, **hyper_params):
         basic_params = {
@@ -80,14 +281,26 @@ class FlairNERModel(BaseModel):
         hyper_params.update(basic_params)
         return hyper_params
 
-    def set_embeddings_definition(self):
+    def set_embeddings_definition(self, corpus: Corpus):
         """
         Sets the embedding layers used by this tagger
+        :param corpus: Used for precomputing the word embeddings,
+        if embedding_cache_dir is set
         """
+        word_embeddings = WordEmbeddings(self.word_embeddings)
+        if self.embedding_cache_dir:
+            word_embeddings = CachedTokenEmbeddings(
+                word_embeddings,
+                corpus=corpus,
+                cache_dir=self.embedding_cache_dir,
+                dtype=self.embedding_cache_dtype,
+            )
+            self.word_embeddings_cache = word_embeddings
+
         # initialize embeddings
         embedding_types: List[TokenEmbeddings] = [
             # Word embeddings (default = GloVe)
-            WordEmbeddings(self.word_embeddings),
+            word_embeddings,
             # contextual string embeddings, forward
             PooledFlairEmbeddings("news-forward", pooling=self.pooling),
             # contextual string embeddings, backward
@@ -100,11 +313,12 @@ class FlairNERModel(BaseModel):
     def set_tagger_definition(self, corpus: Corpus):
         """
         Returns the definition of the Flair SequenceTagger (the full model)
-        :param corpus: Used only for setting the tag_dictionary
+        :param corpus: Used for setting the tag_dictionary
+        (and for precomputing the word embeddings)
         """
 
         if not self.embeddings:
-            self.set_embeddings_definition()
+            self.set_embeddings_definition(corpus)
         self.tag_dictionary = corpus.make_tag_dictionary(tag_type=self.tag_type)
 
         tagger: SequenceTagger = SequenceTagger(
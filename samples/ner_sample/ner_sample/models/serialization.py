@@ -0,0 +1,212 @@
+import errno
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+# serializer name -> ModelSerializer class
+SERIALIZERS = {}
+
+
+def register_serializer(serializer_class):
+    """
+    Registers a ModelSerializer class under its name,
+    so models saved with it can be loaded (see load_model)
+    """
+    SERIALIZERS[serializer_class.name] = serializer_class
+    return serializer_class
+
+
+class ModelSerializer(ABC):
+    """
+    Stores the state of a model as files in a model directory.
+    The directory also holds a manifest (written by save_model) naming the
+    serializer, the model class and the stored files, which is read first
+    when loading, so the model class and serializer don't need to be known upfront.
+    """
+
+    name = None
+
+    @abstractmethod
+    def save(self, model, path: Path) -> List[str]:
+        """
+        Writes the model's state into the (existing, empty) directory path
+        :return: Names of the written files
+        """
+        pass
+
+    @abstractmethod
+    def load(self, model_class, path: Path, mmap: bool = True):
+        """
+        Creates a model of type model_class from the state stored in path
+        :param mmap: Whether large arrays should be memory mapped instead of read
+        """
+        pass
+
+    @staticmethod
+    def get_state(model) -> Dict:
+        """
+        The model's attributes, except for the ones listed in
+        model.unsaved_attributes (e.g. the experiment logger)
+        """
+        return {
+            key: value
+            for key, value in vars(model).items()
+            if key not in model.unsaved_attributes
+        }
+
+    @staticmethod
+    def from_state(model_class, state: Dict):
+        """
+        Creates a model from its stored attributes, without calling __init__.
+        Unsaved attributes are set to None
+        """
+        model = model_class.__new__(model_class)
+        model.__dict__.update(state)
+        for key in model_class.unsaved_attributes:
+            model.__dict__.setdefault(key, None)
+        return model
+
+
+@register_serializer
+class JoblibSerializer(ModelSerializer):
+    """
+    Stores the model's state using joblib. numpy arrays (e.g. the fitted
+    arrays of sklearn estimators) are written as raw buffers next to the
+    pickled objects, so they are memory mapped on load: loading is not
+    proportional to the model size, and processes loading the same model
+    share its pages through the OS page cache.
+    Everything else in the state (e.g. the processors, or estimators without
+    numpy arrays) is pickled: loading runs the pickle, so only load trusted
+    models, and the pickled classes must still be importable under
+    the same names. Register a dedicated serializer to store a model otherwise.
+    """
+
+    name = "joblib"
+    state_file = "state.joblib"
+
+    def save(self, model, path: Path) -> List[str]:
+        # Compression would prevent memory mapping
+        joblib.dump(self.get_state(model), Path(path, self.state_file), compress=0)
+        return [self.state_file]
+
+    def load(self, model_class, path: Path, mmap: bool = True):
+        state = joblib.load(
+            Path(path, self.state_file), mmap_mode="r" if mmap else None
+        )
+        return self.from_state(model_class, state)
+
+
+def save_model(model, path: str, serializer: ModelSerializer) -> None:
+    """
+    Stores a model in the directory path: the files written by serializer,
+    and a manifest.json describing them. An existing model directory
+    (holding a manifest.json) is replaced, any other directory raises an error
+    """
+    path = Path(path)
+    if path.is_dir() and not Path(path, MANIFEST_FILE).is_file():
+        raise FileExistsError(
+            f"{path} is a directory which does not hold a saved model, "
+            "not replacing it"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model_class = type(model)
+
+    # Write into a temporary directory first, so a partial model is never loaded
+    tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, suffix=".tmp"))
+    try:
+        files = serializer.save(model, tmp_dir)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "serializer": serializer.name,
+            "model_class": f"{model_class.__module__}:{model_class.__qualname__}",
+            "model_name": model.name,
+            "files": {
+                name: os.path.getsize(Path(tmp_dir, name)) for name in sorted(files)
+            },
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(Path(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        _replace(tmp_dir, path)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+
+
+def _replace(new_dir: Path, path: Path) -> None:
+    """
+    Moves new_dir to path. A directory can't be renamed over a non-empty one,
+    so an existing model is renamed aside first and removed afterwards.
+    If a concurrent save_model stores its model in between, that one is kept
+    """
+    old_path = Path(path.parent, f"{path.name}.{uuid.uuid4().hex}.old")
+    try:
+        os.replace(path, old_path)
+    except FileNotFoundError:
+        # Nothing to replace, or a concurrent save_model moved it aside already
+        pass
+
+    try:
+        os.replace(new_dir, path)
+    except OSError as e:
+        # Only a concurrent save_model puts a (complete) model there
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            raise
+    finally:
+        if old_path.is_dir():
+            shutil.rmtree(old_path)
+        elif old_path.exists():
+            old_path.unlink()
+
+
+def read_manifest(path: str) -> Dict:
+    with open(Path(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model format version {manifest.get('format_version')} "
+            f"in {path}, expected {FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def load_model(path: str, expected_class=None, mmap: bool = True):
+    """
+    Loads a model stored by save_model
+    :param path: Model directory
+    :param expected_class: If set, the stored model must be of this class
+    (or a subclass of it)
+    :param mmap: Whether large arrays should be memory mapped instead of read
+    """
+    manifest = read_manifest(path)
+    if manifest["serializer"] not in SERIALIZERS:
+        raise ValueError(
+            f"Unknown serializer {manifest['serializer']} in {path}. "
+            f"Import the module defining it first. Known: {sorted(SERIALIZERS)}"
+        )
+
+    module_name, _, qualname = manifest["model_class"].partition(":")
+    model_class = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        model_class = getattr(model_class, attribute)
+    if expected_class is not None and not issubclass(model_class, expected_class):
+        raise TypeError(
+            f"{path} holds a {model_class.__name__}, "
+            f"not a {expected_class.__name__}"
+        )
+
+    serializer = SERIALIZERS[manifest["serializer"]]()
+    return serializer.load(model_class, Path(path), mmap=mmap)
@@ -0,0 +1,483 @@
+import logging
+import math
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List
+
+import pandas as pd
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from .data.data_loader import DataLoader
+from .evaluation import EvaluationMetrics, Evaluator
+from .experiment_runner import ExperimentRunner
+from .experimentation import Experimentation
+from .models import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Data shared by all trials running in a worker process.
+# Set once per worker by _init_worker, so the train and test sets
+# are not pickled again for every trial.
+_worker_state = {}
+
+
+def _init_worker(state: Dict) -> None:
+    _worker_state.update(state)
+
+
+def _run_trial(trial: Dict) -> Dict:
+    """
+    Fits one configuration with one budget, and evaluates it.
+    Executed inside a worker process (or in-process if n_jobs == 1)
+    """
+    state = _worker_state
+    params = dict(trial["params"])
+    X_train, y_train = state["X_train"], state["y_train"]
+    if state["budget_param"]:
+        params[state["budget_param"]] = trial["budget"]
+    else:
+        X_train, y_train = _subsample(
+            X_train, y_train, trial["budget"], seed=trial["config_id"]
+        )
+
+    experiment_logger = state["experiment_logger"]
+    experiment_runner = ExperimentRunner(
+        model=state["model_factory"](**params),
+        X_train=X_train,
+        X_test=state["X_test"],
+        y_train=y_train,
+        y_test=state["y_test"],
+        data_loader=state["data_loader"],
+        evaluator=state["evaluator"],
+        log_experiment=state["log_experiment"],
+        experiment_logger=experiment_logger,
+        experiment_name=state["experiment_name"],
+        search_config=trial["config_id"],
+        search_bracket=trial["bracket"],
+        search_rung=trial["rung"],
+        search_budget=trial["budget"],
+        **state["experiment_params_to_log"],
+    )
+    try:
+        evaluation_metrics = experiment_runner.run()
+    finally:
+        if state["log_experiment"]:
+            experiment_logger.end_run()
+
+    return {**trial, "evaluation_metrics": evaluation_metrics}
+
+
+def _subsample(X, y, fraction: float, seed: int):
+    """
+    Keeps a random fraction of the training samples
+    (of a flair Corpus' train split, a pandas object, a numpy array or a list)
+    """
+    if fraction >= 1:
+        return X, y
+
+    def sample(n):
+        rng = random.Random(seed)
+        return sorted(rng.sample(range(n), max(1, int(n * fraction))))
+
+    from flair.data import Corpus
+
+    if isinstance(X, Corpus):
+        from torch.utils.data import Subset
+
+        index = sample(len(X.train))
+        corpus = Corpus(
+            train=Subset(X.train, index), dev=X.dev, test=X.test, name=X.name
+        )
+        return corpus, y
+
+    index = sample(len(X))
+
+    def take(data):
+        if data is None:
+            return None
+        if hasattr(data, "iloc"):
+            return data.iloc[index]
+        if hasattr(data, "take"):
+            return data.take(index, axis=0)
+        return [data[i] for i in index]
+
+    return take(X), take(y)
+
+
+class SuccessiveHalvingSearch:
+    def __init__(
+        self,
+        model_factory: Callable[..., BaseModel],
+        X_train,
+        X_test,
+        data_loader: DataLoader,
+        evaluator: Evaluator,
+        y_test=None,
+        y_train=None,
+        param_grid: Dict[str, List] = None,
+        param_distributions: Dict = None,
+        n_configs: int = 27,
+        min_budget: float = 1,
+        max_budget: float = 27,
+        eta: int = 3,
+        budget_param: str = "max_epochs",
+        hyperband: bool = False,
+        random_state: int = None,
+        rank_by: str = None,
+        greater_is_better: bool = True,
+        n_jobs: int = None,
+        log_experiment: bool = True,
+        experiment_logger: Experimentation = None,
+        experiment_name: str = None,
+        **experiment_params_to_log,
+    ):
+        """
+        Searches model configurations with successive halving: every
+        configuration is first fitted with a small budget (e.g. 1 epoch),
+        and only the best 1/eta of them are fitted again with eta times
+        the budget, until max_budget is reached (Jamieson & Talwalkar, 2016).
+        With hyperband=True, several successive halving brackets are run,
+        from many configurations with a small first budget to a few
+        configurations with max_budget only (Li et al., 2018).
+        Every (configuration, budget) trial is an ExperimentRunner cycle,
+        logged as a separate run with its search_config, search_bracket,
+        search_rung and search_budget params. Trials run on a single pool
+        of n_jobs worker processes, shared by all rungs and brackets.
+        Each rung fits from scratch (the models are not resumed).
+
+        :param model_factory: Callable which gets one parameter configuration
+        as kwargs and returns a new model instance (of type BaseModel).
+        Must be picklable (e.g. a class or a module level function, not a lambda)
+        :param X_train: Training set
+        :param X_test: Test set
+        :param data_loader: DataLoader instance used to load data
+        :param evaluator: Logic for model and results evaluation
+        :param y_test: Test set tagged values (labels)
+        :param y_train: Training set tagged values (labels)
+        :param param_grid: Dictionary of parameter names to lists of values.
+        Configurations are drawn from their combinations (see sklearn's ParameterGrid)
+        :param param_distributions: Dictionary of parameter names to lists or
+        scipy distributions to sample configurations from
+        (see sklearn's ParameterSampler)
+        :param n_configs: Number of configurations successive halving starts with
+        (capped by the size of param_grid). Not used with hyperband,
+        which sets the number of configurations of each bracket
+        :param min_budget: Budget of the first rung
+        :param max_budget: Budget of the last rung
+        :param eta: Budget multiplier between rungs (and 1 / the fraction
+        of configurations promoted to the next rung)
+        :param budget_param: Name of the model_factory kwarg which gets the budget
+        (e.g. "max_epochs"; integer budgets are rounded). If None, the budget is
+        the fraction of the training set used (e.g. min_budget=1/9, max_budget=1)
+        :param hyperband: Whether to run all hyperband brackets
+        or successive halving only
+        :param random_state: Seed for drawing configurations
+        :param rank_by: Name of metric (from EvaluationMetrics.get_metrics())
+        to rank the trials by. Defaults to the first metric returned
+        :param greater_is_better: Whether higher values of rank_by are better
+        :param n_jobs: Number of worker processes. None uses all cores,
+        1 runs all trials sequentially in the current process
+        :param log_experiment: Whether to log the trials
+        into the experimentation service or not
+        :param experiment_logger: Experimentation service instance
+        (e.g. MlflowExperimentation). A copy of it is used in every worker
+        :param experiment_name: Name of experiment,
+        to be used by the experimentation service
+
+        :example:
+
+        class FlairFactory:
+            def __init__(self, corpus):
+                self.corpus = corpus
+
+            def __call__(self, **params):
+                return FlairNERModel(corpus=self.corpus, **params)
+
+        search = SuccessiveHalvingSearch(
+            model_factory=FlairFactory(corpus),
+            X_train=corpus,
+            X_test=test,
+            y_test=data_loader.gold_labels,
+            data_loader=data_loader,
+            evaluator=NEREvaluator(),
+            param_grid={"hidden_size": [128, 256, 512], "pooling": ["min", "max"]},
+            min_budget=1,
+            max_budget=9,
+            budget_param="max_epochs",
+            rank_by="f1",
+            n_jobs=4,
+            experiment_logger=experiment_logger,
+            experiment_name="flair-search",
+        )
+        results = search.run()
+        print(search.get_best_params())
+        """
+        if (param_grid is None) == (param_distributions is None):
+            raise ValueError(
+                "Exactly one of param_grid or param_distributions should be passed"
+            )
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        if not 0 < min_budget <= max_budget:
+            raise ValueError("Budgets must satisfy 0 < min_budget <= max_budget")
+
+        if log_experiment:
+            if not experiment_logger:
+                raise ValueError(
+                    "Experimentation system not passed, cannot log experiment"
+                )
+
+            if not experiment_name:
+                raise ValueError(
+                    "Experiment name must be specified for the experiment logging system"
+                )
+
+        self.model_factory = model_factory
+        self.X_train = X_train
+        self.y_train = y_train
+        self.X_test = X_test
+        self.y_test = y_test
+        self.data_loader = data_loader
+        self.evaluator = evaluator
+        self.param_grid = param_grid
+        self.param_distributions = param_distributions
+        self.n_configs = n_configs
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.eta = eta
+        self.budget_param = budget_param
+        self.hyperband = hyperband
+        self.random_state = random_state
+        self.rank_by = rank_by
+        self.greater_is_better = greater_is_better
+        self.n_jobs = n_jobs
+        self.log_experiment = log_experiment
+        self.experiment_logger = experiment_logger
+        self.experiment_name = experiment_name
+        self.experiment_params_to_log = experiment_params_to_log
+        self._results = None
+
+    def get_brackets(self) -> List[Dict]:
+        """
+        Returns the brackets to run: their number of configurations
+        and the budget of each of their rungs
+        """
+        # Number of times the budget can be multiplied by eta
+        # (with a tolerance for floating point errors, e.g. log(243, 3) < 5)
+        ratio = math.log(self.max_budget / self.min_budget, self.eta)
+        s_max = max(int(math.floor(ratio + 1e-9)), 0)
+        if not self.hyperband:
+            return [{"n_configs": self.n_configs, "budgets": self._budgets(s_max)}]
+
+        return [
+            {
+                "n_configs": int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s)),
+                "budgets": self._budgets(s),
+            }
+            for s in range(s_max, -1, -1)
+        ]
+
+    def _budgets(self, n_halvings: int) -> List:
+        # The last rung of every bracket gets max_budget
+        budgets = [
+            self.max_budget * self.eta ** (i - n_halvings)
+            for i in range(n_halvings + 1)
+        ]
+        if isinstance(self.min_budget, int) and isinstance(self.max_budget, int):
+            budgets = [max(int(round(budget)), 1) for budget in budgets]
+        return budgets
+
+    def _draw_configs(self, n: int, bracket: int) -> List[Dict]:
+        seed = None if self.random_state is None else self.random_state + bracket
+        if self.param_grid is not None:
+            grid = list(ParameterGrid(self.param_grid))
+            if n >= len(grid):
+                return grid
+            return random.Random(seed).sample(grid, n)
+
+        return list(
+            ParameterSampler(self.param_distributions, n_iter=n, random_state=seed)
+        )
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs the search
+        :return: DataFrame with one row per trial (configuration and budget),
+        holding its bracket, rung, budget, parameters, metrics and
+        EvaluationMetrics object. Sorted from the largest budget to the smallest,
+        and from best to worst within each budget
+        """
+        state = {
+            "model_factory": self.model_factory,
+            "X_train": self.X_train,
+            "y_train": self.y_train,
+            "X_test": self.X_test,
+            "y_test": self.y_test,
+            "data_loader": self.data_loader,
+            "evaluator": self.evaluator,
+            "budget_param": self.budget_param,
+            "log_experiment": self.log_experiment,
+            "experiment_logger": self.experiment_logger,
+            "experiment_name": self.experiment_name,
+            "experiment_params_to_log": self.experiment_params_to_log,
+        }
+        brackets = self.get_brackets()
+        logger.info(
+            f"Starting {'hyperband' if self.hyperband else 'successive halving'} "
+            f"search of {len(brackets)} brackets "
+            f"using {self.n_jobs if self.n_jobs else 'all'} workers"
+        )
+
+        if self.n_jobs == 1:
+            _init_worker(state)
+            try:
+                trials = self._schedule(brackets, _run_in_process)
+            finally:
+                _worker_state.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker, initargs=(state,)
+            ) as executor:
+                trials = self._schedule(
+                    brackets, lambda trial: executor.submit(_run_trial, trial)
+                )
+
+        self._results = self._rank(trials)
+        return self._results
+
+    def _schedule(self, brackets: List[Dict], submit: Callable) -> List[Dict]:
+        """
+        Runs the rungs of all brackets. Brackets are independent, so a rung
+        is submitted as soon as the previous rung of its bracket is done,
+        keeping the pool busy while other brackets are still running
+        """
+        trials = []
+        pending = {}
+        rung_results = {}
+        config_ids = iter(range(sum(bracket["n_configs"] for bracket in brackets)))
+
+        def submit_rung(bracket_id: int, rung: int, configs: List) -> None:
+            budget = brackets[bracket_id]["budgets"][rung]
+            logger.info(
+                f"Bracket {bracket_id} rung {rung}: "
+                f"{len(configs)} configurations with budget {budget}"
+            )
+            rung_results[(bracket_id, rung)] = []
+            for config_id, params in configs:
+                trial = {
+                    "config_id": config_id,
+                    "bracket": bracket_id,
+                    "rung": rung,
+                    "budget": budget,
+                    "params": params,
+                }
+                pending[submit(trial)] = (bracket_id, rung, len(configs))
+
+        for bracket_id, bracket in enumerate(brackets):
+            params = self._draw_configs(bracket["n_configs"], bracket_id)
+            submit_rung(bracket_id, 0, [(next(config_ids), p) for p in params])
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                bracket_id, rung, rung_size = pending.pop(future)
+                trial = future.result()
+                trials.append(trial)
+                results = rung_results[(bracket_id, rung)]
+                results.append(trial)
+                if len(results) < rung_size:
+                    continue
+
+                if rung + 1 < len(brackets[bracket_id]["budgets"]):
+                    promoted = self._promote(results)
+                    submit_rung(bracket_id, rung + 1, promoted)
+        return trials
+
+    def _promote(self, rung_results: List[Dict]) -> List:
+        """
+        Returns the best 1/eta configurations of a rung (at least one)
+        """
+        ranked = sorted(
+            rung_results,
+            key=lambda trial: self._score(trial["evaluation_metrics"]),
+            reverse=self.greater_is_better,
+        )
+        n_promoted = max(len(ranked) // self.eta, 1)
+        for trial in ranked[n_promoted:]:
+            logger.info(
+                f"Stopped configuration {trial['config_id']} {trial['params']} "
+                f"after budget {trial['budget']}"
+            )
+        return [(trial["config_id"], trial["params"]) for trial in ranked[:n_promoted]]
+
+    def _score(self, evaluation_metrics: EvaluationMetrics) -> float:
+        metrics = evaluation_metrics.get_metrics()
+        return metrics[self.rank_by] if self.rank_by else next(iter(metrics.values()))
+
+    def _rank(self, trials: List[Dict]) -> pd.DataFrame:
+        rows = []
+        for trial in trials:
+            row = {
+                "config": trial["config_id"],
+                "bracket": trial["bracket"],
+                "rung": trial["rung"],
+                "budget": trial["budget"],
+            }
+            row.update(trial["params"])
+            row.update(trial["evaluation_metrics"].get_metrics())
+            row["evaluation_metrics"] = trial["evaluation_metrics"]
+            rows.append(row)
+
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+
+        rank_by = self.rank_by
+        if not rank_by:
+            rank_by = next(iter(trials[0]["evaluation_metrics"].get_metrics()))
+
+        return results.sort_values(
+            by=["budget", rank_by],
+            ascending=[False, not self.greater_is_better],
+            kind="stable",
+        ).reset_index(drop=True)
+
+    def get_results(self) -> pd.DataFrame:
+        """
+        Get the ranked trials of the last search.
+        :return: Ranked trials DataFrame, or None if the search was not run yet
+        """
+        if self._results is None:
+            logger.info(
+                "Search results are empty. "
+                "Make sure you called `run()` prior to calling this method."
+            )
+        return self._results
+
+    def get_best_params(self) -> Dict:
+        """
+        Get the parameters of the best configuration evaluated with the largest budget
+        """
+        if self._results is None or self._results.empty:
+            return None
+        best = self._results.loc[0]
+        params = self.param_grid or self.param_distributions
+        return {name: best[name] for name in params}
+
+    def get_best_metrics(self) -> EvaluationMetrics:
+        """
+        Get the EvaluationMetrics of the best configuration
+        evaluated with the largest budget
+        """
+        if self._results is None or self._results.empty:
+            return None
+        return self._results.loc[0, "evaluation_metrics"]
+
+
+def _run_in_process(trial: Dict) -> Future:
+    future = Future()
+    try:
+        future.set_result(_run_trial(trial))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -1,13 +1,22 @@
-import copy
-
 from ner_sample.models import BaseModel
 
 
 class MockModel(BaseModel):
     def __init__(self, model_name=None, **hyper_params):
         self.x = None
+        self.gold_tags = {}
         super().__init__(model_name=model_name, **hyper_params)
 
+    def set_gold_labels(self, sentences, gold_labels) -> None:
+        """
+        Sets the labels this model "predicts"
+        :param sentences: Test sentences
+        :param gold_labels: Gold labels of sentences (see ConllDataLoader.gold_labels)
+        """
+        for i, sentence in enumerate(sentences):
+            tokenized = sentence.to_tokenized_string()
+            self.gold_tags[tokenized] = gold_labels.sentence_tags(i)
+
     def fit(self, X, y=None) -> None:
         self.x = X
 
@@ -17,14 +26,10 @@ class MockModel(BaseModel):
         """
         counter = 0
         for sentence in X:
-            for token in sentence.tokens:
-                # use original labels:
-                token.annotation_layers["ner"] = copy.deepcopy(
-                    token.annotation_layers["gold_ner"]
-                )
-                # revert some to "O":
-                if counter % 3 == 0:
-                    token.annotation_layers["ner"][0].value = "O"
+            gold_tags = self.gold_tags[sentence.to_tokenized_string()]
+            for token, gold_tag in zip(sentence.tokens, gold_tags):
+                # use original labels, and revert some to "O":
+                token.add_tag("ner", "O" if counter % 3 == 0 else gold_tag)
                 counter += 1
 
         return X
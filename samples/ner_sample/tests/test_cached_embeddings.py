@@ -0,0 +1,166 @@
+import pickle
+from typing import List
+
+import pytest
+import torch
+from flair.data import Sentence
+from flair.embeddings import TokenEmbeddings
+
+from ner_sample.models import flair_ner
+from ner_sample.models.cached_embeddings import CachedTokenEmbeddings
+from ner_sample.models.flair_ner import FlairNERModel
+from tests.mocks import MockExperimentation
+
+
+class CountingEmbeddings(TokenEmbeddings):
+    """
+    Static embeddings derived from each token's text,
+    which count how many tokens they embedded
+    """
+
+    def __init__(self):
+        self.name = "counting"
+        self.static_embeddings = True
+        self.calls = 0
+        self.sentence_lengths = []
+        super().__init__()
+
+    @property
+    def embedding_length(self) -> int:
+        return 4
+
+    def _add_embeddings_internal(self, sentences: List[Sentence]) -> List[Sentence]:
+        for sentence in sentences:
+            self.sentence_lengths.append(len(sentence.tokens))
+            for token in sentence.tokens:
+                self.calls += 1
+                token.set_embedding(self.name, self.vector(token.text))
+        return sentences
+
+    @staticmethod
+    def vector(text: str) -> torch.Tensor:
+        return torch.tensor(
+            [len(text), ord(text[0]), ord(text[-1]), 1.0], dtype=torch.float32
+        )
+
+    def __str__(self):
+        return self.name
+
+
+def test_cached_embeddings_match_wrapped_embeddings(dataset_loader, tmpdir):
+    corpus, test = dataset_loader.get_dataset()
+    wrapped = CountingEmbeddings()
+    cached = CachedTokenEmbeddings(
+        wrapped, corpus=corpus, cache_dir=str(tmpdir), dtype="float32"
+    )
+    wrapped.calls = 0
+
+    cached.embed(list(test))
+
+    assert wrapped.calls == 0
+    for sentence in test:
+        for token in sentence.tokens:
+            assert torch.equal(
+                token.get_embedding(), CountingEmbeddings.vector(token.text)
+            )
+    assert cached.get_metrics()["embedding_cache_hit_rate"] == 1.0
+
+
+def test_cached_embeddings_fall_back_on_unknown_tokens(dataset_loader, tmpdir):
+    corpus, _ = dataset_loader.get_dataset()
+    cached = CachedTokenEmbeddings(
+        CountingEmbeddings(), corpus=corpus, cache_dir=str(tmpdir)
+    )
+
+    sentence = Sentence("qwertyuiop")
+    cached.embed(sentence)
+
+    assert torch.equal(
+        sentence.tokens[0].get_embedding(), CountingEmbeddings.vector("qwertyuiop")
+    )
+    assert cached.get_metrics()["embedding_cache_hit_rate"] == 0.0
+
+
+def test_cached_embeddings_reuse_stored_matrix(dataset_loader, tmpdir):
+    corpus, _ = dataset_loader.get_dataset()
+    CachedTokenEmbeddings(CountingEmbeddings(), corpus=corpus, cache_dir=str(tmpdir))
+
+    wrapped = CountingEmbeddings()
+    cached = CachedTokenEmbeddings(wrapped, corpus=corpus, cache_dir=str(tmpdir))
+    assert wrapped.calls == 0
+
+    # The memory mapped matrix is reopened when unpickled (e.g. a saved tagger)
+    restored = pickle.loads(pickle.dumps(cached))
+    assert restored.matrix.shape == cached.matrix.shape
+
+
+def test_predict_logs_embedding_cache_metrics_of_the_call(
+    pretrained_model, dataset_loader, tmpdir
+):
+    corpus, test = dataset_loader.get_dataset()
+    cached = CachedTokenEmbeddings(
+        CountingEmbeddings(), corpus=corpus, cache_dir=str(tmpdir)
+    )
+    # Lookups of an earlier call (e.g. fit)
+    cached.embed(list(test))
+    assert cached.get_metrics()["embedding_cache_hit_rate"] == 1.0
+
+    pretrained_model.word_embeddings_cache = cached
+    pretrained_model.experiment_logger = MockExperimentation()
+    pretrained_model.predict(test)
+
+    # The pretrained tagger doesn't embed through the cache
+    metrics = pretrained_model.experiment_logger.metrics
+    assert metrics["embedding_cache_hit_rate"] == 0.0
+
+
+def test_cached_embeddings_time_corpus_sentences(dataset_loader, tmpdir):
+    corpus, _ = dataset_loader.get_dataset()
+    wrapped = CountingEmbeddings()
+    cached = CachedTokenEmbeddings(wrapped, corpus=corpus, cache_dir=str(tmpdir))
+
+    # Besides the 1-token sentences of the precomputation,
+    # the embedding time is measured on sentences of the corpus
+    train_lengths = [len(sentence.tokens) for sentence in corpus.train][:100]
+    assert wrapped.sentence_lengths[-len(train_lengths) :] == train_lengths
+    assert cached.seconds_per_token > 0
+
+
+def test_fit_logs_embedding_cache_time_saved_per_epoch(
+    dataset_loader, tmpdir, monkeypatch
+):
+    corpus, _ = dataset_loader.get_dataset()
+    cached = CachedTokenEmbeddings(
+        CountingEmbeddings(), corpus=corpus, cache_dir=str(tmpdir)
+    )
+    cached.seconds_per_token = 1.0
+    n_tokens = sum(len(sentence.tokens) for sentence in corpus.train)
+
+    class TwoEpochTrainer:
+        def __init__(self, tagger, corpus):
+            self.corpus = corpus
+
+        def train(self, base_path, **kwargs):
+            for _ in range(2):
+                for sentence in self.corpus.train:
+                    sentence.clear_embeddings()
+                cached.embed(list(self.corpus.train))
+            return {"train_loss_history": [0.5, 0.4]}
+
+    monkeypatch.setattr(flair_ner, "ModelTrainer", TwoEpochTrainer)
+    model = FlairNERModel.__new__(FlairNERModel)
+    model.__dict__.update(
+        tagger=None,
+        train_with_dev=False,
+        max_epochs=10,
+        word_embeddings_cache=cached,
+        experiment_logger=MockExperimentation(),
+    )
+    model.fit(corpus)
+
+    # Every token is a hit in both epochs, each saving 1 second
+    metrics = model.experiment_logger.metrics
+    assert metrics["embedding_cache_hit_rate"] == 1.0
+    assert metrics["embedding_cache_time_saved_per_epoch_sec"] == pytest.approx(
+        n_tokens - cached.lookup_seconds / 2
+    )
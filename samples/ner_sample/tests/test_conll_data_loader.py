@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from ner_sample.data import ConllDataLoader
+
+RESOURCES_PATH = Path(Path(__file__).parent, "resources", "conll_03")
+FOLDS = ("eng.train", "eng.testa", "eng.testb")
+
+
+class FoldRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the mock CONLL folds, with support for range requests.
+    The first response for each fold in server.interrupt is cut in the middle.
+    If server.compress is set, folds are gzip encoded when the client accepts it,
+    and ranges apply to the encoded bytes
+    """
+
+    def do_GET(self):
+        fold = self.path.strip("/")
+        if fold not in FOLDS:
+            self.send_error(404)
+            return
+        content = Path(RESOURCES_PATH, fold).read_bytes()
+        self.server.requests.append((fold, self.headers.get("Range")))
+        compress = self.server.compress and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        )
+        if compress:
+            content = gzip.compress(content)
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(content)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}"
+            )
+        else:
+            self.send_response(200)
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(content) - start))
+        self.end_headers()
+
+        if fold in self.server.interrupt:
+            self.server.interrupt.remove(fold)
+            self.wfile.write(content[start : len(content) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(content[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fold_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FoldRequestHandler)
+    server.requests = []
+    server.interrupt = set()
+    server.compress = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_data_loader(server, local_data_path, **kwargs):
+    return ConllDataLoader(
+        local_data_path=local_data_path,
+        dataset_path=f"http://127.0.0.1:{server.server_address[1]}/",
+        **kwargs,
+    )
+
+
+def sha256(fold):
+    return hashlib.sha256(Path(RESOURCES_PATH, fold).read_bytes()).hexdigest()
+
+
+def test_download_dataset(fold_server, tmp_path):
+    data_loader = get_data_loader(
+        fold_server, tmp_path, checksums={fold: sha256(fold) for fold in FOLDS}
+    )
+    data_loader.download_dataset()
+
+    for fold in FOLDS:
+        assert (
+            Path(tmp_path, "conll_03", fold).read_bytes()
+            == Path(RESOURCES_PATH, fold).read_bytes()
+        )
+    assert not list(Path(tmp_path, "conll_03").glob("*.part"))
+
+
+def test_download_dataset_resumes_interrupted_download(fold_server, tmp_path):
+    fold_server.interrupt.add("eng.train")
+    get_data_loader(fold_server, tmp_path, chunk_size=64).download_dataset()
+
+    assert (
+        Path(tmp_path, "conll_03", "eng.train").read_bytes()
+        == Path(RESOURCES_PATH, "eng.train").read_bytes()
+    )
+    train_requests = [
+        range_ for fold, range_ in fold_server.requests if fold == "eng.train"
+    ]
+    assert train_requests[0] is None
+    assert train_requests[1].startswith("bytes=")
+
+
+def test_download_dataset_checks_each_fold(fold_server, tmp_path):
+    data_loader = get_data_loader(fold_server, tmp_path)
+    data_loader.download_dataset()
+    Path(tmp_path, "conll_03", "eng.testb").unlink()
+    fold_server.requests.clear()
+
+    data_loader.download_dataset()
+
+    assert [fold for fold, _ in fold_server.requests] == ["eng.testb"]
+
+
+def test_download_dataset_checksum_mismatch(fold_server, tmp_path):
+    data_loader = get_data_loader(
+        fold_server, tmp_path, checksums={"eng.testa": "0" * 64}
+    )
+    with pytest.raises(ValueError):
+        data_loader.download_dataset()
+    assert not Path(tmp_path, "conll_03", "eng.testa").exists()
+
+
+def test_download_dataset_resumes_compressed_download(fold_server, tmp_path):
+    fold_server.compress = True
+    fold_server.interrupt.add("eng.train")
+    get_data_loader(
+        fold_server,
+        tmp_path,
+        chunk_size=64,
+        checksums={fold: sha256(fold) for fold in FOLDS},
+    ).download_dataset()
+
+    assert (
+        Path(tmp_path, "conll_03", "eng.train").read_bytes()
+        == Path(RESOURCES_PATH, "eng.train").read_bytes()
+    )
+    train_requests = [
+        range_ for fold, range_ in fold_server.requests if fold == "eng.train"
+    ]
+    assert train_requests[0] is None
+    assert train_requests[1].startswith("bytes=")
+
+
+def test_download_dataset_checks_size_of_complete_part_file(fold_server, tmp_path):
+    content = Path(RESOURCES_PATH, "eng.train").read_bytes()
+    Path(tmp_path, "conll_03").mkdir()
+    Path(tmp_path, "conll_03", "eng.train.part").write_bytes(content)
+    Path(tmp_path, "conll_03", "eng.testb.part").write_bytes(content + b"stale")
+
+    get_data_loader(fold_server, tmp_path).download_dataset()
+
+    for fold in ("eng.train", "eng.testb"):
+        assert (
+            Path(tmp_path, "conll_03", fold).read_bytes()
+            == Path(RESOURCES_PATH, fold).read_bytes()
+        )
+    testb_requests = [
+        range_ for fold, range_ in fold_server.requests if fold == "eng.testb"
+    ]
+    assert testb_requests[0].startswith("bytes=")
+    assert testb_requests[1] is None
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from ner_sample.caching import CorpusCache
+from tests.mocks import MockDataLoader
+
+MOCK_DATA_PATH = Path(os.path.dirname(os.path.realpath(__file__)), "resources")
+
+
+def load(**kwargs):
+    data_loader = MockDataLoader(local_data_path=MOCK_DATA_PATH, **kwargs)
+    corpus, test = data_loader.get_dataset()
+    return corpus, test, data_loader.gold_labels
+
+
+def tagged_sentences(sentences):
+    return [
+        [(token.text, token.get_tag("ner").value) for token in sentence.tokens]
+        for sentence in sentences
+    ]
+
+
+def test_corpus_cache_skips_parsing(tmp_path):
+    fresh_corpus, fresh_test, fresh_gold_labels = load()
+
+    load(corpus_cache=CorpusCache(cache_dir=tmp_path))
+    # A new cache object, as if loading in a new process
+    corpus_cache = CorpusCache(cache_dir=tmp_path)
+    corpus, test, gold_labels = load(corpus_cache=corpus_cache)
+
+    assert corpus_cache.hits == 1
+    assert corpus_cache.misses == 0
+    assert tagged_sentences(corpus.train) == tagged_sentences(fresh_corpus.train)
+    assert tagged_sentences(test) == tagged_sentences(fresh_test)
+    assert gold_labels.tag_names == fresh_gold_labels.tag_names
+    np.testing.assert_array_equal(gold_labels.tag_ids, fresh_gold_labels.tag_ids)
+
+
+def test_downsampling_is_deterministic(tmp_path):
+    corpus_cache = CorpusCache(cache_dir=tmp_path)
+    first, _, _ = load(downsample=0.5, seed=1)
+    second, _, _ = load(downsample=0.5, seed=1)
+    cached, _, _ = load(downsample=0.5, seed=1, corpus_cache=corpus_cache)
+    cached_again, _, _ = load(downsample=0.5, seed=1, corpus_cache=corpus_cache)
+
+    assert len(first.train) == round(len(load()[0].train) * 0.5)
+    for corpus in (second, cached, cached_again):
+        assert tagged_sentences(corpus.train) == tagged_sentences(first.train)
+    assert corpus_cache.hits == 1
+
+
+def test_corpus_cache_key_depends_on_downsampling():
+    corpus_cache = CorpusCache()
+    key = corpus_cache.get_key("conll_03", "1", downsample=0.5, seed=1)
+
+    assert key == corpus_cache.get_key("conll_03", "1", downsample=0.5, seed=1)
+    assert key != corpus_cache.get_key("conll_03", "1", downsample=0.1, seed=1)
+    assert key != corpus_cache.get_key("conll_03", "1", downsample=0.5, seed=2)
+    assert key != corpus_cache.get_key("conll_03", "2", downsample=0.5, seed=1)
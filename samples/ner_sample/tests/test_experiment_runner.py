@@ -18,12 +18,14 @@ def test_experiment_runner():
     assert test is not None
 
     model = MockModel(model_name="Mock", param1="hello", param2="world")
+    model.set_gold_labels(test, data_loader.gold_labels)
     evaluator = NEREvaluator()
     experiment_logger = MockExperimentation()
     experiment_runner = ExperimentRunner(
         model=model,
         X_train=train,
         X_test=test,
+        y_test=data_loader.gold_labels,
         data_loader=data_loader,
         evaluator=evaluator,
         experiment_logger=experiment_logger,
@@ -44,3 +46,53 @@ def test_experiment_runner():
     assert experiment_logger.params['one_additional_param'] == 'Will this work'
     assert experiment_logger.metrics['f1'] == results.f1
     assert experiment_logger.metrics['accuracy'] == results.accuracy
+
+
+def test_experiment_runner_evaluates_in_chunks(dataset_loader):
+    _, test = dataset_loader.get_dataset()
+    model = MockModel(model_name="Mock")
+    model.set_gold_labels(test, dataset_loader.gold_labels)
+    experiment_logger = MockExperimentation()
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=None,
+        X_test=test,
+        y_test=dataset_loader.gold_labels,
+        data_loader=dataset_loader,
+        evaluator=NEREvaluator(),
+        experiment_logger=experiment_logger,
+        experiment_name="Text",
+        evaluation_chunk_size=2,
+    )
+    results = experiment_runner.evaluate()
+
+    assert experiment_runner.get_predictions() == []
+    assert experiment_logger.metrics["f1"] == results.f1
+    assert results.accuracy == pytest.approx(0.9, 0.1)
+    assert experiment_logger.metrics["timing/evaluate/count"] == 1
+    assert experiment_logger.metrics["timing/evaluate/predict/count"] == len(
+        range(0, len(test), 2)
+    )
+
+
+def test_experiment_runner_reads_test_set_in_batches(dataset_loader):
+    _, test = dataset_loader.get_dataset()
+    batches = list(dataset_loader.iter_batches(split="test", batch_size=2))
+
+    assert [len(sentences) for sentences, _ in batches[:-1]] == [2] * (len(batches) - 1)
+    assert sum(len(sentences) for sentences, _ in batches) == len(test)
+
+    model = MockModel(model_name="Mock")
+    model.set_gold_labels(test, dataset_loader.gold_labels)
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=None,
+        X_test=None,
+        data_loader=dataset_loader,
+        evaluator=NEREvaluator(),
+        log_experiment=False,
+        evaluation_chunk_size=2,
+    )
+    results = experiment_runner.evaluate()
+
+    assert results.accuracy == pytest.approx(0.9, 0.1)
@@ -29,12 +29,61 @@ def test_flair_inference_correct(
 
     tp_count = 0
     total_count = 0
-    for sentence, prediction in zip(test, predictions):
+    for j, (sentence, prediction) in enumerate(zip(test, predictions)):
+        gold_tags = dataset_loader.gold_labels.sentence_tags(j)
         for i in range(len(sentence.tokens)):
             pred = prediction.tokens[i].annotation_layers["ner"][0].value
-            actual = sentence.tokens[i].annotation_layers["gold_ner"][0].value
+            actual = gold_tags[i]
             if pred == actual:
                 tp_count += 1
             total_count += 1
 
     assert float(tp_count) / total_count > 0.7
+
+
+def test_flair_batched_inference_keeps_order(
+    pretrained_model: FlairNERModel, dataset_loader: MockDataLoader
+):
+    _, test = dataset_loader.get_dataset()
+    pretrained_model.mini_batch_size = 1
+    one_by_one = [
+        [token.get_tag("ner").value for token in sentence.tokens]
+        for sentence in pretrained_model.predict(test)
+    ]
+
+    _, test = dataset_loader.get_dataset()
+    pretrained_model.mini_batch_size = 4
+    predictions = pretrained_model.predict(test)
+    batched = [
+        [token.get_tag("ner").value for token in sentence.tokens]
+        for sentence in predictions
+    ]
+
+    assert [sentence.to_tokenized_string() for sentence in predictions] == [
+        sentence.to_tokenized_string() for sentence in test
+    ]
+    assert batched == one_by_one
+
+
+def test_flair_save_load_keeps_predictions(
+    pretrained_model: FlairNERModel, dataset_loader: MockDataLoader, tmp_path
+):
+    pretrained_model.embeddings = pretrained_model.tagger.embeddings
+    pretrained_model.save(str(tmp_path / "model"))
+    assert (tmp_path / "model" / "tagger.pt").exists()
+
+    loaded = FlairNERModel.load(str(tmp_path / "model"))
+    assert loaded.experiment_logger is None
+    assert loaded.mini_batch_size == pretrained_model.mini_batch_size
+
+    _, test = dataset_loader.get_dataset()
+    expected = [
+        [token.get_tag("ner").value for token in sentence.tokens]
+        for sentence in pretrained_model.predict(test)
+    ]
+    _, test = dataset_loader.get_dataset()
+    actual = [
+        [token.get_tag("ner").value for token in sentence.tokens]
+        for sentence in loaded.predict(test)
+    ]
+    assert actual == expected
@@ -1,25 +1,75 @@
-import copy
-
 import pytest
 
 from ner_sample.evaluation import NEREvaluator
-from tests.mocks import MockDataLoader
+from tests.mocks import MockDataLoader, MockModel
 
 
 def test_ner_evaluator_mock_data(dataset_loader: MockDataLoader):
     corpus, test = dataset_loader.get_dataset()
+    gold_labels = dataset_loader.gold_labels
 
     # replace some tags to validate evaluation
     counter = 0
-    for sentence in test:
-        for token in sentence.tokens:
+    for i, sentence in enumerate(test):
+        for token, gold_tag in zip(sentence.tokens, gold_labels.sentence_tags(i)):
             # "predict" the actual labels, and add some noise
-            token.annotation_layers["ner"] = copy.deepcopy(token.annotation_layers["gold_ner"])
+            token.annotation_layers["ner"][0].value = gold_tag
             if counter % 3 == 0:
                 token.annotation_layers["ner"][0].value = 'O'
             counter += 1
 
     evaluator = NEREvaluator()
-    ner_evaluation_metrics = evaluator.evaluate(y_test=None, predictions=test)
+    ner_evaluation_metrics = evaluator.evaluate(y_test=gold_labels, predictions=test)
     assert ner_evaluation_metrics.f1 == pytest.approx(0.4, 0.1)
     assert ner_evaluation_metrics.accuracy == pytest.approx(0.9, 0.1)
+
+
+def test_ner_evaluator_streaming_matches_evaluate(dataset_loader: MockDataLoader):
+    _, test = dataset_loader.get_dataset()
+    gold_labels = dataset_loader.gold_labels
+    model = MockModel()
+    model.set_gold_labels(test, gold_labels)
+    sentences = model.predict(list(test))
+
+    evaluator = NEREvaluator()
+    expected = evaluator.evaluate(y_test=gold_labels, predictions=sentences)
+
+    evaluator.reset()
+    for start in range(0, len(sentences), 2):
+        evaluator.update(
+            gold_labels[start : start + 2], sentences[start : start + 2]
+        )
+    streamed = evaluator.finalize()
+
+    assert streamed.get_metrics() == expected.get_metrics()
+
+
+def test_ner_evaluator_reads_gold_ner_tag(dataset_loader: MockDataLoader):
+    _, test = dataset_loader.get_dataset()
+    gold_labels = dataset_loader.gold_labels
+    for i, sentence in enumerate(test):
+        for token, gold_tag in zip(sentence.tokens, gold_labels.sentence_tags(i)):
+            token.add_tag("gold_ner", gold_tag)
+            token.add_tag("ner", gold_tag)
+
+    evaluator = NEREvaluator()
+    assert evaluator.evaluate(y_test=None, predictions=test).f1 == 1.0
+    assert evaluator.evaluate(y_test=gold_labels, predictions=test).f1 == 1.0
+
+
+def test_ner_evaluator_requires_gold_ner_tag(dataset_loader: MockDataLoader):
+    _, test = dataset_loader.get_dataset()
+
+    with pytest.raises(ValueError):
+        NEREvaluator().evaluate(y_test=None, predictions=list(test))
+
+
+def test_ner_evaluator_gold_labels_must_match_sentences(
+    dataset_loader: MockDataLoader,
+):
+    _, test = dataset_loader.get_dataset()
+
+    with pytest.raises(ValueError):
+        NEREvaluator().evaluate(
+            y_test=dataset_loader.gold_labels[1:], predictions=list(test)[:-1]
+        )
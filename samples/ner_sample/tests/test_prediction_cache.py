@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+from ner_sample import ExperimentRunner
+from ner_sample.caching import PredictionCache
+from ner_sample.evaluation import NEREvaluator
+from ner_sample.models.flair_ner import FlairNERModel
+from tests.mocks import MockDataLoader, MockModel, MockExperimentation
+
+
+class CountingMockModel(MockModel):
+    """
+    Mock model which stores its predictions the same way FlairNERModel does
+    """
+
+    tag_type = "ner"
+    predict_calls = 0
+    fingerprint_calls = 0
+
+    fingerprint_input = FlairNERModel.fingerprint_input
+    predictions_to_arrays = FlairNERModel.predictions_to_arrays
+    predictions_from_arrays = FlairNERModel.predictions_from_arrays
+
+    def predict(self, X):
+        CountingMockModel.predict_calls += 1
+        return super().predict(X)
+
+    def fingerprint(self):
+        CountingMockModel.fingerprint_calls += 1
+        return super().fingerprint()
+
+
+def evaluate(prediction_cache, **kwargs):
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    mock_data_path = Path(dir_path, "resources").resolve()
+    data_loader = MockDataLoader(local_data_path=mock_data_path)
+    _, test = data_loader.get_dataset()
+    model = CountingMockModel(model_name="Mock", param1="hello")
+    model.set_gold_labels(test, data_loader.gold_labels)
+
+    experiment_logger = MockExperimentation()
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=None,
+        X_test=test,
+        y_test=data_loader.gold_labels,
+        data_loader=data_loader,
+        evaluator=NEREvaluator(),
+        experiment_logger=experiment_logger,
+        experiment_name="Text",
+        prediction_cache=prediction_cache,
+        **kwargs,
+    )
+    return experiment_runner.evaluate(), experiment_logger
+
+
+def test_prediction_cache_skips_predict(tmp_path):
+    CountingMockModel.predict_calls = 0
+
+    first_results, _ = evaluate(PredictionCache(cache_dir=tmp_path))
+    # A new cache object, as if evaluating in a new process
+    second_results, experiment_logger = evaluate(PredictionCache(cache_dir=tmp_path))
+
+    assert CountingMockModel.predict_calls == 1
+    assert second_results.f1 == first_results.f1
+    assert second_results.accuracy == first_results.accuracy
+    assert experiment_logger.metrics["prediction_cache_hits"] == 1
+
+
+def test_chunked_evaluation_fingerprints_model_once(tmp_path):
+    CountingMockModel.predict_calls = 0
+    CountingMockModel.fingerprint_calls = 0
+
+    evaluate(PredictionCache(cache_dir=tmp_path), evaluation_chunk_size=1)
+
+    assert CountingMockModel.predict_calls > 1
+    assert CountingMockModel.fingerprint_calls == 1
+
+
+def test_prediction_cache_key_depends_on_model_and_test_set(dataset_loader, tmp_path):
+    _, test = dataset_loader.get_dataset()
+    prediction_cache = PredictionCache(cache_dir=tmp_path)
+    model = CountingMockModel(model_name="Mock", param1="hello")
+
+    key = prediction_cache.get_key(model, test)
+
+    assert key == prediction_cache.get_key(
+        CountingMockModel(model_name="Mock", param1="hello"), test
+    )
+    assert key != prediction_cache.get_key(
+        CountingMockModel(model_name="Mock", param1="world"), test
+    )
+    assert key != prediction_cache.get_key(model, list(test)[1:])
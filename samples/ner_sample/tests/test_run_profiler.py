@@ -0,0 +1,76 @@
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from ner_sample.evaluation import RunProfiler
+from tests.mocks import MockExperimentation
+
+
+class ArtifactRecordingExperimentation(MockExperimentation):
+    def __init__(self):
+        self.artifacts = []
+        super().__init__()
+
+    def log_artifact(self, local_path, name=None, artifact_path=None):
+        assert Path(local_path).exists()
+        self.artifacts.append(f"{artifact_path}/{Path(local_path).name}")
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(1000)]
+
+
+def test_profile_writes_reports(tmp_path):
+    profiler = RunProfiler(output_dir=str(tmp_path))
+    with profiler.profile("fit_model"):
+        kept = allocate()
+
+    stats = pstats.Stats(str(Path(tmp_path, "fit_model.pstats")))
+    assert any(function[2] == "allocate" for function in stats.stats)
+    assert "allocate" in Path(tmp_path, "fit_model_pstats.txt").read_text()
+    assert "test_run_profiler.py" in Path(
+        tmp_path, "fit_model_allocations.txt"
+    ).read_text()
+    assert profiler.get_metrics()["profile/fit_model/peak_traced_memory_mb"] >= 1
+    assert len(kept) == 1000
+
+
+def test_profile_uploads_reports_and_logs_metrics():
+    experiment_logger = ArtifactRecordingExperimentation()
+    profiler = RunProfiler()
+    with profiler.profile("evaluate", experiment_logger):
+        # Nested stages are part of the outer stage
+        with profiler.profile("predict", experiment_logger):
+            allocate()
+
+    assert sorted(experiment_logger.artifacts) == [
+        "profiles/evaluate.pstats",
+        "profiles/evaluate_allocations.txt",
+        "profiles/evaluate_pstats.txt",
+    ]
+    assert set(experiment_logger.metrics) == {
+        "profile/evaluate/peak_traced_memory_mb",
+        "profile/evaluate/peak_rss_mb",
+    }
+
+
+def test_profile_memory_only():
+    experiment_logger = ArtifactRecordingExperimentation()
+    with RunProfiler(cpu=False).profile("predict", experiment_logger):
+        allocate()
+
+    assert experiment_logger.artifacts == ["profiles/predict_allocations.txt"]
+
+
+def test_profile_memory_without_reset_peak(monkeypatch):
+    # tracemalloc.reset_peak is only available on Python 3.9+
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    experiment_logger = ArtifactRecordingExperimentation()
+    tracemalloc.start()
+    try:
+        with RunProfiler(cpu=False).profile("predict", experiment_logger):
+            allocate()
+    finally:
+        tracemalloc.stop()
+
+    assert experiment_logger.metrics["profile/predict/peak_traced_memory_mb"] > 0
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+from seqeval.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+from ner_sample.evaluation.span_metrics import TagEncoder, span_scores, token_accuracy
+
+TAGS = [
+    "O",
+    "B-PER",
+    "I-PER",
+    "E-PER",
+    "S-PER",
+    "B-LOC",
+    "I-LOC",
+    "E-LOC",
+    "S-LOC",
+    "B",
+    "I",
+    "PER",
+]
+
+
+def random_sequences(rng, n_sentences, noise):
+    golds = [
+        [rng.choice(TAGS) for _ in range(rng.randint(1, 8))] for _ in range(n_sentences)
+    ]
+    predicted = [
+        [rng.choice(TAGS) if rng.random() < noise else tag for tag in gold]
+        for gold in golds
+    ]
+    return golds, predicted
+
+
+def scores(golds, predicted):
+    encoder = TagEncoder()
+    gold_ids, offsets = encoder.encode(golds)
+    predicted_ids, _ = encoder.encode(predicted)
+    precision, recall, f1 = span_scores(
+        gold_ids, predicted_ids, offsets, encoder.tag_names
+    )
+    return precision, recall, f1, token_accuracy(gold_ids, predicted_ids)
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("seed", range(50))
+def test_span_scores_match_seqeval(seed):
+    rng = random.Random(seed)
+    golds, predicted = random_sequences(rng, n_sentences=rng.randint(1, 10), noise=0.3)
+
+    assert scores(golds, predicted) == (
+        precision_score(golds, predicted),
+        recall_score(golds, predicted),
+        f1_score(golds, predicted),
+        accuracy_score(golds, predicted),
+    )
+
+
+def test_span_scores_wrong_entity_type():
+    golds = [["B-PER", "I-PER", "O", "B-LOC"]]
+    predicted = [["B-PER", "I-PER", "O", "B-PER"]]
+
+    precision, recall, f1, accuracy = scores(golds, predicted)
+
+    assert precision == recall == f1 == 0.5
+    assert accuracy == 0.75
+
+
+def test_span_scores_no_entities():
+    assert scores([["O", "O"]], [["O", "O"]]) == (0.0, 0.0, 0.0, 1.0)
@@ -0,0 +1,115 @@
+import pytest
+
+from ner_sample import SuccessiveHalvingSearch
+from ner_sample.evaluation import EvaluationMetrics, Evaluator
+from ner_sample.models import BaseModel
+from ner_sample.successive_halving import _worker_state
+from tests.mocks import MockDataLoader, MockExperimentation
+
+
+class ScoreModel(BaseModel):
+    """
+    Predicts a score which grows with its quality, its epochs
+    and the number of training samples
+    """
+
+    def __init__(self, quality, max_epochs=1):
+        self.n_train = None
+        super().__init__(quality=quality, max_epochs=max_epochs)
+
+    def fit(self, X, y=None) -> None:
+        self.n_train = len(X)
+
+    def predict(self, X):
+        score = self.hyper_params["quality"] * self.hyper_params["max_epochs"]
+        return [score * self.n_train] * len(X)
+
+
+class ScoreMetrics(EvaluationMetrics):
+    def __init__(self, score):
+        self.score = score
+
+    def get_metrics(self):
+        return {"score": self.score}
+
+
+class ScoreEvaluator(Evaluator):
+    def evaluate(self, y_test, prediction) -> ScoreMetrics:
+        return ScoreMetrics(prediction[0])
+
+
+class RunRecordingExperimentation(MockExperimentation):
+    def __init__(self):
+        self.runs = []
+        super().__init__()
+
+    def end_run(self):
+        self.runs.append((dict(self.params), dict(self.metrics)))
+
+
+def make_search(**kwargs):
+    params = dict(
+        model_factory=ScoreModel,
+        X_train=list(range(90)),
+        X_test=list(range(10)),
+        data_loader=MockDataLoader(),
+        evaluator=ScoreEvaluator(),
+        param_grid={"quality": list(range(1, 10))},
+        log_experiment=False,
+    )
+    params.update(kwargs)
+    return SuccessiveHalvingSearch(**params)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_successive_halving_promotes_best_configs(n_jobs):
+    search = make_search(n_configs=9, min_budget=1, max_budget=9, n_jobs=n_jobs)
+    results = search.run()
+
+    assert search.get_brackets() == [{"n_configs": 9, "budgets": [1, 3, 9]}]
+    assert results.groupby("budget").size().to_dict() == {1: 9, 3: 3, 9: 1}
+    assert sorted(results[results["rung"] == 1]["quality"]) == [7, 8, 9]
+    assert search.get_best_params() == {"quality": 9}
+    assert search.get_best_metrics().score == 9 * 9 * 90
+
+
+def test_successive_halving_data_fraction_budget():
+    search = make_search(
+        n_configs=9, min_budget=1 / 9, max_budget=1.0, budget_param=None, n_jobs=1
+    )
+    results = search.run()
+
+    train_sizes = results.groupby("rung")["score"].max() / results.groupby("rung")[
+        "quality"
+    ].max()
+    assert list(train_sizes) == [10, 30, 90]
+    assert search.get_best_params() == {"quality": 9}
+    # The datasets are not kept alive after an in-process search
+    assert _worker_state == {}
+
+
+def test_hyperband_logs_every_rung():
+    experiment_logger = RunRecordingExperimentation()
+    search = make_search(
+        min_budget=1,
+        max_budget=9,
+        hyperband=True,
+        random_state=0,
+        n_jobs=1,
+        log_experiment=True,
+        experiment_logger=experiment_logger,
+        experiment_name="search",
+    )
+    brackets = search.get_brackets()
+    results = search.run()
+
+    assert [bracket["budgets"] for bracket in brackets] == [[1, 3, 9], [3, 9], [9]]
+    assert [bracket["n_configs"] for bracket in brackets] == [9, 5, 3]
+    assert len(experiment_logger.runs) == len(results) == 9 + 3 + 1 + 5 + 1 + 3
+    logged = {
+        (params["search_bracket"], params["search_rung"], params["search_budget"])
+        for params, _ in experiment_logger.runs
+    }
+    assert logged == {(0, 0, 1), (0, 1, 3), (0, 2, 9), (1, 0, 3), (1, 1, 9), (2, 0, 9)}
+    assert results.loc[0, "budget"] == 9
+    assert results.loc[0, "score"] == results[results["budget"] == 9]["score"].max()
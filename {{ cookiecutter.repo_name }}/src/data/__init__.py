@@ -1,3 +1,8 @@
-from .data_loader import DataLoader
+from src.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {"DataLoader": ".data_loader"},
+)
 
 __all__ = ["DataLoader"]
@@ -1,9 +1,16 @@
 import logging
 from time import time
 
-from .evaluation_metrics import EvaluationMetrics
-from .step_evaluation_metrics import StepEvaluationMetrics
-from .evaluator import Evaluator
+from src.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {
+        "EvaluationMetrics": ".evaluation_metrics",
+        "StepEvaluationMetrics": ".step_evaluation_metrics",
+        "Evaluator": ".evaluator",
+    },
+)
 
 
 class TimeTook(object):
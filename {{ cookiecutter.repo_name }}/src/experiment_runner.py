@@ -1,4 +1,5 @@
 import logging
+from itertools import islice, repeat
 
 from . import LoggableObject
 from .data.data_loader import DataLoader
@@ -22,6 +23,7 @@ class ExperimentRunner:
         log_experiment: bool = True,
         experiment_logger: Experimentation = None,
         experiment_name: str = None,
+        evaluation_chunk_size: int = None,
         **experiment_params_to_log,
     ):
         """
@@ -42,6 +44,12 @@ class ExperimentRunner:
         (e.g. MlflowExperimentation)
         :param experiment_name: Name of experiment,
         to be used by the experimentation service
+        :param evaluation_chunk_size: Optional number of test samples per chunk.
+        If passed, evaluate() predicts and evaluates the test set chunk by chunk
+        (using the evaluator's update and finalize methods), so peak memory does not
+        grow with the size of the test set. Predictions are then not kept
+        (run() does not call predict()).
+        If X_test is None, the test set is read using data_loader.iter_batches
 
         :example:
 
@@ -82,9 +90,16 @@ class ExperimentRunner:
         self.experiment_logger = experiment_logger
         self.log_experiment = log_experiment
         self.experiment_name = experiment_name
+        self.evaluation_chunk_size = evaluation_chunk_size
         self._evaluation_metrics = []  # Metrics gathered during experiment
         self._predictions = []  # Predictions gathered during experiment
 
+        if self.evaluation_chunk_size and not self.evaluator.supports_streaming():
+            logger.warning(
+                f"{type(self.evaluator).__name__} does not support streaming "
+                "evaluation, the predictions of all chunks are held in memory"
+            )
+
         logger.info(f"Starting experiment: {self.experiment_name}...")
 
         if self.log_experiment:
@@ -141,7 +156,9 @@ class ExperimentRunner:
         """
         self.fit_model()
 
-        self.predict()
+        if not self.evaluation_chunk_size:
+            # Chunked evaluation predicts the test set itself, chunk by chunk
+            self.predict()
 
         evaluation_result = self.evaluate()
 
@@ -157,6 +174,11 @@ class ExperimentRunner:
         Calls the model predict function with the input X_test
         :return: None
         """
+        if self.X_test is None:
+            raise ValueError(
+                "X_test is None, cannot predict the whole test set. "
+                "Set evaluation_chunk_size to read it in batches during evaluate()"
+            )
         logger.info(
             f"Running model.predict() using model {self.model.name} "
             f"on {len(self.X_test)} test samples"
@@ -169,24 +191,52 @@ class ExperimentRunner:
         :return: EvaluationResult
         """
 
-        if self._predictions is None or len(self._predictions) == 0:
-            logger.info("Predictions not found, running model.predict")
-            self.predict()
+        if self.evaluation_chunk_size:
+            evaluation_result = self._evaluate_in_chunks()
         else:
-            logger.info("Predictions found, skipping model.predict call")
+            if self._predictions is None or len(self._predictions) == 0:
+                logger.info("Predictions not found, running model.predict")
+                self.predict()
+            else:
+                logger.info("Predictions found, skipping model.predict call")
+
+            evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
 
-        evaluation_result = self.evaluator.evaluate(self.y_test, self._predictions)
         if self.log_experiment:
             if isinstance(evaluation_result, StepEvaluationMetrics):
-                for step in evaluation_result.get_steps():
-                    step_metrics = evaluation_result.get_metrics(step=step)
-                    self.experiment_logger.log_metrics(step_metrics)
+                self.experiment_logger.log_step_metrics(evaluation_result)
             else:
                 self.experiment_logger.log_evaluation_result(evaluation_result)
 
         self._evaluation_metrics = evaluation_result
         return self._evaluation_metrics
 
+    def _evaluate_in_chunks(self) -> EvaluationMetrics:
+        """
+        Pipelines model.predict and evaluator.update over chunks of the test set,
+        so only one chunk of predictions is held in memory at a time
+        """
+        logger.info(
+            f"Predicting and evaluating in chunks of {self.evaluation_chunk_size} "
+            f"test samples"
+        )
+        if self.X_test is None:
+            # Read the test set lazily, for datasets which do not fit in memory
+            chunks = self.data_loader.iter_batches(
+                split="test", batch_size=self.evaluation_chunk_size
+            )
+        else:
+            chunks = zip(
+                _iter_chunks(self.X_test, self.evaluation_chunk_size),
+                _iter_chunks(self.y_test, self.evaluation_chunk_size),
+            )
+
+        self.evaluator.reset()
+        for X_chunk, y_chunk in chunks:
+            predictions = self.model.predict(X=X_chunk)
+            self.evaluator.update(y_chunk, predictions)
+        return self.evaluator.finalize()
+
     def get_predictions(self):
         """
         Get already calculated predictions.
@@ -211,3 +261,21 @@ class ExperimentRunner:
             return None
         else:
             return self._evaluation_metrics
+
+
+def _iter_chunks(data, chunk_size: int):
+    """
+    Yields consecutive chunks of chunk_size samples
+    (pandas objects are sliced by position; None yields None for every chunk)
+    """
+    if data is None:
+        yield from repeat(None)
+    elif hasattr(data, "iloc"):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start : start + chunk_size]
+    else:
+        iterator = iter(data)
+        chunk = list(islice(iterator, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(iterator, chunk_size))
@@ -1,6 +1,8 @@
+import numbers
+import time
 from abc import ABC, abstractmethod
 
-from src.evaluation import EvaluationMetrics
+from src.evaluation import EvaluationMetrics, StepEvaluationMetrics
 
 
 class Experimentation(ABC):
@@ -103,6 +105,38 @@ class Experimentation(ABC):
         """
         pass
 
+    def log_batch(self, metrics=None, params=None):
+        """
+        Log multiple metric values and parameters at once.
+        By default logs each value separately,
+        override if the experimentation service supports bulk logging.
+        :param metrics: list of (key, value, step, timestamp) tuples.
+        timestamp is in milliseconds since the epoch
+        :param params: dictionary of parameters to log
+        :return: None
+        """
+        if params:
+            self.log_params(params)
+        for key, value, step, _ in metrics or []:
+            self.log_metric(key, value, step)
+
+    def log_step_metrics(self, evaluation_result: StepEvaluationMetrics):
+        """
+        Logs the metrics of all steps of a StepEvaluationMetrics in bulk
+        (using log_batch), each with its step, so every metric forms a curve.
+        Steps which are not integers (e.g. threshold values) are logged
+        by their index in get_steps()
+        :param evaluation_result: Evaluation result with values per step
+        :return: None
+        """
+        timestamp = int(time.time() * 1000)
+        metrics = []
+        for i, step in enumerate(evaluation_result.get_steps()):
+            step_number = int(step) if isinstance(step, numbers.Integral) else i
+            for key, value in evaluation_result.get_metrics(step=step).items():
+                metrics.append((key, value, step_number, timestamp))
+        self.log_batch(metrics=metrics)
+
     def log_evaluation_result(self, evaluation_result: EvaluationMetrics):
         try:
             metrics = evaluation_result.get_metrics()
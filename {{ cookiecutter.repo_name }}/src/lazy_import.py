@@ -0,0 +1,42 @@
+import importlib
+import importlib.util
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_import(
+    package_name: str, attributes: Dict[str, str]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Creates the module level __getattr__ and __dir__ of a package (PEP 562),
+    so its classes are imported on first access instead of on package import.
+    This keeps `import src` fast, as heavy dependencies (mlflow, sklearn, pandas)
+    are only imported by the modules that use them.
+    Example usage (in a package's __init__.py):
+    __getattr__, __dir__ = lazy_import(__name__, {"BaseModel": ".base_model"})
+    :param package_name: Name of the package (__name__ of its __init__ module)
+    :param attributes: Name of each lazily imported attribute,
+    and the (relative) module defining it
+    :return: __getattr__ and __dir__ functions for the package
+    """
+    package = importlib.import_module(package_name)
+
+    def __getattr__(name: str):
+        if name in attributes:
+            module = importlib.import_module(attributes[name], package_name)
+            value = getattr(module, name)
+        elif importlib.util.find_spec(f"{package_name}.{name}") is not None:
+            # Sub modules and packages (e.g. src.evaluation)
+            value = importlib.import_module(f"{package_name}.{name}")
+        else:
+            raise AttributeError(
+                f"module {package_name!r} has no attribute {name!r}"
+            )
+
+        # Cache on the package, so __getattr__ is only called once per attribute
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(package)) | set(attributes))
+
+    return __getattr__, __dir__
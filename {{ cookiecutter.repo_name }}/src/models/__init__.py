@@ -1,3 +1,8 @@
-from .base_model import BaseModel
+from src.lazy_import import lazy_import
+
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    {"BaseModel": ".base_model"},
+)
 
 __all__ = ["BaseModel"]
@@ -97,3 +97,62 @@ def test_experiment_runner():
 
     assert results.precision == expected_precision
     assert results.recall == expected_recall
+
+
+class MockStreamingEvaluator(Evaluator):
+    def __init__(self):
+        self.correct = 0
+        super().__init__()
+
+    def evaluate(self, actual, predicted) -> EvaluationMetrics:
+        return MockEvaluationMetrics(
+            precision=sum(a == p for a, p in zip(actual, predicted)), recall=None
+        )
+
+    def reset(self) -> None:
+        self.correct = 0
+
+    def update(self, y_true_batch, predictions_batch) -> None:
+        self.correct += sum(a == p for a, p in zip(y_true_batch, predictions_batch))
+
+    def finalize(self) -> EvaluationMetrics:
+        return MockEvaluationMetrics(precision=self.correct, recall=None)
+
+
+class MockBatchDataLoader(MockDataLoader):
+    def iter_batches(self, split: str = "test", batch_size: int = 1000):
+        for start in range(0, len(self.X_test), batch_size):
+            yield (
+                self.X_test[start : start + batch_size],
+                self.y_test[start : start + batch_size],
+            )
+
+
+class MockIdentityModel(MockModel):
+    def __init__(self):
+        self.predicted_sizes = []
+        super().__init__()
+
+    def predict(self, X):
+        self.predicted_sizes.append(len(X))
+        return X
+
+
+def test_experiment_runner_reads_test_set_in_batches():
+    X_test = [1, 2, 3, 4, 5, 6, 7]
+    y_test = [1, 2, 3, 0, 5, 0, 7]
+    model = MockIdentityModel()
+    experiment_runner = ExperimentRunner(
+        model=model,
+        X_train=[1, 2],
+        X_test=None,
+        data_loader=MockBatchDataLoader(
+            X_train=[1, 2], y_train=None, X_test=X_test, y_test=y_test
+        ),
+        evaluator=MockStreamingEvaluator(),
+        log_experiment=False,
+        evaluation_chunk_size=3,
+    )
+
+    assert experiment_runner.run().precision == 5
+    assert model.predicted_sizes == [3, 3, 1]